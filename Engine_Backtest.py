@@ -0,0 +1,210 @@
+import functools
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from Engine_Cache import CachePrediksi, kunci_seri
+from Engine_Evaluasi import kategori_mape
+from Engine_Prediksi import PARAM_PROPHET
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Tren import PARAM_TREN, fit_tren_batch
+from Engine_Instrumentasi import terukur
+
+# Backtest rolling-origin (walk-forward): untuk setiap origin historis, model di-fit hanya
+# memakai tahun sebelum origin lalu dinilai pada `horizon` tahun berikutnya yang disembunyikan.
+PARAM_BACKTEST = {
+    'min_train': 3,   # minimal jumlah tahun latih pada origin pertama
+    'horizon': 1,     # jumlah tahun uji setelah setiap origin
+}
+
+ENGINE_BACKTEST = {
+    'prophet': PARAM_PROPHET,
+    'linier': {**PARAM_TREN, 'metode': 'linier'},
+    'teredam': {**PARAM_TREN, 'metode': 'teredam'},
+}
+
+KOLOM_BACKTEST = ['Engine', 'Layanan', 'Origin', 'Tahun', 'Horizon', 'Aktual', 'Prediksi']
+
+# Cache terpisah dari cache prediksi: satu entri = ramalan satu (seri latih, tahun uji, parameter)
+cache_backtest = CachePrediksi(nama='backtest')
+
+# Seri per layanan: satu nilai per tahun (duplikat dijumlahkan), urut layanan lalu tahun
+def siapkan_seri(df, layanan_col=LAYANAN_COL):
+    seri = (df[df[layanan_col].notna()]
+            .groupby([layanan_col, 'Tahun'], sort=False, observed=True)['Jumlah'].sum()
+            .reset_index())
+    kode, nama_layanan = pd.factorize(seri[layanan_col], sort=False)
+    tahun = seri['Tahun'].to_numpy(dtype=np.int64)
+    jumlah = seri['Jumlah'].to_numpy(dtype=np.float64)
+    urut = np.lexsort((tahun, kode))
+    kode, tahun, jumlah = kode[urut], tahun[urut], jumlah[urut]
+
+    # posisi tahun di dalam seri layanannya (0, 1, 2, ...)
+    awal = np.searchsorted(kode, np.arange(len(nama_layanan)))
+    posisi = np.arange(len(kode)) - awal[kode]
+    panjang = np.bincount(kode, minlength=len(nama_layanan))
+    return kode, np.asarray(nama_layanan, dtype=object), tahun, jumlah, posisi, panjang
+
+# === ENGINE TREN: seluruh layanan di-fit sekaligus per origin (loop hanya atas posisi origin)
+def _backtest_tren(seri, params, min_train, horizon):
+    kode, nama_layanan, tahun, jumlah, posisi, panjang = seri
+    n_layanan = len(nama_layanan)
+    hasil = []
+    for origin in range(min_train, int(panjang.max(initial=0))):
+        latih = posisi < origin
+        uji = (posisi >= origin) & (posisi < origin + horizon)
+        if not uji.any():
+            continue
+        intercept, slope = fit_tren_batch(kode[latih], tahun[latih].astype(float), jumlah[latih], n_layanan)
+        tahun_akhir = np.full(n_layanan, np.iinfo(np.int64).min)
+        np.maximum.at(tahun_akhir, kode[latih], tahun[latih])
+
+        k = kode[uji]
+        langkah = tahun[uji] - tahun_akhir[k]
+        level = intercept[k] + slope[k] * tahun_akhir[k]
+        if params['metode'] == 'teredam':
+            faktor = np.concatenate([[0.0], np.cumsum(params['phi'] ** np.arange(1, langkah.max() + 1))])
+            prediksi = level + slope[k] * faktor[langkah]
+        else:
+            prediksi = level + slope[k] * langkah
+        hasil.append(pd.DataFrame({
+            'Layanan': nama_layanan[k],
+            'Origin': tahun_akhir[k],
+            'Tahun': tahun[uji],
+            'Horizon': posisi[uji] - origin + 1,
+            'Aktual': jumlah[uji],
+            'Prediksi': prediksi,
+        }))
+    return hasil
+
+# === ENGINE PROPHET: satu tugas = satu layanan dengan seluruh origin-nya yang belum ada di cache
+# Offset di-parse sekali per freq (peringatan deprekasi alias 'Y' pandas tidak berulang di setiap fit)
+@functools.lru_cache(maxsize=None)
+def _offset(freq):
+    return to_offset(freq)
+
+# Tanggal tahun uji mengikuti konvensi produksi: make_future_dataframe(freq=params['freq']) menaruh ramalan
+# tahun t pada titik acuan freq di tahun t (freq 'Y' → 31 Desember), sedangkan data latih bertanggal 1 Januari
+def tanggal_uji(tahun_uji, params):
+    offset = _offset(params['freq'])
+    return pd.DatetimeIndex([offset.rollforward(t) for t in pd.to_datetime(tahun_uji.astype(str), format='%Y')])
+
+# Kunci cache ramalan uji Prophet (dipakai bersama backtest & turnamen); tanggal uji ikut di-hash
+def kunci_prophet(tahun_latih, jumlah_latih, tahun_uji, params):
+    return kunci_seri(tahun_latih, jumlah_latih,
+                      {**params, 'uji': [str(t.date()) for t in tanggal_uji(tahun_uji, params)]})
+
+def ramal_prophet(tahun_latih, jumlah_latih, tahun_uji, params):
+    from prophet import Prophet
+
+    data = pd.DataFrame({'ds': pd.to_datetime(tahun_latih.astype(str), format='%Y'), 'y': jumlah_latih})
+    # hanya titik ramalan yang dinilai → tanpa sampel interval
+    model = Prophet(yearly_seasonality=params['yearly_seasonality'],
+                    daily_seasonality=params['daily_seasonality'],
+                    uncertainty_samples=0)
+    model.fit(data)
+    future = pd.DataFrame({'ds': tanggal_uji(tahun_uji, params)})
+    return model.predict(future)['yhat'].to_numpy()
+
+def _backtest_tugas(tugas):
+    tahun, jumlah, daftar_origin, horizon, params = tugas
+    return [ramal_prophet(tahun[:o], jumlah[:o], tahun[o:o + horizon], params) for o in daftar_origin]
+
+def _backtest_prophet(seri, params, min_train, horizon, n_workers, progress_callback, cache):
+    kode, nama_layanan, tahun, jumlah, posisi, panjang = seri
+    awal = np.concatenate([[0], np.cumsum(panjang)])
+
+    # === CEK CACHE per (layanan, origin)
+    ramalan = {}
+    tugas = {}
+    kunci = {}
+    for i in range(len(nama_layanan)):
+        t, y = tahun[awal[i]:awal[i + 1]], jumlah[awal[i]:awal[i + 1]]
+        for o in range(min_train, len(t)):
+            if cache is not None:
+                kunci[i, o] = kunci_prophet(t[:o], y[:o], t[o:o + horizon], params)
+                tersimpan = cache.get(kunci[i, o])
+                if tersimpan is not None:
+                    ramalan[i, o] = tersimpan
+                    continue
+            tugas.setdefault(i, (t, y, [], horizon, params))[2].append(o)
+
+    total = len(tugas)
+    selesai = 0
+
+    def simpan(i, hasil):
+        for o, yhat in zip(tugas[i][2], hasil):
+            ramalan[i, o] = yhat
+            if cache is not None:
+                cache.put(kunci[i, o], yhat)
+
+    # === FIT ORIGIN YANG BELUM ADA DI CACHE (serial atau process pool, seperti prediksi_semua_layanan)
+    if n_workers <= 1 or total <= 1:
+        for i in tugas:
+            simpan(i, _backtest_tugas(tugas[i]))
+            selesai += 1
+            if progress_callback:
+                progress_callback(selesai, total, nama_layanan[i])
+    else:
+        ctx = mp.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(n_workers, total), mp_context=ctx) as executor:
+            futures = {executor.submit(_backtest_tugas, tugas[i]): i for i in tugas}
+            for future in as_completed(futures):
+                i = futures[future]
+                simpan(i, future.result())
+                selesai += 1
+                if progress_callback:
+                    progress_callback(selesai, total, nama_layanan[i])
+
+    hasil = []
+    for (i, o), yhat in sorted(ramalan.items()):
+        t, y = tahun[awal[i]:awal[i + 1]], jumlah[awal[i]:awal[i + 1]]
+        hasil.append(pd.DataFrame({
+            'Layanan': nama_layanan[i],
+            'Origin': t[o - 1],
+            'Tahun': t[o:o + horizon],
+            'Horizon': np.arange(1, len(yhat) + 1),
+            'Aktual': y[o:o + horizon],
+            'Prediksi': yhat,
+        }))
+    return hasil
+
+# Backtest seluruh layanan untuk beberapa engine → (titik uji, ringkasan per layanan, ringkasan per engine)
+@terukur("Backtest rolling-origin")
+def backtest_semua_layanan(df, engines=('linier', 'teredam'), min_train=PARAM_BACKTEST['min_train'],
+                           horizon=PARAM_BACKTEST['horizon'], n_workers=1, progress_callback=None,
+                           layanan_col=LAYANAN_COL, cache=None):
+    seri = siapkan_seri(df, layanan_col)
+    bagian = []
+    for engine in engines:
+        params = ENGINE_BACKTEST[engine]
+        if params['engine'] == 'prophet':
+            hasil = _backtest_prophet(seri, params, min_train, horizon, n_workers, progress_callback, cache)
+        else:
+            hasil = _backtest_tren(seri, params, min_train, horizon)
+        bagian.extend(h.assign(Engine=engine) for h in hasil)
+
+    if not bagian:
+        df_titik = pd.DataFrame(columns=KOLOM_BACKTEST)
+    else:
+        df_titik = (pd.concat(bagian, ignore_index=True)[KOLOM_BACKTEST]
+                    .sort_values(['Engine', 'Layanan', 'Origin', 'Tahun'], kind='stable')
+                    .reset_index(drop=True))
+    return df_titik, ringkasan_backtest(df_titik, ['Engine', 'Layanan']), ringkasan_backtest(df_titik, ['Engine'])
+
+# Akurasi out-of-sample per kelompok; MAPE hanya dihitung pada tahun uji dengan aktual ≠ 0
+def ringkasan_backtest(df_titik, kunci):
+    galat = df_titik['Aktual'] - df_titik['Prediksi']
+    aktual = df_titik['Aktual'].where(df_titik['Aktual'] != 0)
+    df = df_titik[kunci].assign(AE=galat.abs(), SE=galat ** 2, APE=(galat / aktual).abs() * 100)
+
+    df_ringkasan = df.groupby(kunci, sort=True, observed=True).agg(
+        **{'Jumlah Uji': ('AE', 'size'), 'MAE': ('AE', 'mean'), 'RMSE': ('SE', 'mean'),
+           'MAPE (%)': ('APE', 'mean')}).reset_index()
+    df_ringkasan['RMSE'] = np.sqrt(df_ringkasan['RMSE'])
+    df_ringkasan['Validasi Akurasi'] = kategori_mape(df_ringkasan['MAPE (%)'])
+    df_ringkasan[['MAE', 'RMSE', 'MAPE (%)']] = df_ringkasan[['MAE', 'RMSE', 'MAPE (%)']].round(2)
+    return df_ringkasan
@@ -0,0 +1,113 @@
+import os
+import json
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DIREKTORI_CACHE = os.environ.get('KBS_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+
+# Kunci cache berbasis konten: hash seri (Tahun, Jumlah) satu layanan + parameter model.
+# Nama layanan sengaja tidak ikut di-hash, sehingga seri identik berbagi hasil yang sama.
+def kunci_seri(tahun, jumlah, params):
+    h = hashlib.sha256()
+    h.update(np.asarray(tahun, dtype=np.int64).tobytes())
+    h.update(np.asarray(jumlah, dtype=np.float64).tobytes())
+    h.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+    return h.hexdigest()
+
+# Kunci berbasis konten untuk satu DataFrame utuh (hash vektor per baris, tanpa index)
+def kunci_dataset(df):
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in df.columns]).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+# Cache hasil prediksi: LRU di memori + salinan persisten di disk (write-through).
+# Entri yang tergusur dari memori tetap tersedia di disk untuk rerun / sesi berikutnya.
+class CachePrediksi:
+    def __init__(self, nama='prediksi', max_entri=5000, direktori=DIREKTORI_CACHE, pakai_disk=True):
+        self.max_entri = max_entri
+        self.direktori = os.path.join(direktori, nama)
+        self.pakai_disk = pakai_disk
+        self._memori = OrderedDict()
+        self._lock = threading.Lock()
+        self.hit_memori = 0
+        self.hit_disk = 0
+        self.miss = 0
+
+    def _path(self, kunci):
+        return os.path.join(self.direktori, kunci[:2], kunci + '.pkl')
+
+    def _simpan_memori(self, kunci, nilai):
+        self._memori[kunci] = nilai
+        self._memori.move_to_end(kunci)
+        while len(self._memori) > self.max_entri:
+            self._memori.popitem(last=False)
+
+    def get(self, kunci):
+        with self._lock:
+            if kunci in self._memori:
+                self._memori.move_to_end(kunci)
+                self.hit_memori += 1
+                return self._memori[kunci]
+
+        if self.pakai_disk:
+            try:
+                with open(self._path(kunci), 'rb') as f:
+                    nilai = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                nilai = None
+            if nilai is not None:
+                with self._lock:
+                    self._simpan_memori(kunci, nilai)
+                    self.hit_disk += 1
+                return nilai
+
+        with self._lock:
+            self.miss += 1
+        return None
+
+    def put(self, kunci, nilai):
+        with self._lock:
+            self._simpan_memori(kunci, nilai)
+        if self.pakai_disk:
+            path = self._path(kunci)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, 'wb') as f:
+                    pickle.dump(nilai, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except OSError:
+                pass  # disk penuh / read-only → cukup cache memori
+
+    def clear(self, hapus_disk=True):
+        with self._lock:
+            self._memori.clear()
+            self.hit_memori = self.hit_disk = self.miss = 0
+        if hapus_disk and os.path.isdir(self.direktori):
+            for root, _, files in os.walk(self.direktori):
+                for nama_file in files:
+                    if nama_file.endswith('.pkl'):
+                        try:
+                            os.remove(os.path.join(root, nama_file))
+                        except OSError:
+                            pass
+
+    def statistik(self):
+        with self._lock:
+            total = self.hit_memori + self.hit_disk + self.miss
+            return {
+                'Hit (Memori)': self.hit_memori,
+                'Hit (Disk)': self.hit_disk,
+                'Miss': self.miss,
+                'Hit Rate (%)': round(100 * (self.hit_memori + self.hit_disk) / total, 2) if total else 0.0,
+                'Entri Memori': len(self._memori),
+            }
+
+# Instance bersama per proses server → dipakai lintas sesi Streamlit
+cache_prediksi = CachePrediksi()
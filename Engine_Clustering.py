@@ -0,0 +1,248 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+from sklearn.decomposition import PCA
+from sklearn.metrics import silhouette_score
+
+from Engine_Cache import CachePrediksi, kunci_dataset
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Instrumentasi import terukur
+
+# Di atas ambang ini sweep memakai MiniBatchKMeans warm-start; silhouette dihitung pada sampel
+AMBANG_MINIBATCH = 10000
+SAMPEL_SILHOUETTE = 5000
+K_MAKS_DEFAULT = 10
+
+# Memo tahap klastering per dataset (memori saja, dibagi lintas rerun & sesi dalam satu proses)
+cache_klaster = CachePrediksi(nama='klaster', max_entri=32, pakai_disk=False)
+
+# Fitur statistik yang dipakai untuk klastering (StandardScaler → KMeans/PCA), radar & heatmap
+FITUR_TREN = ['Mean', 'StdDev', 'Range', 'Slope', 'Skewness']
+
+# Hitung fitur tren seluruh layanan sekaligus (closed form, tanpa loop per baris).
+# Slope = kemiringan regresi linier (setara np.polyfit derajat 1), Skewness = skew sampel
+# terkoreksi (setara DataFrame.skew). Fitur tambahan:
+# - Intercept : nilai garis tren pada tahun pertama
+# - R2        : koefisien determinasi garis tren
+# - CAGR      : pertumbuhan majemuk tahunan tahun pertama → terakhir
+# - Delta     : selisih jumlah tahun terakhir terhadap tahun sebelumnya
+@terukur("Fitur tren")
+def compute_trend_features(df_pivot):
+    tahun = np.array(df_pivot.columns, dtype=float)
+    X = df_pivot.to_numpy(dtype=float)
+    n_layanan, n = X.shape
+    kosong = np.full(n_layanan, np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = X.mean(axis=1)
+        dev = X - mean[:, None]
+        ss_tot = (dev ** 2).sum(axis=1)
+        m2 = ss_tot / n
+        m3 = (dev ** 3).mean(axis=1)
+
+        t = tahun - tahun.mean()
+        sxx = (t ** 2).sum()
+        slope = dev @ t / sxx if sxx > 0 else kosong
+        intercept = mean - slope * (tahun.mean() - tahun[0])
+        r2 = np.where(ss_tot > 0, slope ** 2 * sxx / ss_tot, 1.0)
+
+        stddev = np.sqrt(ss_tot / (n - 1)) if n > 1 else kosong
+        if n > 2:
+            skew = np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2 ** 1.5
+            # seri konstan → skew 0 (perilaku sama dengan DataFrame.skew)
+            skew = np.where(m2 <= 1e-14 * np.maximum(mean ** 2, 1), 0.0, skew)
+        else:
+            skew = kosong
+
+        rentang = tahun[-1] - tahun[0]
+        first, last = X[:, 0], X[:, -1]
+        if rentang > 0:
+            cagr = np.where((first > 0) & (last >= 0), (last / first) ** (1 / rentang) - 1, np.nan)
+        else:
+            cagr = kosong
+
+    fitur = pd.DataFrame(index=df_pivot.index)
+    fitur['Mean'] = mean
+    fitur['StdDev'] = stddev
+    fitur['Range'] = X.max(axis=1) - X.min(axis=1)
+    fitur['Slope'] = slope
+    fitur['Skewness'] = skew
+    fitur['Intercept'] = intercept
+    fitur['R2'] = r2
+    fitur['CAGR'] = cagr
+    fitur['Delta'] = X[:, -1] - X[:, -2] if n > 1 else kosong
+    return fitur
+
+# Pivot long → matriks layanan × tahun (tahun kosong diisi 0)
+@terukur("Pivot layanan × tahun (pivot_table)")
+def pivot_layanan(df, layanan_col=LAYANAN_COL):
+    return df.pivot_table(index=layanan_col, columns='Tahun', values='Jumlah', aggfunc='sum',
+                          observed=True).fillna(0)
+
+# Tahap yang tidak bergantung pada jumlah klaster: pivot → fitur tren → StandardScaler → PCA 2D
+@terukur("Fitur + skala + PCA")
+def siapkan_fitur_klaster(df, layanan_col=LAYANAN_COL):
+    df_pivot = pivot_layanan(df, layanan_col)
+    df_fitur = compute_trend_features(df_pivot)
+    fitur_scaled = StandardScaler().fit_transform(df_fitur[FITUR_TREN])
+    pca_result = PCA(n_components=2).fit_transform(fitur_scaled)
+    return {'fitur': df_fitur, 'scaled': fitur_scaled, 'pca': pca_result}
+
+@terukur("KMeans")
+def fit_kmeans(fitur_scaled, n_clusters):
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init='auto')
+    return kmeans.fit_predict(fitur_scaled)
+
+def susun_hasil_klaster(tahap, labels):
+    df_result = tahap['fitur'].copy()
+    df_result['Cluster'] = labels
+    df_result = df_result.reset_index()
+    df_result['PC1'] = tahap['pca'][:, 0]
+    df_result['PC2'] = tahap['pca'][:, 1]
+    return df_result
+
+def _memo(cache, kunci, hitung):
+    if cache is None:
+        return hitung()
+    nilai = cache.get(kunci)
+    if nilai is None:
+        nilai = hitung()
+        cache.put(kunci, nilai)
+    return nilai
+
+# Tahap independen-k dengan memo per dataset → (kunci_dataset, tahap)
+def tahap_klaster(df, layanan_col=LAYANAN_COL, cache=None):
+    kunci = kunci_dataset(df[[layanan_col, 'Tahun', 'Jumlah']]) if cache is not None else None
+    tahap = _memo(cache, f"fitur|{layanan_col}|{kunci}",
+                  lambda: siapkan_fitur_klaster(df, layanan_col))
+    return kunci, tahap
+
+# Klastering KMeans atas fitur tren terstandardisasi + proyeksi PCA 2D untuk visualisasi.
+# Dengan cache, pivot/fitur/scaling/PCA dihitung sekali per dataset; perubahan n_clusters
+# hanya menjalankan ulang KMeans (dan hasil KMeans per k juga diingat).
+def klastering_tren(df, n_clusters=3, layanan_col=LAYANAN_COL, cache=None):
+    kunci, tahap = tahap_klaster(df, layanan_col, cache)
+    labels = _memo(cache, f"kmeans|{layanan_col}|{kunci}|{n_clusters}",
+                   lambda: fit_kmeans(tahap['scaled'], n_clusters))
+    return susun_hasil_klaster(tahap, labels)
+
+def _silhouette(X, labels, random_state=42):
+    if len(np.unique(labels)) < 2:
+        return np.nan
+    sample_size = SAMPEL_SILHOUETTE if len(X) > SAMPEL_SILHOUETTE else None
+    return silhouette_score(X, labels, sample_size=sample_size, random_state=random_state)
+
+def _fit_kmeans_dengan_silhouette(X, k):
+    kmeans = KMeans(n_clusters=k, random_state=42, n_init='auto')
+    labels = kmeans.fit_predict(X)
+    return labels, kmeans.inertia_, _silhouette(X, labels)
+
+# Rantai MiniBatchKMeans warm-start: pusat k+1 = pusat k + titik terjauh dari pusat terdekatnya
+def _rantai_minibatch(X, ks, random_state=42):
+    hasil = []
+    centers = None
+    for k in ks:
+        if centers is None:
+            model = MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=3, batch_size=4096)
+        else:
+            labels_lama = hasil[-1][0]
+            jarak = ((X - centers[labels_lama]) ** 2).sum(axis=1)
+            while len(centers) < k:
+                centers = np.vstack([centers, X[np.argmax(jarak)]])
+                jarak = np.minimum(jarak, ((X - centers[-1]) ** 2).sum(axis=1))
+            model = MiniBatchKMeans(n_clusters=k, init=centers, random_state=random_state, n_init=1, batch_size=4096)
+        labels = model.fit_predict(X)
+        centers = model.cluster_centers_
+        hasil.append((labels, model.inertia_))
+    return hasil
+
+# Titik siku kurva inersia: jarak terjauh dari garis lurus k_min → k_max (pada skala ternormalisasi)
+def k_siku(ks, inersia):
+    ks = np.asarray(ks, dtype=float)
+    y = np.asarray(inersia, dtype=float)
+    if len(ks) < 3 or y[0] == y[-1]:
+        return int(ks[0])
+    xn = (ks - ks[0]) / (ks[-1] - ks[0])
+    yn = (y - y[-1]) / (y[0] - y[-1])
+    return int(ks[np.argmax((1 - xn) - yn)])
+
+# Sweep KMeans untuk seluruh rentang k sekaligus → kurva inersia & silhouette + rekomendasi k.
+# Dataset kecil: setiap k di-fit paralel dengan KMeans yang sama seperti klastering_tren. Sengaja TANPA
+# warm-start: label per k harus identik dengan klastering_tren(n_clusters=k) (slider halaman vs kbs_batch
+# --n-clusters k), dan di skala ini fit dingin per k sudah murah. Dataset besar (> AMBANG_MINIBATCH):
+# rantai MiniBatchKMeans warm-start antar k + silhouette tersampel (label boleh berbeda dari KMeans penuh).
+@terukur("Sweep KMeans (k)")
+def sweep_kmeans(fitur_scaled, k_min=2, k_max=K_MAKS_DEFAULT, n_jobs=-1):
+    ks = list(range(k_min, min(k_max, len(fitur_scaled) - 1) + 1))
+    if not ks:
+        raise ValueError("Jumlah layanan terlalu sedikit untuk klastering (minimal 3 layanan).")
+
+    if len(fitur_scaled) <= AMBANG_MINIBATCH:
+        hasil = Parallel(n_jobs=n_jobs, prefer='threads')(
+            delayed(_fit_kmeans_dengan_silhouette)(fitur_scaled, k) for k in ks)
+    else:
+        rantai = _rantai_minibatch(fitur_scaled, ks)
+        silhouette = Parallel(n_jobs=n_jobs, prefer='threads')(
+            delayed(_silhouette)(fitur_scaled, labels) for labels, _ in rantai)
+        hasil = [(labels, inersia, s) for (labels, inersia), s in zip(rantai, silhouette)]
+
+    df_kurva = pd.DataFrame({
+        'k': ks,
+        'Inertia': [inersia for _, inersia, _ in hasil],
+        'Silhouette': [s for _, _, s in hasil],
+    })
+    k_silhouette = int(df_kurva.loc[df_kurva['Silhouette'].idxmax(), 'k']) if df_kurva['Silhouette'].notna().any() else ks[0]
+    return {
+        'kurva': df_kurva,
+        'labels': {k: labels for k, (labels, _, _) in zip(ks, hasil)},
+        'k_rekomendasi': k_silhouette,
+        'k_siku': k_siku(ks, df_kurva['Inertia']),
+    }
+
+# Sweep k dengan memo per dataset → (tahap, sweep)
+def sweep_klaster(df, k_max=K_MAKS_DEFAULT, layanan_col=LAYANAN_COL, cache=None, n_jobs=-1):
+    kunci, tahap = tahap_klaster(df, layanan_col, cache)
+    sweep = _memo(cache, f"sweep|{layanan_col}|{kunci}|{k_max}",
+                  lambda: sweep_kmeans(tahap['scaled'], 2, k_max, n_jobs=n_jobs))
+    return tahap, sweep
+
+def kategori_tren(mean_slope):
+    if mean_slope > 1000:
+        return "meningkat sangat tajam"
+    elif mean_slope > 100:
+        return "meningkat signifikan"
+    elif mean_slope > 10:
+        return "meningkat pelan"
+    elif mean_slope > -10:
+        return "relatif stabil"
+    elif mean_slope > -100:
+        return "menurun pelan"
+    elif mean_slope > -1000:
+        return "menurun signifikan"
+    else:
+        return "menurun sangat tajam"
+
+def kategori_variasi(mean_std):
+    if mean_std < 500:
+        return "stabil"
+    elif mean_std < 1500:
+        return "moderat"
+    elif mean_std < 5000:
+        return "fluktuatif"
+    else:
+        return "sangat fluktuatif"
+
+# Ringkasan naratif per klaster → DataFrame (Klaster, Jumlah Layanan, Tren Rata-rata, Variasi)
+def ringkasan_klaster(df_result):
+    df_naratif = []
+    for clus in sorted(df_result['Cluster'].unique()):
+        sub = df_result[df_result['Cluster'] == clus]
+        df_naratif.append({
+            "Klaster": f"Klaster {clus}",
+            "Jumlah Layanan": len(sub),
+            "Tren Rata-rata": kategori_tren(sub['Slope'].mean()),
+            "Variasi": kategori_variasi(sub['StdDev'].mean())
+        })
+    return pd.DataFrame(df_naratif)
@@ -0,0 +1,102 @@
+import io
+import json
+import time
+import zipfile
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from Engine_Evaluasi import evaluasi_semua_layanan
+from Engine_Instrumentasi import terukur
+
+# Ekspor seluruh tabel hasil ke satu berkas ZIP: satu Parquet per tabel + satu workbook .xlsx multi-sheet.
+# Semua penulisan berjalan per blok baris (ParquetWriter per row group, openpyxl write-only) langsung ke
+# entri ZIP di file sementara, sehingga memori tetap terbatas berapa pun jumlah layanannya.
+BARIS_PER_BLOK = 100_000
+BARIS_MAKS_SHEET = 1_048_575  # batas baris Excel (1.048.576) dikurangi header
+FORMAT_EKSPOR = ('parquet', 'xlsx')
+
+# Tabel yang diekspor (urutan = urutan file/sheet); tabel None dilewati
+def susun_tabel_ekspor(df_prediksi=None, df_evaluasi=None, df_klaster=None, df_long=None, df_validasi=None):
+    tabel = {}
+    if df_prediksi is not None:
+        tabel['prediksi'] = df_prediksi
+        df_eval_tahunan, df_eval_ringkasan = evaluasi_semua_layanan(df_prediksi)
+        tabel['evaluasi_historis'] = df_eval_tahunan
+        tabel['evaluasi_ringkasan'] = df_eval_ringkasan
+    if df_evaluasi is not None:
+        tabel['evaluasi_model'] = df_evaluasi
+    if df_klaster is not None:
+        tabel['klaster'] = df_klaster
+    if df_long is not None:
+        tabel['data_long'] = df_long
+    if df_validasi is not None:
+        tabel['validasi_data'] = df_validasi
+    return tabel
+
+def _blok(df, ukuran=BARIS_PER_BLOK):
+    for awal in range(0, len(df), ukuran):
+        yield df.iloc[awal:awal + ukuran]
+
+def tulis_parquet(df, tujuan, ukuran_blok=BARIS_PER_BLOK):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # skema dari blok pertama; kolom yang seluruhnya kosong di blok itu (tipe null) dianggap teks
+    skema = pa.Schema.from_pandas(df.iloc[:ukuran_blok], preserve_index=False)
+    for i, field in enumerate(skema):
+        if pa.types.is_null(field.type):
+            skema = skema.set(i, field.with_type(pa.string()))
+    with pq.ParquetWriter(tujuan, skema, compression='snappy') as writer:
+        for blok in _blok(df, ukuran_blok):
+            writer.write_table(pa.Table.from_pandas(blok, schema=skema, preserve_index=False))
+
+# Nama sheet Excel: maks. 31 karakter, tanpa karakter terlarang; tabel > batas baris dipecah "nama (2)", ...
+def _nama_sheet(nama, bagian):
+    nama = ''.join('_' if c in '[]:*?/\\' else c for c in str(nama))
+    akhiran = f" ({bagian + 1})" if bagian else ''
+    return nama[:31 - len(akhiran)] + akhiran
+
+# Nilai sel Excel: NaN/inf → kosong, categorical/objek → nilai Python biasa
+def _baris_excel(blok):
+    nilai = blok.astype(object)
+    kosong = blok.isna().to_numpy()
+    for kolom in blok.select_dtypes(include='number').columns:
+        kosong[:, blok.columns.get_loc(kolom)] |= np.isinf(blok[kolom].to_numpy(dtype=np.float64))
+    nilai = nilai.mask(kosong, None)
+    return nilai.itertuples(index=False, name=None)
+
+def tulis_xlsx(tabel, tujuan, ukuran_blok=BARIS_PER_BLOK):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for nama, df in tabel.items():
+        for bagian, awal in enumerate(range(0, max(len(df), 1), BARIS_MAKS_SHEET)):
+            ws = wb.create_sheet(_nama_sheet(nama, bagian))
+            ws.append([str(kolom) for kolom in df.columns])
+            for blok in _blok(df.iloc[awal:awal + BARIS_MAKS_SHEET], ukuran_blok):
+                for baris in _baris_excel(blok):
+                    ws.append(baris)
+    wb.save(tujuan)
+
+# Tulis bundel ZIP ke file sementara → file object siap dibaca (posisi 0).
+# Entri sudah terkompresi (Parquet snappy, xlsx = zip) → disimpan tanpa kompresi ulang.
+@terukur("Ekspor bundel")
+def ekspor_bundel(tabel, format_ekspor=FORMAT_EKSPOR, ukuran_blok=BARIS_PER_BLOK, tujuan=None):
+    tujuan = tujuan if tujuan is not None else tempfile.TemporaryFile()
+    manifest = {'waktu': time.strftime('%Y-%m-%dT%H:%M:%S'), 'tabel': {}}
+    with zipfile.ZipFile(tujuan, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        if 'parquet' in format_ekspor:
+            for nama, df in tabel.items():
+                with zf.open(f"parquet/{nama}.parquet", 'w', force_zip64=True) as f:
+                    tulis_parquet(df, f, ukuran_blok)
+        if 'xlsx' in format_ekspor and tabel:
+            with zf.open("hasil_kbs.xlsx", 'w', force_zip64=True) as f:
+                tulis_xlsx(tabel, f, ukuran_blok)
+        for nama, df in tabel.items():
+            manifest['tabel'][nama] = {'baris': len(df), 'kolom': [str(k) for k in df.columns]}
+        zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+    if isinstance(tujuan, io.IOBase):
+        tujuan.seek(0)
+    return tujuan
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from Engine_Instrumentasi import terukur
+
+KOLOM_EVALUASI = ['Layanan', 'Tahun', 'Aktual', 'Prediksi', 'MAE', 'RMSE', 'MAPE (%)', 'Validasi Akurasi']
+KOLOM_MASA_DEPAN = ['Layanan', 'Tahun', 'Prediksi', 'Aktual (Estimasi)', 'MAE', 'RMSE', 'MAPE (%)', 'Validasi Akurasi']
+
+# Batas atas (inklusif) tiap kategori MAPE, sejalan dengan evaluasi_mape_kategori
+BATAS_MAPE = [10, 20, 50]
+LABEL_AKURASI = np.array([
+    "Sangat Akurat (Highly Accurate)",
+    "Akurat (Good Forecast)",
+    "Cukup Akurat (Reasonable Forecast)",
+    "Tidak Akurat (Inaccurate Forecast)",
+], dtype=object)
+
+# Evaluasi akurasi berdasarkan MAPE
+def evaluasi_mape_kategori(mape):
+    if mape <= 10:
+        return "Sangat Akurat (Highly Accurate)"
+    elif mape <= 20:
+        return "Akurat (Good Forecast)"
+    elif mape <= 50:
+        return "Cukup Akurat (Reasonable Forecast)"
+    else:
+        return "Tidak Akurat (Inaccurate Forecast)"
+
+# Versi vektor: kategori MAPE lewat binning (NaN ikut kategori terakhir, sama seperti versi skalar)
+def kategori_mape(mape):
+    return LABEL_AKURASI[np.searchsorted(BATAS_MAPE, np.asarray(mape, dtype=np.float64), side='left')]
+
+# Error per tahun pada data historis (hanya tahun dengan aktual valid & ≠ 0)
+def evaluasi_historis(df_layanan):
+    df_error = df_layanan[df_layanan['Aktual'].notna() & (df_layanan['Aktual'] != 0)].copy()
+    df_error = df_error.drop_duplicates(subset='Tahun', keep='first')
+
+    df_error['Error Absolute'] = (df_error['Aktual'] - df_error['Prediksi']).abs()
+    df_error['Error Persentase (%)'] = ((df_error['Error Absolute'] / df_error['Aktual']) * 100).round(2)
+    df_error['MAE'] = df_error['Error Absolute']
+    df_error['RMSE'] = (df_error['Aktual'] - df_error['Prediksi']) ** 2
+    df_error['MAPE (%)'] = df_error['Error Persentase (%)']
+    df_error['Validasi Akurasi'] = kategori_mape(df_error['MAPE (%)'])
+    return df_error
+
+# Estimasi performa tahun mendatang memakai baseline aktual terakhir
+def evaluasi_masa_depan(df_layanan, df_error, layanan):
+    df_future = df_layanan[~df_layanan['Tahun'].isin(df_error['Tahun'])].copy()
+
+    baseline_aktual = df_error['Aktual'].iloc[-1] if not df_error.empty else 1
+    df_future['Aktual (Estimasi)'] = baseline_aktual
+    df_future['MAE'] = (df_future['Aktual (Estimasi)'] - df_future['Prediksi']).abs()
+    df_future['RMSE'] = (df_future['Aktual (Estimasi)'] - df_future['Prediksi']) ** 2
+    df_future['MAPE (%)'] = ((df_future['MAE'] / df_future['Aktual (Estimasi)']) * 100).round(2)
+    df_future['Validasi Akurasi'] = kategori_mape(df_future['MAPE (%)'])
+    df_future['Layanan'] = layanan
+    return df_future
+
+# Ringkasan akurasi rata-rata historis satu layanan (None bila tidak ada aktual valid)
+def ringkasan_global(df_error, layanan):
+    if df_error.empty:
+        return None
+    global_mae = df_error['MAE'].mean()
+    global_rmse = np.sqrt(df_error['RMSE'].mean())
+    global_mape = df_error['MAPE (%)'].mean()
+
+    return pd.DataFrame([{
+        "Layanan": layanan,
+        "MAE": round(global_mae, 2),
+        "RMSE": round(global_rmse, 2),
+        "MAPE (%)": round(global_mape, 2),
+        "Validasi Akurasi": evaluasi_mape_kategori(global_mape)
+    }])
+
+# Evaluasi historis seluruh layanan sekaligus (operasi kolom + satu groupby, tanpa loop per layanan)
+# → (tabel evaluasi per tahun, ringkasan per layanan), hasil identik dengan evaluasi_historis/ringkasan_global
+@terukur("Evaluasi historis")
+def evaluasi_semua_layanan(df_merge):
+    valid = df_merge['Aktual'].notna() & (df_merge['Aktual'] != 0)
+    df_error = (df_merge.loc[valid, ['Layanan', 'Tahun', 'Aktual', 'Prediksi']]
+                .drop_duplicates(subset=['Layanan', 'Tahun'], keep='first')
+                .sort_values('Layanan', kind='stable')
+                .reset_index(drop=True))
+
+    selisih = df_error['Aktual'] - df_error['Prediksi']
+    df_error['MAE'] = selisih.abs()
+    df_error['RMSE'] = selisih ** 2
+    df_error['MAPE (%)'] = ((df_error['MAE'] / df_error['Aktual']) * 100).round(2)
+    df_error['Validasi Akurasi'] = kategori_mape(df_error['MAPE (%)'])
+    df_eval = df_error[KOLOM_EVALUASI]
+
+    df_ringkasan = df_error.groupby('Layanan', sort=True, observed=True).agg(
+        MAE=('MAE', 'mean'), RMSE=('RMSE', 'mean'), MAPE=('MAPE (%)', 'mean')).reset_index()
+    df_ringkasan['RMSE'] = np.sqrt(df_ringkasan['RMSE'])
+    df_ringkasan = df_ringkasan.rename(columns={'MAPE': 'MAPE (%)'})
+    df_ringkasan['Validasi Akurasi'] = kategori_mape(df_ringkasan['MAPE (%)'])
+    df_ringkasan[['MAE', 'RMSE', 'MAPE (%)']] = df_ringkasan[['MAE', 'RMSE', 'MAPE (%)']].round(2)
+    return df_eval, df_ringkasan
+
+# Estimasi performa tahun mendatang seluruh layanan sekaligus: baseline = aktual valid terakhir
+# per layanan (1 bila tidak ada), dipakai untuk tahun yang tidak punya aktual valid
+@terukur("Evaluasi masa depan")
+def evaluasi_masa_depan_semua(df_merge, df_eval):
+    kunci_valid = pd.MultiIndex.from_frame(df_eval[['Layanan', 'Tahun']])
+    kunci = pd.MultiIndex.from_frame(df_merge[['Layanan', 'Tahun']])
+    df_future = df_merge.loc[~kunci.isin(kunci_valid), ['Layanan', 'Tahun', 'Prediksi']].reset_index(drop=True)
+
+    baseline = df_eval.groupby('Layanan', sort=False, observed=True)['Aktual'].last()
+    # Layanan kategorikal (objek bersama data_store) → map menghasilkan kategorikal; numerik dulu sebelum fillna
+    df_future['Aktual (Estimasi)'] = df_future['Layanan'].map(baseline).astype('float64').fillna(1)
+    df_future['MAE'] = (df_future['Aktual (Estimasi)'] - df_future['Prediksi']).abs()
+    df_future['RMSE'] = (df_future['Aktual (Estimasi)'] - df_future['Prediksi']) ** 2
+    df_future['MAPE (%)'] = ((df_future['MAE'] / df_future['Aktual (Estimasi)']) * 100).round(2)
+    df_future['Validasi Akurasi'] = kategori_mape(df_future['MAPE (%)'])
+    return df_future[KOLOM_MASA_DEPAN]
@@ -0,0 +1,222 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from Engine_Evaluasi import kategori_mape
+from Engine_Interval import geser_interval
+from Engine_Prediksi import prediksi_semua_layanan, susun_hasil_prediksi
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Tren import prediksi_tren_semua_layanan
+from Engine_Instrumentasi import terukur
+
+# Peramalan hierarkis: TOTAL nasional → (opsional) grup, mis. label klaster → layanan (daun).
+# Ramalan dasar tiap node direkonsiliasi sehingga koheren: jumlah daun = grup = TOTAL untuk setiap tahun.
+LABEL_METODE = {
+    'mint': "MinT (diagonal varians residual)",
+    'wls': "WLS struktural (bobot = jumlah layanan di node)",
+    'ols': "OLS (bobot seragam)",
+    'bottom_up': "Bottom-up (jumlah ramalan layanan)",
+    'top_down': "Top-down (proporsi historis dari TOTAL)",
+}
+NODE_TOTAL = 'TOTAL'
+GRUP_KOSONG = 'Tanpa Grup'
+
+# Struktur hierarki → (nama node atas, level node atas, matriks agregasi A sparse [n_atas × n_daun]).
+# Baris 0 selalu TOTAL; baris berikutnya satu per grup (bila grup diberikan).
+def struktur_hierarki(nama_daun, grup=None, nama_grup='Klaster'):
+    n_daun = len(nama_daun)
+    node, level = [NODE_TOTAL], [NODE_TOTAL]
+    baris, kolom = [np.zeros(n_daun, dtype=np.int64)], [np.arange(n_daun)]
+    if grup is not None:
+        label = pd.Series(nama_daun).map(grup).astype(object).where(lambda s: s.notna(), GRUP_KOSONG)
+        kode_grup, nama = pd.factorize(label.astype(str), sort=True)
+        node += [f"{nama_grup} {g}" for g in nama]
+        level += [nama_grup] * len(nama)
+        baris.append(1 + kode_grup)
+        kolom.append(np.arange(n_daun))
+    baris, kolom = np.concatenate(baris), np.concatenate(kolom)
+    A = sparse.csr_matrix((np.ones(len(baris)), (baris, kolom)), shape=(len(node), n_daun))
+    return node, level, A
+
+# Rekonsiliasi seluruh tahun sekaligus. Y_daun [n_daun × T] (NaN = layanan tanpa ramalan di tahun itu),
+# Y_atas [n_atas × T] ramalan dasar node atas. Metode MinT/WLS/OLS memakai bentuk koreksi galat koherensi
+#   b̃ = b̂ + W_b Aᵀ (W_u + A W_b Aᵀ)⁻¹ (û − A b̂)
+# sehingga yang dibalik hanya matriks kecil n_atas × n_atas per tahun (batched solve), bukan n_daun × n_daun.
+def rekonsiliasi(Y_daun, Y_atas, A, metode, w_daun=None, w_atas=None, proporsi=None):
+    ada = ~np.isnan(Y_daun)
+    Y_b = np.where(ada, Y_daun, 0.0)
+    if metode == 'bottom_up':
+        return np.where(ada, Y_b, np.nan)
+
+    if metode == 'top_down':
+        p = proporsi[:, None] * ada
+        total_p = p.sum(axis=0)
+        p = np.divide(p, total_p, out=np.zeros_like(p), where=total_p > 0)
+        # tahun tanpa ramalan dasar TOTAL → jatuh ke bottom-up
+        return np.where(ada, np.where(np.isnan(Y_atas[0]), Y_b, p * Y_atas[0]), np.nan)
+
+    W_b = w_daun[:, None] * ada  # sel tanpa ramalan berbobot 0 → tidak ikut dikoreksi
+    agregat = A @ Y_b
+    # node atas tanpa ramalan dasar di suatu tahun dianggap koheren (tidak memberi koreksi)
+    galat = np.where(np.isnan(Y_atas), 0.0, Y_atas - agregat)
+    M = np.stack([(A.multiply(W_b[:, t]) @ A.T).toarray() for t in range(Y_b.shape[1])])
+    M[:, np.arange(A.shape[0]), np.arange(A.shape[0])] += w_atas
+    lam = np.linalg.solve(M, galat.T[..., None])[..., 0]
+    return np.where(ada, Y_b + W_b * (A.T @ lam.T), np.nan)
+
+# Ramalan dasar node atas memakai engine yang sama dengan daun (dispatch lewat params['engine'])
+def ramal_node_atas(df_atas, params, n_workers=1, cache=None, layanan_col=LAYANAN_COL):
+    if params['engine'] == 'prophet':
+        gabungan_list, _ = prediksi_semua_layanan(df_atas, n_workers=n_workers, layanan_col=layanan_col,
+                                                  cache=cache, params=params)
+        return pd.concat(gabungan_list, ignore_index=True)
+    if params['engine'] == 'turnamen':
+        from Engine_Turnamen import prediksi_turnamen_semua_layanan
+        return prediksi_turnamen_semua_layanan(df_atas, params=params, n_workers=n_workers,
+                                               layanan_col=layanan_col, cache=cache)[0]
+    return prediksi_tren_semua_layanan(df_atas, params=params, layanan_col=layanan_col)[0]
+
+# Posisi kolom tahun di matriks [node × tahun]; cocok=False untuk tahun di luar tahun_unik
+def _posisi_tahun(tahun, tahun_unik):
+    tahun = np.asarray(tahun, dtype=np.int64)
+    posisi = np.minimum(np.searchsorted(tahun_unik, tahun), len(tahun_unik) - 1)
+    return posisi, tahun_unik[posisi] == tahun
+
+# MSE residual in-sample per baris matriks (dipakai sebagai varians MinT); nol/NaN diberi lantai kecil
+def _varians_residual(kode, n, aktual, prediksi):
+    valid = ~np.isnan(aktual) & ~np.isnan(prediksi)
+    jumlah = np.bincount(kode[valid], minlength=n)
+    sse = np.bincount(kode[valid], weights=(aktual[valid] - prediksi[valid]) ** 2, minlength=n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = sse / jumlah
+    lantai = max(np.nanmax(w, initial=0.0), 1.0) * 1e-9
+    return np.where(np.isfinite(w) & (w > lantai), w, lantai)
+
+# Evaluasi historis per layanan (rumus sama dengan jalur Prophet/tren). Baris ganda (Layanan, Tahun) dilewati:
+# pada jalur Prophet baris kedua adalah titik proyeksi akhir tahun yang ikut ter-merge dengan aktual;
+# sel tanpa ramalan (posisi inisialisasi ETS/ARIMA) juga dilewati.
+def _evaluasi_daun(nama_daun, kode, aktual, prediksi, pertama):
+    n_daun = len(nama_daun)
+    hist = ~np.isnan(aktual) & ~np.isnan(prediksi) & pertama
+    galat = aktual[hist] - prediksi[hist]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ape = np.abs(galat / aktual[hist])
+        n = np.bincount(kode[hist], minlength=n_daun)
+        mae = np.bincount(kode[hist], weights=np.abs(galat), minlength=n_daun) / n
+        rmse = np.sqrt(np.bincount(kode[hist], weights=galat ** 2, minlength=n_daun) / n)
+        mape = np.bincount(kode[hist], weights=ape, minlength=n_daun) / n * 100
+    return pd.DataFrame({
+        'Layanan': np.asarray(nama_daun, dtype=object),
+        'MAE': mae,
+        'RMSE': rmse,
+        'MAPE (%)': np.round(mape, 2),
+        'Validasi Akurasi': kategori_mape(mape),
+    })
+
+# Peramalan hierarkis dari ramalan dasar per layanan (df_prediksi: keluaran susun_hasil_prediksi atau
+# gabungan per layanan; baris TOTAL diabaikan). grup: Series layanan → label (mis. klaster) atau None.
+# → (df_prediksi_final berskema sama dengan jalur biasa, df_evaluasi per layanan, df_node level atas)
+@terukur("Rekonsiliasi hierarki")
+def prediksi_hierarki(df_long, df_prediksi, params, metode='mint', grup=None, nama_grup='Klaster',
+                      n_workers=1, cache=None, layanan_col=LAYANAN_COL):
+    if metode not in LABEL_METODE:
+        raise ValueError(f"Metode rekonsiliasi tidak dikenal: {metode}")
+    df_daun = df_prediksi[df_prediksi['Layanan'] != NODE_TOTAL].reset_index(drop=True)
+    kode, nama_daun = pd.factorize(df_daun['Layanan'], sort=False)
+    tahun_unik, kode_tahun = np.unique(df_daun['Tahun'].to_numpy(dtype=np.int64), return_inverse=True)
+    n_daun, n_tahun = len(nama_daun), len(tahun_unik)
+    prediksi = df_daun['Prediksi'].to_numpy(dtype=np.float64)
+    aktual = df_daun['Aktual'].to_numpy(dtype=np.float64)
+
+    # baris ganda (Layanan, Tahun) → yang pertama dipakai, sama seperti agregasi TOTAL di susun_hasil_prediksi
+    pertama = ~df_daun.duplicated(subset=['Layanan', 'Tahun'], keep='first').to_numpy()
+    Y_daun = np.full((n_daun, n_tahun), np.nan)
+    Y_daun[kode[pertama], kode_tahun[pertama]] = prediksi[pertama]
+    node, level, A = struktur_hierarki(nama_daun, grup, nama_grup)
+
+    # === SERI & RAMALAN DASAR NODE ATAS (bottom-up tidak memerlukannya)
+    label_node = np.asarray(node, dtype=object)
+    df_hist = df_long[df_long[layanan_col].notna()]
+    kode_hist = pd.Index(nama_daun).get_indexer(df_hist[layanan_col])
+    df_hist = df_hist[kode_hist >= 0]
+    kode_hist = kode_hist[kode_hist >= 0]
+    A_coo = A.T.tocoo()  # daun → node atas
+    pasangan = pd.DataFrame({'daun': A_coo.row, 'node': A_coo.col})
+    df_seri = (pd.DataFrame({'daun': kode_hist, 'Tahun': df_hist['Tahun'].to_numpy(dtype=np.int64),
+                             'Jumlah': df_hist['Jumlah'].to_numpy(dtype=np.float64)})
+               .merge(pasangan, on='daun')
+               .groupby(['node', 'Tahun'], sort=True)['Jumlah'].sum().reset_index())
+    df_seri[layanan_col] = label_node[df_seri['node']]
+
+    Y_atas = np.full((len(node), n_tahun), np.nan)
+    aktual_atas = np.full((len(node), n_tahun), np.nan)
+    posisi, cocok = _posisi_tahun(df_seri['Tahun'], tahun_unik)
+    aktual_atas[df_seri['node'].to_numpy()[cocok], posisi[cocok]] = df_seri['Jumlah'].to_numpy()[cocok]
+
+    if metode != 'bottom_up':
+        df_seri_atas = df_seri if metode != 'top_down' else df_seri[df_seri['node'] == 0]
+        df_atas = ramal_node_atas(df_seri_atas[[layanan_col, 'Tahun', 'Jumlah']], params,
+                                  n_workers=n_workers, cache=cache, layanan_col=layanan_col)
+        df_atas = df_atas.drop_duplicates(subset=['Layanan', 'Tahun'], keep='first')
+        baris_node = pd.Index(node).get_indexer(df_atas['Layanan'])
+        posisi, cocok = _posisi_tahun(df_atas['Tahun'], tahun_unik)
+        cocok &= baris_node >= 0
+        Y_atas[baris_node[cocok], posisi[cocok]] = df_atas['Prediksi'].to_numpy(dtype=np.float64)[cocok]
+
+    # === BOBOT & REKONSILIASI
+    w_daun = w_atas = proporsi = None
+    if metode == 'ols':
+        w_daun, w_atas = np.ones(n_daun), np.ones(len(node))
+    elif metode == 'wls':
+        w_daun, w_atas = np.ones(n_daun), np.asarray(A.sum(axis=1)).ravel()
+    elif metode == 'mint':
+        w_daun = _varians_residual(kode, n_daun, aktual, prediksi)
+        baris, kolom = np.nonzero(~np.isnan(aktual_atas) & ~np.isnan(Y_atas))
+        w_atas = _varians_residual(baris, len(node), aktual_atas[baris, kolom], Y_atas[baris, kolom])
+    elif metode == 'top_down':
+        # proporsi historis (Gross–Sohl): Σ aktual layanan / Σ aktual TOTAL
+        proporsi = np.bincount(kode_hist, weights=df_hist['Jumlah'].to_numpy(dtype=np.float64), minlength=n_daun)
+        proporsi = proporsi / proporsi.sum() if proporsi.sum() > 0 else np.full(n_daun, 1.0 / n_daun)
+
+    Y_rekon = rekonsiliasi(Y_daun, Y_atas, A, metode, w_daun, w_atas, proporsi)
+    ada = ~np.isnan(Y_rekon)
+    Y_atas_rekon = np.where((A @ ada) > 0, A @ np.where(ada, Y_rekon, 0.0), np.nan)
+
+    # === SUSUN HASIL: skema daun & TOTAL identik dengan jalur non-hierarkis
+    # koreksi rekonsiliasi tiap sel ikut diterapkan pada baris gandanya dan pada interval prediksinya
+    # (interval digeser sejauh koreksi, lebar interval ramalan dasar dipertahankan)
+    koreksi = (Y_rekon - Y_daun)[kode, kode_tahun]
+    df_daun = geser_interval(df_daun.assign(Prediksi=prediksi + koreksi), koreksi)
+    df_evaluasi = _evaluasi_daun(nama_daun, kode, aktual, df_daun['Prediksi'].to_numpy(dtype=np.float64),
+                                 pertama)
+    df_prediksi_final, _ = susun_hasil_prediksi([df_daun], [])
+
+    n_atas = len(node)
+    df_node = pd.DataFrame({
+        'Level': np.repeat(np.asarray(level, dtype=object), n_tahun),
+        'Node': np.repeat(label_node, n_tahun),
+        'Tahun': np.tile(tahun_unik, n_atas).astype(np.int32),
+        'Aktual': aktual_atas.ravel(),
+        'Prediksi Dasar': Y_atas.ravel(),
+        'Prediksi': Y_atas_rekon.ravel(),
+    })
+    df_node = df_node[df_node['Prediksi'].notna()].reset_index(drop=True)
+    return df_prediksi_final, df_evaluasi, df_node
+
+# MAPE historis per level sebelum vs sesudah rekonsiliasi (level atas dari df_node, daun dari tabel evaluasi)
+def ringkasan_hierarki(df_node, df_evaluasi_dasar, df_evaluasi):
+    hist = df_node[df_node['Aktual'].notna() & (df_node['Aktual'] != 0)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ape_dasar = (hist['Aktual'] - hist['Prediksi Dasar']).abs() / hist['Aktual'] * 100
+        ape = (hist['Aktual'] - hist['Prediksi']).abs() / hist['Aktual'] * 100
+    df_ringkasan = (hist[['Level', 'Node']].assign(Dasar=ape_dasar, Rekonsiliasi=ape)
+                    .groupby('Level', sort=False).agg(
+                        **{'Jumlah Node': ('Node', 'nunique'), 'MAPE Dasar (%)': ('Dasar', 'mean'),
+                           'MAPE Rekonsiliasi (%)': ('Rekonsiliasi', 'mean')}).reset_index())
+    daun = pd.DataFrame([{
+        'Level': 'Layanan',
+        'Jumlah Node': len(df_evaluasi),
+        'MAPE Dasar (%)': df_evaluasi_dasar['MAPE (%)'].replace([np.inf, -np.inf], np.nan).mean(),
+        'MAPE Rekonsiliasi (%)': df_evaluasi['MAPE (%)'].replace([np.inf, -np.inf], np.nan).mean(),
+    }])
+    return pd.concat([df_ringkasan, daun], ignore_index=True).round(2)
@@ -0,0 +1,145 @@
+import os
+import json
+import pickle
+import hashlib
+import threading
+
+import pandas as pd
+
+from Engine_Cache import DIREKTORI_CACHE
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Prediksi import PARAM_PROPHET, prediksi_semua_layanan
+from Engine_Instrumentasi import terukur
+
+DIREKTORI_STATE = os.path.join(DIREKTORI_CACHE, 'state')
+MAKS_FILE_STATE = 50  # file state terlama (mtime) dihapus di atas batas ini
+
+STATUS_BARU = 'Baru'
+STATUS_BERTAMBAH = 'Bertambah Observasi'
+STATUS_BERUBAH = 'Berubah'
+STATUS_TETAP = 'Tetap'
+STATUS_DIHAPUS = 'Dihapus'
+STATUS_REFIT = (STATUS_BARU, STATUS_BERTAMBAH, STATUS_BERUBAH)
+
+# Satu file state per identitas dataset (mis. nama file sumber) + parameter Prophet: versi berikutnya dari
+# dataset yang sama (kolom tahun baru) dibandingkan dengan run sebelumnya, dari sesi mana pun
+def path_state_dataset(identitas, params=PARAM_PROPHET, direktori=DIREKTORI_STATE):
+    h = hashlib.sha256(json.dumps({'dataset': identitas, 'params': params}, sort_keys=True, default=str).encode('utf-8'))
+    return os.path.join(direktori, f"prediksi_{h.hexdigest()[:32]}.pkl")
+
+# Batasi jumlah file state: yang paling lama tidak diperbarui dihapus (kecuali state yang sedang dipakai)
+def pangkas_state(kecuali=None, maks=MAKS_FILE_STATE, direktori=DIREKTORI_STATE):
+    try:
+        daftar = [os.path.join(direktori, f) for f in os.listdir(direktori)
+                  if f.startswith('prediksi_') and f.endswith('.pkl')]
+    except OSError:
+        return
+    daftar = [p for p in daftar if kecuali is None or os.path.abspath(p) != os.path.abspath(kecuali)]
+    sisa = maks - (kecuali is not None)
+    if len(daftar) <= sisa:
+        return
+    daftar.sort(key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0.0)
+    for path in daftar[:len(daftar) - sisa]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def muat_state(path_state):
+    try:
+        with open(path_state, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+def simpan_state(path_state, state):
+    os.makedirs(os.path.dirname(os.path.abspath(path_state)), exist_ok=True)
+    tmp = f"{path_state}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path_state)
+
+# Data long ringkas per (Layanan, Tahun) → dasar pembanding antar run
+def _ringkas(df, layanan_col):
+    return (df[[layanan_col, 'Tahun', 'Jumlah']]
+            .rename(columns={layanan_col: 'Layanan'})
+            .astype({'Layanan': object, 'Tahun': 'int64', 'Jumlah': 'float64'})
+            .groupby(['Layanan', 'Tahun'], sort=False, observed=True)['Jumlah']
+            .agg(['sum', 'count'])
+            .reset_index())
+
+# Bandingkan data run sebelumnya vs data baru, vektor per baris (Layanan, Tahun):
+# - Baru               : layanan belum ada di run sebelumnya
+# - Bertambah Observasi: hanya ada tahun baru (mis. kolom 2025 ditambahkan), nilai lama tetap
+# - Berubah            : ada nilai lama yang berubah / tahun lama yang hilang
+# - Tetap              : seri identik → model & metrik lama dipakai ulang
+# - Dihapus            : layanan tidak ada lagi di data baru
+def bandingkan_data(data_lama, data_baru):
+    if data_lama is None:
+        data_lama = data_baru.iloc[0:0]
+    m = data_baru.merge(data_lama, on=['Layanan', 'Tahun'], how='outer',
+                        suffixes=('_baru', '_lama'), indicator=True)
+    m['tambah'] = m['_merge'] == 'left_only'
+    m['hilang'] = m['_merge'] == 'right_only'
+    m['ubah'] = (m['_merge'] == 'both') & ((m['sum_baru'] != m['sum_lama']) | (m['count_baru'] != m['count_lama']))
+    m['ada_baru'] = m['_merge'] != 'right_only'
+    m['ada_lama'] = m['_merge'] != 'left_only'
+
+    per_layanan = m.groupby('Layanan', sort=False)[['tambah', 'hilang', 'ubah', 'ada_baru', 'ada_lama']].any()
+    per_layanan['Observasi Baru'] = m.groupby('Layanan', sort=False)['tambah'].sum()
+
+    status = pd.Series(STATUS_TETAP, index=per_layanan.index)
+    status[per_layanan['tambah']] = STATUS_BERTAMBAH
+    status[per_layanan['hilang'] | per_layanan['ubah']] = STATUS_BERUBAH
+    status[~per_layanan['ada_lama']] = STATUS_BARU
+    status[~per_layanan['ada_baru']] = STATUS_DIHAPUS
+
+    df_status = pd.DataFrame({'Layanan': per_layanan.index, 'Status': status.values,
+                              'Observasi Baru': per_layanan['Observasi Baru'].astype(int).values})
+    return df_status
+
+# Prediksi inkremental: hanya layanan Baru / Bertambah Observasi / Berubah yang di-fit ulang,
+# layanan Tetap memakai hasil tersimpan dari run sebelumnya. State baru disimpan setelah selesai.
+# Return (gabungan_list, eval_rows, df_status)
+@terukur("Prediksi inkremental")
+def prediksi_inkremental(df, path_state, n_workers=1, progress_callback=None,
+                         layanan_col=LAYANAN_COL, cache=None, params=PARAM_PROPHET, hasil_callback=None):
+    data_baru = _ringkas(df, layanan_col)
+    state = muat_state(path_state)
+    if state is None or state.get('params') != params:
+        state = {'params': params, 'data': None, 'hasil': {}}
+
+    df_status = bandingkan_data(state['data'], data_baru)
+    tersimpan = state['hasil']
+    # layanan "Tetap" tanpa hasil tersimpan (state tidak lengkap) tetap di-fit ulang
+    perlu_refit = df_status['Status'].isin(STATUS_REFIT) | (
+        (df_status['Status'] == STATUS_TETAP) & ~df_status['Layanan'].isin(list(tersimpan.keys())))
+    df_status.loc[perlu_refit & (df_status['Status'] == STATUS_TETAP), 'Status'] = STATUS_BERUBAH
+    layanan_refit = set(df_status.loc[perlu_refit, 'Layanan'])
+
+    df_refit = df[df[layanan_col].isin(layanan_refit)]
+    gabungan_refit, eval_refit = prediksi_semua_layanan(df_refit, n_workers=n_workers,
+                                                        progress_callback=progress_callback,
+                                                        layanan_col=layanan_col, cache=cache, params=params,
+                                                        hasil_callback=hasil_callback)
+    hasil_baru = {row['Layanan']: (gabung, row) for gabung, row in zip(gabungan_refit, eval_refit)}
+
+    # Susun ulang sesuai urutan kemunculan layanan di data baru
+    hasil = {}
+    for layanan in df[layanan_col].dropna().unique():
+        hasil[layanan] = hasil_baru[layanan] if layanan in hasil_baru else tersimpan[layanan]
+
+    simpan_state(path_state, {'params': params, 'data': data_baru, 'hasil': hasil})
+
+    gabungan_list = [gabung for gabung, _ in hasil.values()]
+    eval_rows = [eval_row for _, eval_row in hasil.values()]
+    return gabungan_list, eval_rows, df_status
+
+# Ringkasan jumlah layanan di-fit ulang vs dipakai ulang
+def ringkasan_inkremental(df_status):
+    aktif = df_status[df_status['Status'] != STATUS_DIHAPUS]
+    return {
+        'Di-fit Ulang': int(aktif['Status'].isin(STATUS_REFIT).sum()),
+        'Dipakai Ulang': int((aktif['Status'] == STATUS_TETAP).sum()),
+        'Dihapus': int((df_status['Status'] == STATUS_DIHAPUS).sum()),
+    }
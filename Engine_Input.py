@@ -0,0 +1,218 @@
+import io
+import os
+import json
+import hashlib
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from Engine_Cache import DIREKTORI_CACHE
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Instrumentasi import terukur
+
+DIREKTORI_CACHE_INPUT = os.path.join(DIREKTORI_CACHE, 'input')
+# Versi isi cache input; naikkan bila yang disimpan berubah (v2: catatan sel non-numerik di attrs)
+VERSI_CACHE_INPUT = 2
+
+# Kunci df.attrs: sel tahun non-numerik yang dikonversi menjadi NaN saat parsing
+ATTR_NON_NUMERIK = 'sel_non_numerik'
+
+# Sel non-numerik [[layanan, tahun, teks asli], ...] disimpan sebagai satu string JSON: attrs ikut
+# tersalin di setiap operasi pandas (string tidak perlu deep copy) dan ikut tersimpan di cache Parquet
+def catat_non_numerik(df, sel):
+    df.attrs[ATTR_NON_NUMERIK] = json.dumps(sel, ensure_ascii=False)
+
+def baca_non_numerik(df):
+    return json.loads(df.attrs.get(ATTR_NON_NUMERIK, '[]'))
+
+def hash_file(data_bytes):
+    return hashlib.sha256(data_bytes).hexdigest()
+
+def _nama_tahun(header):
+    if isinstance(header, float) and header.is_integer():
+        header = int(header)
+    teks = str(header).strip() if header is not None else ''
+    return teks if teks.isdigit() else None
+
+# Baca workbook secara streaming (openpyxl read-only, baris demi baris) dan hanya simpan
+# kolom identitas layanan + kolom tahun numerik. Kolom layanan = 'Layanan DJID' bila ada,
+# selain itu kolom pertama. Nilai tahun non-numerik dikonversi menjadi NaN dan dicatat di
+# df.attrs[ATTR_NON_NUMERIK] (lihat catat_non_numerik) untuk gerbang validasi data.
+@terukur("Parsing Excel (openpyxl)")
+def baca_excel_streaming(sumber, sheet=None):
+    if isinstance(sumber, (bytes, bytearray)):
+        sumber = io.BytesIO(sumber)
+    wb = load_workbook(sumber, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet is not None else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+
+        header = list(header)
+        idx_layanan = header.index(LAYANAN_COL) if LAYANAN_COL in header else 0
+        nama_layanan = str(header[idx_layanan]) if header[idx_layanan] is not None else LAYANAN_COL
+        kolom_tahun = [(i, _nama_tahun(h)) for i, h in enumerate(header) if i != idx_layanan]
+        kolom_tahun = [(i, nama) for i, nama in kolom_tahun if nama is not None]
+        idx_tahun = [i for i, _ in kolom_tahun]
+
+        layanan = []
+        nilai = []
+        for row in rows:
+            sel_layanan = row[idx_layanan] if idx_layanan < len(row) else None
+            sel_tahun = [row[i] if i < len(row) else None for i in idx_tahun]
+            if sel_layanan is None and all(v is None for v in sel_tahun):
+                continue  # baris kosong
+            layanan.append(sel_layanan)
+            nilai.append(sel_tahun)
+    finally:
+        wb.close()
+
+    # nama layanan dinormalisasi ke teks agar kolom bertipe tunggal (syarat format kolumnar)
+    layanan = [v if v is None or isinstance(v, str) else str(v) for v in layanan]
+    df = pd.DataFrame({nama_layanan: pd.Series(layanan, dtype=object)})
+    if idx_tahun:
+        matriks = pd.DataFrame(nilai, columns=[nama for _, nama in kolom_tahun], dtype=object)
+        numerik = matriks.apply(pd.to_numeric, errors='coerce').astype(np.float64)
+        baris, kolom = np.nonzero(matriks.notna().to_numpy() & numerik.isna().to_numpy())
+        df = pd.concat([df, numerik], axis=1)
+        catat_non_numerik(df, [[layanan[b], numerik.columns[k], str(matriks.iat[b, k])]
+                               for b, k in zip(baris, kolom)])
+    return df
+
+def _path_cache(kunci):
+    return os.path.join(DIREKTORI_CACHE_INPUT, f"{kunci}.v{VERSI_CACHE_INPUT}.parquet")
+
+# Muat dataset: cek cache kolumnar (Parquet) berdasarkan hash file, baca streaming bila belum ada.
+# Return (df, kunci_hash, dari_cache)
+def muat_dataset(data_bytes, sheet=None):
+    kunci = hash_file(data_bytes) if sheet is None else hash_file(data_bytes + str(sheet).encode('utf-8'))
+    path = _path_cache(kunci)
+    if os.path.exists(path):
+        try:
+            return pd.read_parquet(path), kunci, True
+        except (ImportError, OSError, ValueError, TypeError):
+            pass  # cache rusak / pyarrow tidak tersedia → baca ulang
+
+    df = baca_excel_streaming(data_bytes, sheet=sheet)
+    try:
+        os.makedirs(DIREKTORI_CACHE_INPUT, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+    except (ImportError, OSError, ValueError, TypeError):
+        pass  # tanpa cache kolumnar, dataset tetap bisa dipakai
+    return df, kunci, False
+
+# === MULTI-FILE / MULTI-SHEET
+# Aturan konflik bila pasangan (layanan, tahun) yang sama terisi di lebih dari satu sumber
+ATURAN_KONFLIK = {
+    'terakhir': "Sumber terakhir menang (urutan unggah)",
+    'pertama': "Sumber pertama menang",
+    'jumlah': "Jumlahkan (mis. satu workbook per wilayah)",
+    'maksimum': "Nilai terbesar",
+    'rata-rata': "Rata-rata antar sumber",
+}
+
+def daftar_sheet(data_bytes):
+    wb = load_workbook(io.BytesIO(data_bytes), read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+def _muat_tugas(tugas):
+    data_bytes, sheet = tugas
+    df, _, dari_cache = muat_dataset(data_bytes, sheet=sheet)
+    return df, dari_cache
+
+# Parsing banyak (file, sheet) paralel di worker proses; sumber = [(label, data_bytes, sheet), ...].
+# Urutan hasil mengikuti urutan sumber (penting untuk aturan 'pertama'/'terakhir'), apa pun urutan selesainya.
+@terukur("Parsing multi-sumber")
+def muat_banyak(sumber, n_workers=1, progress_callback=None):
+    total = len(sumber)
+    hasil = [None] * total
+    if n_workers <= 1 or total <= 1:
+        for i, (label, data_bytes, sheet) in enumerate(sumber):
+            hasil[i] = _muat_tugas((data_bytes, sheet))
+            if progress_callback:
+                progress_callback(i + 1, total, label)
+        return hasil
+
+    # 'spawn' agar aman dipanggil dari thread server Streamlit (sama seperti fit Prophet paralel)
+    ctx = mp.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(n_workers, total), mp_context=ctx) as executor:
+        futures = {executor.submit(_muat_tugas, (data_bytes, sheet)): i
+                   for i, (_, data_bytes, sheet) in enumerate(sumber)}
+        for selesai, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            hasil[i] = future.result()
+            if progress_callback:
+                progress_callback(selesai, total, sumber[i][0])
+    return hasil
+
+# Union beberapa tabel wide pada kolom layanan → (df_wide gabungan, laporan konflik).
+# Kolom layanan tiap sumber diseragamkan ke layanan_col; baris identik dalam satu sumber dibuang dulu.
+# Sel (layanan, tahun) yang terisi di >1 sumber diselesaikan dengan aturan; laporan hanya memuat sel
+# yang nilainya benar-benar berbeda antar sumber.
+@terukur("Gabung multi-sumber")
+def gabung_dataset(daftar_df, aturan='terakhir', layanan_col=LAYANAN_COL, label_sumber=None):
+    if aturan not in ATURAN_KONFLIK:
+        raise ValueError(f"Aturan konflik tidak dikenal: {aturan}")
+    label_sumber = label_sumber or [f"Sumber {i + 1}" for i in range(len(daftar_df))]
+
+    potongan, non_numerik = [], []
+    for urutan, df in enumerate(daftar_df):
+        if df is None or df.empty:
+            continue
+        non_numerik += baca_non_numerik(df)
+        kolom_layanan = layanan_col if layanan_col in df.columns else df.columns[0]
+        kolom_tahun = [k for k in df.columns if k != kolom_layanan and str(k).isdigit()]
+        df = df[[kolom_layanan] + kolom_tahun].drop_duplicates()
+        df_long = df.melt(id_vars=kolom_layanan, var_name='Tahun', value_name='Jumlah').dropna()
+        df_long = pd.DataFrame({
+            layanan_col: df_long[kolom_layanan].astype(object).to_numpy(),
+            'Tahun': df_long['Tahun'].astype(int).to_numpy(),
+            'Jumlah': df_long['Jumlah'].to_numpy(dtype=np.float64),
+        })
+        # layanan yang muncul berulang di SATU sumber dijumlahkan dulu (sama dengan pivot_table sum pada
+        # preprocessing); aturan konflik hanya berlaku antar sumber
+        df_long = df_long.groupby([layanan_col, 'Tahun'], sort=False, as_index=False)['Jumlah'].sum()
+        potongan.append(df_long.assign(Urutan=urutan))
+    kolom_konflik = [layanan_col, 'Tahun', 'Jumlah Sumber', 'Nilai Min', 'Nilai Maks', 'Sumber', 'Dipakai']
+    if not potongan:
+        return pd.DataFrame(columns=[layanan_col]), pd.DataFrame(columns=kolom_konflik)
+
+    df_semua = pd.concat(potongan, ignore_index=True)
+    df_semua = df_semua[df_semua[layanan_col].notna()]
+    kunci = [layanan_col, 'Tahun']
+    grup = df_semua.groupby(kunci, sort=False)
+    fungsi = {'terakhir': 'last', 'pertama': 'first', 'jumlah': 'sum', 'maksimum': 'max', 'rata-rata': 'mean'}[aturan]
+    df_hasil = grup['Jumlah'].agg(fungsi).reset_index()  # concat berurutan sumber → first/last = urutan sumber
+
+    # === LAPORAN KONFLIK (hanya sel dengan nilai berbeda antar sumber)
+    statistik = grup.agg(**{'Jumlah Sumber': ('Urutan', 'nunique'), 'Nilai Min': ('Jumlah', 'min'),
+                            'Nilai Maks': ('Jumlah', 'max')}).reset_index()
+    konflik = (statistik['Jumlah Sumber'] > 1) & (statistik['Nilai Min'] != statistik['Nilai Maks'])
+    df_konflik = statistik[konflik].reset_index(drop=True)
+    if not df_konflik.empty:
+        nama = np.asarray(label_sumber, dtype=object)
+        df_sumber = (df_semua.merge(df_konflik[kunci], on=kunci)
+                     .groupby(kunci, sort=False)['Urutan']
+                     .agg(lambda u: ', '.join(nama[sorted(set(u))])).rename('Sumber').reset_index())
+        df_konflik = df_konflik.merge(df_sumber, on=kunci, how='left').merge(
+            df_hasil.rename(columns={'Jumlah': 'Dipakai'}), on=kunci, how='left')
+    df_konflik = df_konflik.reindex(columns=kolom_konflik)
+
+    # === KEMBALI KE FORMAT WIDE (urutan layanan = kemunculan pertama, kolom tahun terurut)
+    urutan_layanan = pd.unique(df_semua[layanan_col])
+    df_wide = df_hasil.pivot(index=layanan_col, columns='Tahun', values='Jumlah').reindex(urutan_layanan)
+    df_wide.columns = [str(t) for t in df_wide.columns]
+    df_wide = df_wide.reset_index().rename(columns={'index': layanan_col})
+    df_wide.columns.name = None
+    catat_non_numerik(df_wide, non_numerik)
+    return df_wide, df_konflik
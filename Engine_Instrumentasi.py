@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+# Instrumentasi ringan per tahap komputasi: waktu wall, waktu CPU dan selisih memori (RSS).
+# Profiler aktif disimpan per thread (setiap sesi Streamlit berjalan di thread-nya sendiri);
+# tanpa profiler aktif, tahap() hanya mengembalikan nullcontext → overhead praktis nol.
+PATH_LOG_DEFAULT = os.environ.get('KBS_PROFIL_LOG')
+
+_lokal = threading.local()
+_KOSONG = nullcontext()
+
+# RSS proses saat ini (MB): psutil bila terpasang, selain itu /proc/self/statm (Linux), atau None
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class Profiler:
+    def __init__(self, nama_run):
+        self.nama_run = nama_run
+        self.catatan = []
+        self._kedalaman = 0
+        self.t0 = time.perf_counter()
+        self.waktu_mulai = time.strftime('%Y-%m-%dT%H:%M:%S')
+
+    @contextmanager
+    def tahap(self, nama):
+        baris = {'Tahap': nama, 'Level': self._kedalaman}
+        self.catatan.append(baris)  # dicatat saat masuk agar urutan mengikuti urutan eksekusi
+        self._kedalaman += 1
+        rss0 = rss_mb()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            baris['Wall (s)'] = time.perf_counter() - wall0
+            baris['CPU (s)'] = time.process_time() - cpu0
+            rss1 = rss_mb()
+            baris['Δ Memori (MB)'] = rss1 - rss0 if rss0 is not None and rss1 is not None else None
+            baris['RSS (MB)'] = rss1
+            self._kedalaman -= 1
+
+    def ringkasan(self):
+        kolom = ['Tahap', 'Level', 'Wall (s)', 'CPU (s)', 'Δ Memori (MB)', 'RSS (MB)']
+        df = pd.DataFrame(self.catatan, columns=kolom)
+        df['Tahap'] = [('  ' * (level - 1) + '└ ' if level else '') + nama for nama, level in zip(df['Tahap'], df['Level'])]
+        return df.drop(columns='Level').round(3)
+
+    def total_detik(self):
+        return time.perf_counter() - self.t0
+
+    def ke_json(self):
+        return json.dumps({
+            'waktu': self.waktu_mulai,
+            'run': self.nama_run,
+            'total_detik': round(self.total_detik(), 4),
+            'tahap': [{k: (round(v, 4) if isinstance(v, float) else v) for k, v in c.items()} for c in self.catatan],
+        }, ensure_ascii=False, default=str)
+
+    # Satu baris JSON per run (format JSON Lines), cocok untuk dikirim ke sistem monitoring
+    def ekspor(self, path=PATH_LOG_DEFAULT):
+        if not path:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(self.ke_json() + '\n')
+        return path
+
+# Mulai run baru di thread ini; aktif=False → tidak ada profiler (semua tahap menjadi no-op)
+def mulai_profil(nama_run, aktif=True):
+    _lokal.profiler = Profiler(nama_run) if aktif else None
+    return _lokal.profiler
+
+def profiler_aktif():
+    return getattr(_lokal, 'profiler', None)
+
+# Bungkus satu tahap komputasi:  with tahap("Fit Prophet"): ...
+def tahap(nama):
+    profiler = getattr(_lokal, 'profiler', None)
+    if profiler is None:
+        return _KOSONG
+    return profiler.tahap(nama)
+
+# Dekorator untuk fungsi engine: setiap pemanggilan dicatat sebagai satu tahap
+def terukur(nama):
+    def dekorator(fungsi):
+        @functools.wraps(fungsi)
+        def pembungkus(*args, **kwargs):
+            with tahap(nama):
+                return fungsi(*args, **kwargs)
+        return pembungkus
+    return dekorator
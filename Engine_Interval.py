@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# Interval prediksi pada beberapa tingkat sekaligus (params['interval'], mis. 80% & 95%).
+# Setiap tingkat disimpan sebagai sepasang kolom float32 'Bawah 80%' / 'Atas 80%' di tabel prediksi yang
+# sama dengan titik ramalan (satu baris per layanan-tahun) → grafik, rekonsiliasi & ekspor cukup membaca
+# kolomnya, tanpa fit atau predict ulang model.
+TINGKAT_INTERVAL = (0.8, 0.95)
+
+def label_tingkat(tingkat):
+    return f"{tingkat * 100:g}%"
+
+def kolom_interval(tingkat):
+    label = label_tingkat(tingkat)
+    return f"Bawah {label}", f"Atas {label}"
+
+def kolom_semua_interval(daftar_tingkat):
+    return [kolom for tingkat in daftar_tingkat for kolom in kolom_interval(tingkat)]
+
+# Tingkat interval yang tersedia di tabel prediksi → [(tingkat, kolom bawah, kolom atas)] urut naik
+def tingkat_tersedia(df):
+    hasil = []
+    for kolom in df.columns:
+        if isinstance(kolom, str) and kolom.startswith('Bawah ') and kolom.endswith('%'):
+            tingkat = float(kolom[len('Bawah '):-1]) / 100
+            bawah, atas = kolom_interval(tingkat)
+            if atas in df.columns:
+                hasil.append((tingkat, bawah, atas))
+    return sorted(hasil)
+
+# Seluruh tingkat dari satu matriks sampel prediktif [n_baris × n_sampel]: satu pemanggilan np.quantile
+def interval_dari_sampel(sampel, daftar_tingkat):
+    if not daftar_tingkat:
+        return {}
+    q = [p for tingkat in daftar_tingkat for p in ((1 - tingkat) / 2, (1 + tingkat) / 2)]
+    nilai = np.quantile(sampel, q, axis=1)
+    return {kolom: nilai[i].astype(np.float32) for i, kolom in enumerate(kolom_semua_interval(daftar_tingkat))}
+
+# Interval simetris prediksi ± t(df) · galat baku (vektor untuk seluruh baris); df ≤ 0 → NaN
+def interval_t(prediksi, galat_baku, derajat_bebas, daftar_tingkat):
+    from scipy.stats import t as distribusi_t
+
+    hasil = {}
+    # derajat bebas hanya bernilai sedikit (jumlah tahun - 2) → kuantil t dihitung per nilai unik lalu dipetakan
+    unik, posisi = np.unique(np.asarray(derajat_bebas, dtype=np.float64), return_inverse=True)
+    valid = unik > 0
+    for tingkat in daftar_tingkat:
+        kritis_unik = np.full(len(unik), np.nan)
+        kritis_unik[valid] = distribusi_t.ppf((1 + tingkat) / 2, unik[valid])
+        kritis = kritis_unik[posisi]
+        bawah, atas = kolom_interval(tingkat)
+        hasil[bawah] = (prediksi - kritis * galat_baku).astype(np.float32)
+        hasil[atas] = (prediksi + kritis * galat_baku).astype(np.float32)
+    return hasil
+
+# Interval agregat (mis. TOTAL per tahun) dari interval komponen: setengah lebar bawah/atas digabung
+# dengan akar jumlah kuadrat (galat antar layanan diasumsikan independen) di sekitar jumlah prediksi.
+# df: baris komponen (Prediksi + kolom interval); → DataFrame per kunci berisi kolom interval
+def agregasi_interval(df, kunci, prediksi_agregat):
+    hasil = pd.DataFrame(index=prediksi_agregat.index)
+    prediksi = df['Prediksi'].to_numpy(dtype=np.float64)
+    for _, bawah, atas in tingkat_tersedia(df):
+        kuadrat = pd.DataFrame({
+            'bawah': (prediksi - df[bawah].to_numpy(dtype=np.float64)) ** 2,
+            'atas': (df[atas].to_numpy(dtype=np.float64) - prediksi) ** 2,
+        }).groupby(df[kunci].to_numpy()).sum(min_count=1)
+        kuadrat = kuadrat.reindex(prediksi_agregat.index)
+        hasil[bawah] = (prediksi_agregat - np.sqrt(kuadrat['bawah'])).astype(np.float32)
+        hasil[atas] = (prediksi_agregat + np.sqrt(kuadrat['atas'])).astype(np.float32)
+    return hasil
+
+# Geser seluruh interval sejauh koreksi titik ramalan (mis. hasil rekonsiliasi hierarki), lebar tetap
+def geser_interval(df, selisih):
+    kolom = {}
+    for _, bawah, atas in tingkat_tersedia(df):
+        kolom[bawah] = (df[bawah].to_numpy(dtype=np.float64) + selisih).astype(np.float32)
+        kolom[atas] = (df[atas].to_numpy(dtype=np.float64) + selisih).astype(np.float32)
+    return df.assign(**kolom) if kolom else df
@@ -0,0 +1,202 @@
+import os
+import time
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# Antrean job latar belakang lintas sesi: komputasi berat (Prophet, sweep klaster) berjalan di thread
+# worker milik proses server, bukan di thread skrip Streamlit. Permintaan identik (dataset + parameter)
+# dari sesi mana pun digabung ke satu job yang sama. Opsional: status & hasil dicatat di SQLite lokal
+# (KBS_JOB_DB) sehingga hasil bertahan setelah restart dan terlihat oleh proses server lain.
+PATH_DB_DEFAULT = os.environ.get('KBS_JOB_DB')
+N_WORKER_DEFAULT = int(os.environ.get('KBS_JOB_WORKER', '1'))
+
+STATUS_ANTRE = 'Antre'
+STATUS_BERJALAN = 'Berjalan'
+STATUS_SELESAI = 'Selesai'
+STATUS_GAGAL = 'Gagal'
+
+# Job "Berjalan" di proses lain dianggap basi (proses mati) bila tidak diperbarui selama ini
+BATAS_BASI_DETIK = 600
+
+class Job:
+    def __init__(self, kunci, nama, antrean=None):
+        self.kunci = kunci
+        self.nama = nama
+        self.status = STATUS_ANTRE
+        self.selesai = 0
+        self.total = 0
+        self.label = ''
+        self.parsial = []
+        self.hasil = None
+        self.error = None
+        self.dibuat = time.time()
+        self.diperbarui = self.dibuat
+        self.jarak_jauh = False  # dijalankan proses server lain, status dibaca dari SQLite
+        self._antrean = antrean
+        self._lock = threading.Lock()
+
+    @property
+    def aktif(self):
+        return self.status in (STATUS_ANTRE, STATUS_BERJALAN)
+
+    # Dipakai sebagai progress_callback(selesai, total, label) oleh fungsi engine
+    def progres(self, selesai, total, label=''):
+        with self._lock:
+            self.selesai, self.total, self.label = selesai, total, str(label)
+            self.diperbarui = time.time()
+        if self._antrean is not None:
+            self._antrean._catat_db(self, hanya_progres=True)
+
+    # Hasil parsial (mis. satu layanan selesai) agar UI bisa menampilkan hasil sebelum job tuntas
+    def tambah_parsial(self, item):
+        with self._lock:
+            self.parsial.append(item)
+
+    def ambil_parsial(self):
+        with self._lock:
+            return list(self.parsial)
+
+    def ringkas(self):
+        return {
+            'Job': self.nama,
+            'Status': self.status,
+            'Progres': f"{self.selesai}/{self.total}" if self.total else '-',
+            'Durasi (s)': round(self.diperbarui - self.dibuat, 1),
+            'Sumber': 'Proses lain' if self.jarak_jauh else 'Proses ini',
+            'Error': self.error or '',
+        }
+
+class AntreanJob:
+    def __init__(self, n_worker=N_WORKER_DEFAULT, path_db=PATH_DB_DEFAULT, simpan_maks=50):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, n_worker), thread_name_prefix='kbs-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.simpan_maks = simpan_maks
+        self.path_db = path_db
+        self._catat_terakhir = {}
+        if path_db:
+            self._siapkan_db()
+
+    # === SQLITE (opsional)
+    def _koneksi(self):
+        return sqlite3.connect(self.path_db, timeout=30)
+
+    def _siapkan_db(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path_db)), exist_ok=True)
+        with self._koneksi() as con:
+            con.execute("""CREATE TABLE IF NOT EXISTS job (
+                kunci TEXT PRIMARY KEY, nama TEXT, status TEXT, selesai INTEGER, total INTEGER,
+                label TEXT, error TEXT, hasil BLOB, dibuat REAL, diperbarui REAL)""")
+
+    def _catat_db(self, job, hanya_progres=False):
+        if not self.path_db or job.jarak_jauh:
+            return
+        sekarang = time.time()
+        if hanya_progres and sekarang - self._catat_terakhir.get(job.kunci, 0) < 1:
+            return  # progres ditulis paling sering sekali per detik
+        self._catat_terakhir[job.kunci] = sekarang
+        hasil = pickle.dumps(job.hasil, protocol=pickle.HIGHEST_PROTOCOL) if job.status == STATUS_SELESAI else None
+        try:
+            with self._koneksi() as con:
+                con.execute("""INSERT OR REPLACE INTO job
+                    (kunci, nama, status, selesai, total, label, error, hasil, dibuat, diperbarui)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                            (job.kunci, job.nama, job.status, job.selesai, job.total, job.label,
+                             job.error, hasil, job.dibuat, sekarang))
+        except (sqlite3.Error, pickle.PicklingError):
+            pass  # SQLite hanya pelengkap; job tetap berjalan di memori
+
+    def _baca_db(self, kunci):
+        if not self.path_db:
+            return None
+        try:
+            with self._koneksi() as con:
+                return con.execute("""SELECT nama, status, selesai, total, label, error, hasil, dibuat, diperbarui
+                                      FROM job WHERE kunci = ?""", (kunci,)).fetchone()
+        except sqlite3.Error:
+            return None
+
+    def _job_dari_db(self, kunci, baris):
+        nama, status, selesai, total, label, error, hasil, dibuat, diperbarui = baris
+        job = Job(kunci, nama)
+        job.status, job.selesai, job.total, job.label, job.error = status, selesai, total, label, error
+        job.dibuat, job.diperbarui = dibuat, diperbarui
+        job.jarak_jauh = status != STATUS_SELESAI
+        if status == STATUS_SELESAI and hasil is not None:
+            try:
+                job.hasil = pickle.loads(hasil)
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                return None
+        return job
+
+    # === ANTREAN
+    # Kirim job: bila job dengan kunci yang sama sudah ada (antre/berjalan/selesai/gagal) dipakai ulang.
+    # Job gagal tetap disimpan (beserta error-nya) dan baru dijalankan ulang bila coba_ulang=True, agar
+    # rerun halaman tidak mengirim ulang fit yang gagal tanpa henti.
+    # fungsi dipanggil sebagai fungsi(job, *args, **kwargs) di thread worker.
+    def kirim(self, kunci, nama, fungsi, *args, coba_ulang=False, **kwargs):
+        with self._lock:
+            job = self._jobs.get(kunci)
+            if job is not None and not (coba_ulang and job.status == STATUS_GAGAL):
+                return self.segarkan(job)
+
+            baris = self._baca_db(kunci)
+            if baris is not None:
+                job = self._job_dari_db(kunci, baris)
+                basi = job is not None and (
+                    (coba_ulang and job.status == STATUS_GAGAL) or
+                    (job.aktif and time.time() - job.diperbarui > BATAS_BASI_DETIK))
+                if job is not None and not basi:
+                    self._jobs[kunci] = job
+                    return job
+
+            job = Job(kunci, nama, antrean=self)
+            self._jobs[kunci] = job
+            self._buang_lama()
+        self._catat_db(job)
+        self._executor.submit(self._jalankan, job, fungsi, args, kwargs)
+        return job
+
+    def _jalankan(self, job, fungsi, args, kwargs):
+        job.status = STATUS_BERJALAN
+        self._catat_db(job)
+        try:
+            job.hasil = fungsi(job, *args, **kwargs)
+            job.status = STATUS_SELESAI
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = STATUS_GAGAL
+        job.diperbarui = time.time()
+        self._catat_db(job)
+
+    # Job milik proses lain: baca ulang status/hasil terbaru dari SQLite
+    def segarkan(self, job):
+        if job.jarak_jauh:
+            baris = self._baca_db(job.kunci)
+            baru = self._job_dari_db(job.kunci, baris) if baris is not None else None
+            if baru is not None:
+                self._jobs[job.kunci] = baru
+                return baru
+        return job
+
+    def ambil(self, kunci):
+        job = self._jobs.get(kunci)
+        return self.segarkan(job) if job is not None else None
+
+    def _buang_lama(self):
+        selesai = [k for k, j in self._jobs.items() if not j.aktif]
+        for kunci in selesai[:max(0, len(self._jobs) - self.simpan_maks)]:
+            del self._jobs[kunci]
+
+    def daftar(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return pd.DataFrame([j.ringkas() for j in jobs],
+                            columns=['Job', 'Status', 'Progres', 'Durasi (s)', 'Sumber', 'Error'])
+
+antrean_job = AntreanJob()
@@ -0,0 +1,183 @@
+import os
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import numpy as np
+
+from Engine_Cache import kunci_seri
+from Engine_Evaluasi import evaluasi_mape_kategori
+from Engine_Interval import TINGKAT_INTERVAL, agregasi_interval, interval_dari_sampel
+from Engine_Preprocessing import LAYANAN_COL, iris_per_layanan
+from Engine_Instrumentasi import terukur
+
+# Parameter model Prophet (ikut menjadi bagian kunci cache prediksi)
+PARAM_PROPHET = {
+    'engine': 'prophet',
+    'yearly_seasonality': False,
+    'daily_seasonality': False,
+    'periods': 3,
+    'freq': 'Y',
+    'interval': list(TINGKAT_INTERVAL),  # tingkat interval prediksi; [] = tanpa interval
+    'sampel_interval': 1000,              # jumlah sampel prediktif (uncertainty_samples Prophet)
+}
+
+# Sampel prediktif Prophet memakai RNG global numpy → seed tetap (state RNG pemanggil dipulihkan)
+# agar interval identik antara eksekusi serial, paralel dan hasil cache.
+# Prophet tidak menerima Generator lokal (np.random.default_rng), jadi seed → sampel → pulihkan dijalankan
+# di bawah satu lock proses: fit dari beberapa thread (antrean job, sesi Streamlit) tidak saling menimpa state RNG.
+SEED_INTERVAL = 0
+_lock_rng = threading.Lock()
+
+# Fit Prophet untuk satu layanan → (tabel gabungan aktual+prediksi, baris evaluasi)
+def prediksi_satu_layanan(layanan, data_layanan, params=PARAM_PROPHET):
+    # Impor berat (prophet/cmdstanpy, sklearn) ditunda sampai benar-benar dipakai
+    from prophet import Prophet
+    from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+    data_layanan = data_layanan[['Tahun', 'Jumlah']].astype({'Jumlah': np.float64})
+    data_layanan.columns = ['Tahun', 'Aktual']
+    prophet_data = data_layanan.copy()
+    prophet_data.columns = ['ds', 'y']
+    prophet_data['ds'] = pd.to_datetime(prophet_data['ds'], format='%Y')
+
+    # Fit model Prophet
+    model = Prophet(yearly_seasonality=params['yearly_seasonality'],
+                    daily_seasonality=params['daily_seasonality'],
+                    uncertainty_samples=0)
+    model.fit(prophet_data)
+
+    # Prediksi 2 tahun ke depan. predict() tanpa simulasi bawaan (yang hanya memberi satu interval_width);
+    # seluruh tingkat interval diambil dari satu matriks sampel prediktif pada pass yang sama.
+    future = model.make_future_dataframe(periods=params['periods'], freq=params['freq'])
+    forecast = model.predict(future)
+    interval = {}
+    tingkat = params.get('interval', [])
+    if tingkat:
+        model.uncertainty_samples = params.get('sampel_interval', 1000)
+        with _lock_rng:
+            state_rng = np.random.get_state()
+            np.random.seed(SEED_INTERVAL)
+            try:
+                sampel = model.predictive_samples(future)['yhat']
+            finally:
+                np.random.set_state(state_rng)
+        interval = interval_dari_sampel(sampel, tingkat)
+
+    pred = forecast[['ds', 'yhat']].assign(**interval)
+    pred['Tahun'] = pred['ds'].dt.year
+    pred['Layanan'] = layanan
+    pred.rename(columns={'yhat': 'Prediksi'}, inplace=True)
+
+    # Gabungkan prediksi dengan aktual
+    gabung = pd.merge(pred[['Tahun', 'Layanan', 'Prediksi', *interval]], data_layanan, on=['Tahun'], how='left')
+    gabung = gabung[['Tahun', 'Layanan', 'Prediksi', 'Aktual', *interval]]
+
+    # Evaluasi model historis: forecast di atas sudah memuat tanggal historis → tanpa predict kedua
+    y_true = prophet_data['y'].values
+    y_pred = prophet_data[['ds']].merge(forecast[['ds', 'yhat']], on='ds', how='left')['yhat'].values
+    mae = mean_absolute_error(y_true, y_pred)
+    rmse = np.sqrt(mean_squared_error(y_true, y_pred))
+    mape = np.mean(np.abs((y_true - y_pred) / y_true)) * 100
+
+    eval_row = {
+        'Layanan': layanan,
+        'MAE': mae,
+        'RMSE': rmse,
+        'MAPE (%)': round(mape, 2),
+        'Validasi Akurasi': evaluasi_mape_kategori(mape)
+    }
+    return gabung, eval_row
+
+def _prediksi_tugas(tugas):
+    return prediksi_satu_layanan(*tugas)
+
+def jumlah_worker_default():
+    return os.cpu_count() or 1
+
+# Hasil dari cache disimpan tanpa terikat nama layanan → pasang ulang nama layanan saat diambil
+def _label_ulang(hasil, layanan):
+    gabung, eval_row = hasil
+    gabung = gabung.copy()
+    gabung['Layanan'] = layanan
+    return gabung, {**eval_row, 'Layanan': layanan}
+
+# Jalankan Prophet untuk seluruh layanan, serial (n_workers=1) atau paralel via process pool.
+# Urutan output selalu mengikuti urutan kemunculan layanan di df, apa pun urutan selesainya.
+# Jika cache diberikan, layanan yang serinya tidak berubah diambil dari cache tanpa refit.
+# hasil_callback(layanan, (gabung, eval_row)) dipanggil setiap satu layanan selesai (hasil parsial).
+@terukur("Fit Prophet")
+def prediksi_semua_layanan(df, n_workers=1, progress_callback=None, layanan_col=LAYANAN_COL,
+                           cache=None, params=PARAM_PROPHET, hasil_callback=None):
+    tugas = [(layanan, grup[['Tahun', 'Jumlah']], params)
+             for layanan, grup in iris_per_layanan(df, layanan_col)]
+    total = len(tugas)
+    hasil = [None] * total
+    selesai = 0
+
+    # === CEK CACHE
+    kunci = [None] * total
+    belum = []
+    for i, (layanan, data_layanan, _) in enumerate(tugas):
+        if cache is not None:
+            kunci[i] = kunci_seri(data_layanan['Tahun'].values, data_layanan['Jumlah'].values, params)
+            tersimpan = cache.get(kunci[i])
+            if tersimpan is not None:
+                hasil[i] = _label_ulang(tersimpan, layanan)
+                if hasil_callback:
+                    hasil_callback(layanan, hasil[i])
+                selesai += 1
+                if progress_callback:
+                    progress_callback(selesai, total, layanan)
+                continue
+        belum.append(i)
+
+    def simpan(i, h):
+        hasil[i] = h
+        if cache is not None:
+            cache.put(kunci[i], h)
+        if hasil_callback:
+            hasil_callback(tugas[i][0], h)
+
+    # === FIT LAYANAN YANG BELUM ADA DI CACHE
+    if n_workers <= 1 or len(belum) <= 1:
+        for i in belum:
+            simpan(i, _prediksi_tugas(tugas[i]))
+            selesai += 1
+            if progress_callback:
+                progress_callback(selesai, total, tugas[i][0])
+    else:
+        # 'spawn' agar aman dipanggil dari thread server Streamlit (fork + thread rawan deadlock)
+        ctx = mp.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(belum)), mp_context=ctx) as executor:
+            futures = {executor.submit(_prediksi_tugas, tugas[i]): i for i in belum}
+            for future in as_completed(futures):
+                i = futures[future]
+                simpan(i, future.result())
+                selesai += 1
+                if progress_callback:
+                    progress_callback(selesai, total, tugas[i][0])
+
+    gabungan_list = [gabung for gabung, _ in hasil]
+    eval_rows = [eval_row for _, eval_row in hasil]
+    return gabungan_list, eval_rows
+
+# 🔁 Susun tabel prediksi final (per layanan + TOTAL nasional) dan tabel evaluasi
+def susun_hasil_prediksi(gabungan_list, eval_rows):
+    df_prediksi = pd.concat(gabungan_list, ignore_index=True)
+    df_evaluasi = pd.DataFrame(eval_rows)
+
+    # 🔁 Agregasi total nasional
+    # tahun dengan layanan tanpa ramalan (mis. posisi inisialisasi ETS/ARIMA) → TOTAL prediksi NaN, bukan jumlah parsial
+    df_prediksi_clean = df_prediksi.drop_duplicates(subset=['Tahun', 'Layanan'], keep='first')
+    df_total_from_layanan = df_prediksi_clean.groupby('Tahun').agg({
+        'Aktual': lambda x: np.nan if x.isna().all() else x.dropna().sum(),
+        'Prediksi': lambda x: x.sum(skipna=False)
+    })
+    # interval TOTAL dari interval layanan (bukan sekadar dijumlahkan: lebar digabung akar jumlah kuadrat)
+    df_total_from_layanan = df_total_from_layanan.join(
+        agregasi_interval(df_prediksi_clean, 'Tahun', df_total_from_layanan['Prediksi'])).reset_index()
+    df_total_from_layanan.insert(0, 'Layanan', 'TOTAL')
+    df_prediksi_final = pd.concat([df_prediksi, df_total_from_layanan], ignore_index=True)
+    return df_prediksi_final, df_evaluasi
@@ -0,0 +1,210 @@
+import time
+import weakref
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from Engine_Instrumentasi import terukur
+
+LAYANAN_COL = 'Layanan DJID'
+
+# Indeks offset per layanan untuk DataFrame long ringkas: id(df) → (weakref df, kolom layanan, offset).
+# Hanya berlaku untuk objek yang persis sama; hasil filter/copy tidak mewarisi indeks.
+_indeks_layanan = {}
+
+# Jumlah baris per blok pada preprocessing satu lintasan
+UKURAN_BLOK_FUSI = 50_000
+
+# Pembersihan awal: buang baris duplikat & kolom yang seluruhnya kosong
+@terukur("Pembersihan (drop_duplicates/dropna)")
+def bersihkan_dataset(df):
+    df_cleaned = df.drop_duplicates()
+    df_cleaned = df_cleaned.dropna(how='all', axis=1)
+    return df_cleaned
+
+# Deteksi kolom tahun (nama kolom berupa angka: 2019, 2020, ...)
+def deteksi_kolom_tahun(df):
+    return [col for col in df.columns if str(col).isdigit()]
+
+# Transformasi wide → long (1 baris = 1 kombinasi Layanan-Tahun)
+@terukur("Wide → long (melt)")
+def wide_ke_long(df, layanan_col, year_columns):
+    df_long = df.melt(
+        id_vars=layanan_col,
+        value_vars=year_columns,
+        var_name='Tahun',
+        value_name='Jumlah'
+    )
+    df_long['Tahun'] = df_long['Tahun'].astype(int)
+    df_long = df_long.dropna()
+    return kompak_long(df_long, layanan_col)
+
+# Format long ringkas: kolom layanan categorical (urutan kemunculan), Tahun int16, Jumlah float32 bila
+# lossless. Baris diurutkan per layanan lalu tahun sehingga setiap layanan menempati satu blok baris
+# berurutan; offset blok didaftarkan agar irisan per layanan cukup iloc[a:b] (O(1), tanpa boolean mask).
+def kompak_long(df_long, layanan_col):
+    kode, nama_layanan = pd.factorize(df_long[layanan_col], sort=False)
+    tahun = df_long['Tahun'].to_numpy()
+    urut = np.lexsort((tahun, kode))
+    return _susun_long(kode[urut], nama_layanan, tahun[urut],
+                       df_long['Jumlah'].to_numpy(dtype=np.float64)[urut], layanan_col)
+
+# Bangun DataFrame long ringkas dari array yang sudah terurut per (kode layanan, tahun) + daftarkan offset
+def _susun_long(kode, nama_layanan, tahun, jumlah, layanan_col):
+    jumlah32 = jumlah.astype(np.float32)
+    df = pd.DataFrame({
+        layanan_col: pd.Categorical.from_codes(kode, categories=np.asarray(nama_layanan, dtype=object)),
+        'Tahun': tahun.astype(np.int16),
+        'Jumlah': jumlah32 if np.array_equal(jumlah32, jumlah, equal_nan=True) else jumlah,
+    })
+    offset = np.searchsorted(kode, np.arange(len(nama_layanan) + 1))
+    daftarkan_indeks_layanan(df, layanan_col, offset)
+    return df
+
+def daftarkan_indeks_layanan(df, layanan_col, offset):
+    kunci = id(df)
+    _indeks_layanan[kunci] = (weakref.ref(df, lambda _: _indeks_layanan.pop(kunci, None)), layanan_col, offset)
+
+# Offset blok per layanan (array panjang n_layanan + 1) atau None bila df bukan long ringkas terindeks
+def indeks_layanan(df, layanan_col=LAYANAN_COL):
+    entri = _indeks_layanan.get(id(df))
+    if entri is None or entri[0]() is not df or entri[1] != layanan_col:
+        return None
+    return entri[2]
+
+# Iterasi (layanan, data layanan) sesuai urutan kemunculan: irisan view O(1) bila df terindeks,
+# selain itu fallback ke groupby
+def iris_per_layanan(df, layanan_col=LAYANAN_COL):
+    offset = indeks_layanan(df, layanan_col)
+    if offset is None:
+        yield from df.groupby(layanan_col, sort=False, observed=True)
+        return
+    for layanan, awal, akhir in zip(df[layanan_col].cat.categories, offset[:-1], offset[1:]):
+        if akhir > awal:
+            yield layanan, df.iloc[awal:akhir]
+
+# Data satu layanan: O(1) via offset bila tersedia, selain itu boolean mask
+def data_layanan(df, layanan, layanan_col=LAYANAN_COL):
+    offset = indeks_layanan(df, layanan_col)
+    if offset is None:
+        return df[df[layanan_col] == layanan]
+    i = df[layanan_col].cat.categories.get_loc(layanan)
+    return df.iloc[offset[i]:offset[i + 1]]
+
+# Agregasi total jumlah layanan per tahun (tren makro nasional)
+@terukur("Agregasi per tahun")
+def agregasi_per_tahun(df_long):
+    # dijumlahkan dalam float64 agar total besar tetap presisi meski Jumlah disimpan float32
+    df_total = df_long['Jumlah'].astype(np.float64).groupby(df_long['Tahun']).sum().reset_index()
+    df_total.columns = ['Tahun', 'Total Jumlah Layanan']
+    return df_total
+
+# Preprocessing satu lintasan (fusi): dedup berbasis hash baris, deteksi kolom tahun, reshape wide → long
+# dan penyaringan sel kosong dikerjakan per blok baris langsung ke array (tanpa DataFrame antara
+# hasil drop_duplicates/dropna/melt). Hasil identik dengan rantai bersihkan_dataset → wide_ke_long:
+# urutan kategori layanan = kemunculan pertama dalam urutan melt (kolom tahun, lalu baris).
+# → (df_long ringkas, df_total, info pembersihan)
+@terukur("Preprocessing fusi (satu lintasan)")
+def preprocessing_fusi(df, layanan_col=LAYANAN_COL, ukuran_blok=UKURAN_BLOK_FUSI):
+    if layanan_col not in df.columns:
+        raise ValueError(f"Kolom identitas layanan '{layanan_col}' tidak ditemukan.")
+    kolom_tahun = deteksi_kolom_tahun(df)
+    tahun_kolom = np.array([int(k) for k in kolom_tahun], dtype=np.int16)
+    n = len(df)
+
+    # array per sel dibuat sesempit mungkin: kode int32, kolom int16, baris int32 (hanya sampai dedup)
+    hash_baris = np.empty(n, dtype=np.uint64)
+    kamus = {}
+    ada_nilai = np.zeros(len(kolom_tahun), dtype=bool)
+    potongan = []
+    for awal in range(0, n, ukuran_blok):
+        blok = df.iloc[awal:awal + ukuran_blok]
+        hash_baris[awal:awal + len(blok)] = pd.util.hash_pandas_object(blok, index=False).to_numpy()
+        kode_lokal, unik = pd.factorize(blok[layanan_col], sort=False)
+        peta = np.array([kamus.setdefault(u, len(kamus)) for u in unik], dtype=np.int32)
+        X = blok[kolom_tahun].to_numpy(dtype=np.float64)
+        terisi = ~np.isnan(X)
+        ada_nilai |= terisi.any(axis=0)
+        baris, kolom = np.nonzero(terisi & (kode_lokal >= 0)[:, None])
+        potongan.append([peta[kode_lokal[baris]], kolom.astype(np.int16), (baris + awal).astype(np.int32), X[baris, kolom]])
+        del X, terisi, baris, kolom
+
+    # sama dengan rantai lama: kolom layanan / kolom tahun yang seluruhnya kosong ikut dibuang
+    if not ada_nilai.any():
+        raise ValueError("Kolom tahun tidak ditemukan. Pastikan kolom tahun bernama 2019, 2020, dst.")
+    if not kamus:
+        raise ValueError(f"Kolom identitas layanan '{layanan_col}' tidak ditemukan.")
+
+    # dedup per potongan (tanpa salinan penuh sebelum saring) sekaligus catat posisi melt pertama
+    # tiap layanan (kolom * n + baris) untuk urutan kategori
+    unik_baris = ~pd.Series(hash_baris).duplicated(keep='first').to_numpy()
+    del hash_baris
+    pertama = np.full(len(kamus), np.iinfo(np.int64).max, dtype=np.int64)
+    for bagian in potongan:
+        kode_b, kolom_b, baris_b, jumlah_b = bagian
+        simpan = unik_baris[baris_b]
+        kode_b, kolom_b, baris_b = kode_b[simpan], kolom_b[simpan], baris_b[simpan]
+        np.minimum.at(pertama, kode_b, kolom_b.astype(np.int64) * n + baris_b)
+        bagian[:] = [kode_b, kolom_b, jumlah_b[simpan]]
+
+    # gabung satu field sekaligus, potongannya langsung dilepas → puncak ≈ satu field ganda
+    kode, kolom, jumlah = [], [], []
+    for i, hasil in enumerate((kode, kolom, jumlah)):
+        hasil.append(np.concatenate([bagian[i] for bagian in potongan]))
+        for bagian in potongan:
+            bagian[i] = None
+    del potongan
+    kode, kolom, jumlah = kode[0], kolom[0], jumlah[0]
+
+    # kode layanan diberi ulang sesuai kemunculan pertama dalam urutan melt
+    muncul = np.flatnonzero(pertama < np.iinfo(np.int64).max)
+    kode_urut_melt = muncul[np.argsort(pertama[muncul], kind='stable')]
+    kode_baru = np.zeros(len(kamus), dtype=np.int32)
+    kode_baru[kode_urut_melt] = np.arange(len(kode_urut_melt), dtype=np.int32)
+    nama_layanan = np.empty(len(kamus), dtype=object)
+    nama_layanan[list(kamus.values())] = list(kamus.keys())
+    np.take(kode_baru, kode, out=kode)
+    tahun = tahun_kolom[kolom]
+
+    # array terisi per blok baris → pengurutan stabil (layanan, tahun, kolom) sama dengan urutan melt
+    urut = np.lexsort((kolom, tahun, kode))
+    del kolom
+    df_long = _susun_long(kode[urut], nama_layanan[kode_urut_melt], tahun[urut], jumlah[urut], layanan_col)
+    info = {
+        'Baris Awal': n,
+        'Baris Duplikat': int(n - unik_baris.sum()),
+        'Kolom Tahun': int(ada_nilai.sum()),
+        'Kolom Tahun Kosong': int((~ada_nilai).sum()),
+        'Sel Terisi': len(df_long),
+    }
+    return df_long, agregasi_per_tahun(df_long), info
+
+# Seluruh tahap preprocessing sekaligus → (df_long, df_total); fusi=False memakai rantai langkah demi langkah
+def preprocessing_agregasi(df, layanan_col=LAYANAN_COL, fusi=True):
+    if fusi:
+        df_long, df_total, _ = preprocessing_fusi(df, layanan_col)
+        return df_long, df_total
+    df_cleaned = bersihkan_dataset(df)
+    year_columns = deteksi_kolom_tahun(df_cleaned)
+    if not year_columns:
+        raise ValueError("Kolom tahun tidak ditemukan. Pastikan kolom tahun bernama 2019, 2020, dst.")
+    if layanan_col not in df_cleaned.columns:
+        raise ValueError(f"Kolom identitas layanan '{layanan_col}' tidak ditemukan.")
+    df_long = wide_ke_long(df_cleaned, layanan_col, year_columns)
+    return df_long, agregasi_per_tahun(df_long)
+
+# Bandingkan rantai lama vs jalur fusi pada df yang sama: waktu (wall) & puncak memori (tracemalloc)
+def bandingkan_preprocessing(df, layanan_col=LAYANAN_COL):
+    baris, hasil = [], {}
+    for nama, fusi in (("Rantai lama (langkah demi langkah)", False), ("Fusi satu lintasan", True)):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        hasil[fusi] = preprocessing_agregasi(df, layanan_col, fusi=fusi)
+        detik = time.perf_counter() - t0
+        puncak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        baris.append({'Jalur': nama, 'Detik': round(detik, 4), 'Puncak Memori (MB)': round(puncak, 2)})
+    df_banding = pd.DataFrame(baris)
+    identik = hasil[False][0].equals(hasil[True][0]) and hasil[False][1].equals(hasil[True][1])
+    return df_banding, identik
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+from Engine_Backtest import siapkan_seri
+from Engine_Evaluasi import kategori_mape
+from Engine_Interval import TINGKAT_INTERVAL, interval_t
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Instrumentasi import terukur
+
+# Engine statistik klasik batch (tanpa statsmodels): seluruh layanan di-fit sekaligus di atas matriks
+# [layanan × posisi tahun]; loop Python hanya atas posisi tahun (≤ belasan), bukan atas layanan.
+#   ets   : Holt / tren aditif (ETS A,A,N); α & β dipilih per layanan lewat grid SSE galat satu langkah
+#   arima : ARIMA(1,1,0) + drift; φ & konstanta lewat kuadrat terkecil bersyarat pada selisih tahunan
+PARAM_STATISTIK = {
+    'engine': 'statistik',
+    'metode': 'ets',      # 'ets' | 'arima'
+    'periods': 2,         # jumlah tahun ke depan
+    'interval': list(TINGKAT_INTERVAL),  # tingkat interval prediksi; [] = tanpa interval
+}
+
+GRID_ALPHA = np.linspace(0.1, 0.9, 9)
+GRID_BETA = np.array([0.01, 0.1, 0.2, 0.35, 0.5])
+PHI_MAKS = 0.95        # |φ| dibatasi agar selisih tahunan tetap stasioner
+BLOK_GRID = 50_000     # layanan per blok saat grid search (membatasi matriks [grid × layanan])
+
+# Matriks [layanan × posisi] dari seri terurut (lihat Engine_Backtest.siapkan_seri); sel kosong = NaN
+def matriks_seri(kode, jumlah, posisi, panjang):
+    Y = np.full((len(panjang), int(panjang.max(initial=0))), np.nan)
+    Y[kode, posisi] = jumlah
+    return Y
+
+# Nilai pada posisi ke-p setiap baris (p < 0 → NaN)
+def _ambil(Y, p):
+    nilai = np.full(Y.shape[0], np.nan)
+    ada = p >= 0
+    nilai[ada] = Y[np.flatnonzero(ada), p[ada]]
+    return nilai
+
+# === ETS (HOLT)
+# Bentuk koreksi galat: e = y − (ℓ + b); ℓ ← ℓ + b + α·e; b ← b + α·β·e; inisialisasi ℓ₀ = y₀, b₀ = y₁ − y₀.
+# alpha/beta berbentuk [grid, 1] (seluruh kandidat sekaligus) atau [layanan] (parameter terpilih).
+# fit posisi 0 & 1 = NaN: keduanya identik dengan aktual karena inisialisasi, bukan ramalan.
+def _rekursi_ets(Y, panjang, alpha, beta, simpan_fit=False):
+    level = Y[:, 0] + np.zeros_like(alpha)
+    tren = np.nan_to_num(Y[:, 1] - Y[:, 0]) if Y.shape[1] > 1 else np.zeros(len(Y))
+    tren = tren + np.zeros_like(alpha)
+    sse = np.zeros_like(level)
+    fit = np.full(Y.shape, np.nan) if simpan_fit else None
+    for t in range(1, Y.shape[1]):
+        aktif = t < panjang
+        ramalan = level + tren
+        if simpan_fit and t > 1:
+            fit[:, t] = np.where(aktif, ramalan, np.nan)
+        galat = np.where(aktif, Y[:, t] - ramalan, 0.0)
+        sse += galat ** 2
+        level = np.where(aktif, ramalan + alpha * galat, level)
+        tren = np.where(aktif, tren + alpha * beta * galat, tren)
+    return level, tren, sse, fit
+
+def fit_ets_batch(Y, panjang):
+    a, b = (g.ravel()[:, None] for g in np.meshgrid(GRID_ALPHA, GRID_BETA, indexing='ij'))
+    alpha, beta = np.empty(len(Y)), np.empty(len(Y))
+    for awal in range(0, len(Y), BLOK_GRID):
+        blok = slice(awal, awal + BLOK_GRID)
+        _, _, sse, _ = _rekursi_ets(Y[blok], panjang[blok], a, b)
+        terbaik = np.argmin(sse, axis=0)
+        alpha[blok], beta[blok] = a[terbaik, 0], b[terbaik, 0]
+
+    level, tren, sse, fit = _rekursi_ets(Y, panjang, alpha, beta, simpan_fit=True)
+    # galat satu langkah bermakna mulai posisi 2; 2 parameter penghalusan ikut mengurangi derajat bebas
+    dof = panjang - 4.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.sqrt(sse / dof)
+    return {'alpha': alpha, 'beta': beta, 'level': level, 'tren': tren, 'sigma': sigma, 'dof': dof, 'fit': fit}
+
+# ŷ(L+h) = ℓ + h·b;  Var(h) = σ² · (1 + Σⱼ₌₁..ₕ₋₁ (α(1 + jβ))²)
+def ramal_ets(model, h):
+    langkah = np.arange(1, h + 1)
+    prediksi = model['level'][:, None] + model['tren'][:, None] * langkah
+    c = model['alpha'][:, None] * (1 + np.arange(1, h) * model['beta'][:, None])
+    faktor = np.sqrt(1 + np.concatenate([np.zeros((len(c), 1)), np.cumsum(c ** 2, axis=1)], axis=1))
+    return prediksi, model['sigma'][:, None] * faktor
+
+# === ARIMA(1,1,0) + DRIFT
+# Selisih d_t = y_t − y_{t−1};  d_t = c + φ·d_{t−1} + e_t  (regresi pasangan (d_{t−1}, d_t) per layanan).
+# Kurang dari 3 pasangan → φ = 0 (random walk dengan drift = rata-rata selisih).
+def fit_arima_batch(Y, panjang):
+    n, T = Y.shape
+    D = np.diff(Y, axis=1)
+    x, z = D[:, :-1], D[:, 1:]
+    pasangan = np.arange(max(T - 2, 0)) + 2 < panjang[:, None]
+    m = pasangan.sum(axis=1).astype(float)
+    xs, zs = np.where(pasangan, x, 0.0), np.where(pasangan, z, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_rata, z_rata = xs.sum(axis=1) / m, zs.sum(axis=1) / m
+        sxx = (np.where(pasangan, x - x_rata[:, None], 0.0) ** 2).sum(axis=1)
+        sxz = (np.where(pasangan, (x - x_rata[:, None]) * (z - z_rata[:, None]), 0.0)).sum(axis=1)
+        phi = np.where((m >= 3) & (sxx > 0), sxz / sxx, 0.0)
+        phi = np.clip(np.nan_to_num(phi), -PHI_MAKS, PHI_MAKS)
+        c = np.where(m > 0, z_rata - phi * x_rata, 0.0)
+        # seri 2 tahun: tanpa pasangan, drift = satu-satunya selisih
+        n_selisih = np.maximum(panjang - 1, 0)
+        total_selisih = np.where(np.arange(T - 1) < n_selisih[:, None], D, 0.0).sum(axis=1)
+        selisih_rata = np.where(n_selisih > 0, total_selisih / n_selisih, 0.0)
+        c = np.where(m == 0, selisih_rata, c)
+
+        galat = np.where(pasangan, z - c[:, None] - phi[:, None] * x, 0.0)
+        dof = m - 2
+        sigma = np.sqrt((galat ** 2).sum(axis=1) / dof)
+
+    # in-sample: posisi 0 = NaN (tanpa ramalan), posisi 1 = y₀ + rata-rata selisih jangka panjang c/(1−φ)
+    fit = np.full(Y.shape, np.nan)
+    if T > 1:
+        fit[:, 1] = Y[:, 0] + c / (1 - phi)
+    if T > 2:
+        fit[:, 2:] = Y[:, 1:-1] + c[:, None] + phi[:, None] * D[:, :-1]
+    fit[np.arange(T) >= panjang[:, None]] = np.nan
+
+    terakhir = panjang - 1
+    d_akhir = _ambil(D, terakhir - 1)
+    d_akhir = np.where(np.isnan(d_akhir), c / (1 - phi), d_akhir)
+    return {'c': c, 'phi': phi, 'y_akhir': _ambil(Y, terakhir), 'd_akhir': d_akhir,
+            'sigma': sigma, 'dof': dof, 'fit': fit}
+
+# ŷ(L+h) = ŷ(L+h−1) + c + φ·d(L+h−1);  Var(h) = σ² · Σⱼ₌₀..ₕ₋₁ ψⱼ²  dengan ψⱼ = 1 + φ + … + φʲ
+def ramal_arima(model, h):
+    c, phi = model['c'], model['phi']
+    y, d = model['y_akhir'].copy(), model['d_akhir'].copy()
+    prediksi = np.empty((len(c), h))
+    for j in range(h):
+        d = c + phi * d
+        y = y + d
+        prediksi[:, j] = y
+    psi = np.cumsum(phi[:, None] ** np.arange(h), axis=1)
+    return prediksi, model['sigma'][:, None] * np.sqrt(np.cumsum(psi ** 2, axis=1))
+
+FIT_STATISTIK = {
+    'ets': (fit_ets_batch, ramal_ets),
+    'arima': (fit_arima_batch, ramal_arima),
+}
+
+# Engine prediksi batch ETS / ARIMA: hasil berskema sama dengan jalur Prophet & tren
+# (df_prediksi: Tahun, Layanan, Prediksi, Aktual [+ interval]; df_evaluasi: Layanan, MAE, RMSE, MAPE (%), Validasi Akurasi)
+@terukur("Prediksi statistik batch")
+def prediksi_statistik_semua_layanan(df, params=PARAM_STATISTIK, layanan_col=LAYANAN_COL):
+    kode, nama_layanan, tahun, jumlah, posisi, panjang = siapkan_seri(df, layanan_col)
+    n_layanan, h = len(nama_layanan), params['periods']
+    fit_batch, ramal = FIT_STATISTIK[params['metode']]
+    Y = matriks_seri(kode, jumlah, posisi, panjang)
+    model = fit_batch(Y, panjang)
+    prediksi_future, galat_baku_future = ramal(model, h)
+
+    # === Historis (in-sample satu langkah) lalu proyeksi per layanan
+    y_fit = model['fit'][kode, posisi]
+    df_hist = pd.DataFrame({
+        'Tahun': tahun.astype(np.int32),
+        'Layanan': nama_layanan[kode],
+        'Prediksi': y_fit,
+        'Aktual': jumlah,
+    })
+    tahun_terakhir = tahun[np.cumsum(panjang) - 1]
+    kode_future = np.repeat(np.arange(n_layanan), h)
+    df_future = pd.DataFrame({
+        'Tahun': (tahun_terakhir[kode_future] + np.tile(np.arange(1, h + 1), n_layanan)).astype(np.int32),
+        'Layanan': nama_layanan[kode_future],
+        'Prediksi': prediksi_future.ravel(),
+        'Aktual': np.nan,
+    })
+
+    # === Interval: historis memakai galat baku satu langkah σ, proyeksi memakai galat baku h langkah
+    tingkat = params.get('interval', [])
+    if tingkat:
+        df_hist = df_hist.assign(**interval_t(y_fit, model['sigma'][kode], model['dof'][kode], tingkat))
+        df_future = df_future.assign(**interval_t(prediksi_future.ravel(), galat_baku_future.ravel(),
+                                                  model['dof'][kode_future], tingkat))
+
+    urut_akhir = np.argsort(np.concatenate([kode, kode_future]), kind='stable')
+    df_prediksi = pd.concat([df_hist, df_future], ignore_index=True).iloc[urut_akhir].reset_index(drop=True)
+
+    # === Evaluasi historis per layanan (groupby vektor); posisi inisialisasi (fit NaN) tidak dihitung
+    ada = ~np.isnan(y_fit)
+    kode_ada = kode[ada]
+    galat = jumlah[ada] - y_fit[ada]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ape = np.abs(galat / jumlah[ada])
+        n = np.bincount(kode_ada, minlength=n_layanan)
+        mae = np.bincount(kode_ada, weights=np.abs(galat), minlength=n_layanan) / n
+        rmse = np.sqrt(np.bincount(kode_ada, weights=galat ** 2, minlength=n_layanan) / n)
+        mape = np.bincount(kode_ada, weights=ape, minlength=n_layanan) / n * 100
+
+    df_evaluasi = pd.DataFrame({
+        'Layanan': nama_layanan,
+        'MAE': mae,
+        'RMSE': rmse,
+        'MAPE (%)': np.round(mape, 2),
+        'Validasi Akurasi': kategori_mape(mape),
+    })
+    return df_prediksi, df_evaluasi
@@ -0,0 +1,130 @@
+import json
+import hashlib
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from Engine_Cache import kunci_dataset
+
+# Kolom teks diubah ke categorical bila rasio nilai unik ≤ ambang ini (mis. nama layanan di format long)
+AMBANG_KATEGORI = 0.5
+
+# Dtype hemat memori per kolom: teks berulang → category, Tahun → int16, integer lain minimal int32
+# (hindari overflow aritmetika), float64 → float32 hanya bila konversinya tanpa kehilangan nilai
+def dtype_kompak(kolom):
+    if kolom.dtype == object:
+        n_unik = kolom.nunique(dropna=True)
+        if len(kolom) and n_unik / len(kolom) <= AMBANG_KATEGORI:
+            return 'category'
+    elif pd.api.types.is_integer_dtype(kolom.dtype) and not pd.api.types.is_bool_dtype(kolom.dtype):
+        if len(kolom):
+            dtype = pd.to_numeric(kolom.iloc[[kolom.argmin(), kolom.argmax()]], downcast='integer').dtype
+            return dtype if kolom.name == 'Tahun' else np.promote_types(dtype, np.int32)
+    elif kolom.dtype == np.float64:
+        nilai = kolom.to_numpy()
+        if np.array_equal(nilai.astype(np.float32).astype(np.float64), nilai, equal_nan=True):
+            return np.float32
+    return None
+
+def kompak(df):
+    dtypes = {kol: dt for kol in df.columns if (dt := dtype_kompak(df[kol])) is not None and dt != df[kol].dtype}
+    return df.astype(dtypes) if dtypes else df
+
+def ukuran_mb(df):
+    return df.memory_usage(deep=True, index=True).sum() / 1e6
+
+# Kunci turunan dari kunci masukan + parameter tahap (mis. kolom layanan, k, parameter engine):
+# dihitung produsen sekali tanpa meng-hash isi data hasilnya
+def kunci_turunan(*asal):
+    return hashlib.sha256(json.dumps(asal, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+# Penyimpanan DataFrame bersama lintas sesi: satu salinan kompak per isi dataset (hash konten).
+# Sesi hanya memegang referensi; entri otomatis dilepas (weakref) ketika tidak ada sesi yang memakainya.
+# Objek yang dibagikan bersifat read-only: modul wajib membuat salinan sebelum memodifikasi.
+class DataStore:
+    def __init__(self):
+        self._data = weakref.WeakValueDictionary()
+        self._ukuran = {}
+        self._tanda = {}  # id(df) → (weakref df, kunci) dari tandai()
+        self._lock = threading.Lock()
+
+    # Pasang kunci konten yang sudah diketahui produsen df (hash file unggahan, atau kunci masukan + parameter
+    # tahap) sehingga bagikan()/kunci() tidak meng-hash ulang isinya di setiap rerun. Tanda hanya berlaku untuk
+    # objek ini: turunan (filter/copy) ikut mewarisi attrs pandas, jadi keabsahannya dicatat per objek.
+    def tandai(self, df, *asal):
+        if not isinstance(df, pd.DataFrame) or self.dibagikan(df):
+            return df
+        kunci = kunci_turunan(*asal)
+        df.attrs['kunci_store'] = kunci
+        id_df = id(df)
+        with self._lock:
+            self._tanda[id_df] = (weakref.ref(df, lambda _: self._tanda.pop(id_df, None)), kunci)
+        return df
+
+    def _kunci_tanda(self, df):
+        entri = self._tanda.get(id(df))
+        return entri[1] if entri is not None and entri[0]() is df else None
+
+    def bagikan(self, df):
+        if not isinstance(df, pd.DataFrame):
+            return df
+        kunci = df.attrs.get('kunci_store')
+        if kunci is not None and self._data.get(kunci) is df:
+            return df  # sudah merupakan objek bersama
+        kunci = self._kunci_tanda(df) or kunci_dataset(df)
+        with self._lock:
+            ada = self._data.get(kunci)
+            if ada is not None:
+                return ada
+            # objek yang sudah kompak dipakai apa adanya (mempertahankan indeks offset layanan)
+            df_kompak = kompak(df)
+            df_kompak.attrs['kunci_store'] = kunci
+            self._data[kunci] = df_kompak
+            self._ukuran[kunci] = (ukuran_mb(df), ukuran_mb(df_kompak))
+            return df_kompak
+
+    def dibagikan(self, df):
+        kunci = df.attrs.get('kunci_store') if isinstance(df, pd.DataFrame) else None
+        return kunci is not None and self._data.get(kunci) is df
+
+    # Kunci konten df: objek bersama / bertanda memakai kunci tersimpan (tanpa hash ulang tiap rerun)
+    def kunci(self, df):
+        if self.dibagikan(df):
+            return df.attrs['kunci_store']
+        return self._kunci_tanda(df) or kunci_dataset(df)
+
+    def statistik(self):
+        with self._lock:
+            hidup = list(self._data.keys())
+            self._ukuran = {k: self._ukuran[k] for k in hidup if k in self._ukuran}
+            asli = sum(a for a, _ in self._ukuran.values())
+            kompak_mb = sum(b for _, b in self._ukuran.values())
+        return {
+            'Dataset Bersama': len(hidup),
+            'Ukuran Asli (MB)': round(float(asli), 2),
+            'Ukuran Kompak (MB)': round(float(kompak_mb), 2),
+        }
+
+    # Footprint satu sesi: objek bersama tidak dihitung ulang per sesi (hanya referensi)
+    def laporan_sesi(self, objek):
+        baris = []
+        for nama, nilai in objek.items():
+            if not isinstance(nilai, pd.DataFrame):
+                continue
+            bersama = self.dibagikan(nilai)
+            ukuran = self._ukuran.get(nilai.attrs['kunci_store'], (None, None))[1] if bersama else None
+            if ukuran is None:
+                ukuran = ukuran_mb(nilai)
+            baris.append({
+                'State': nama,
+                'Baris': len(nilai),
+                'Kolom': nilai.shape[1],
+                'Ukuran (MB)': round(ukuran, 2),
+                'Dibagikan': bersama,
+                'Milik Sesi (MB)': 0.0 if bersama else round(ukuran, 2),
+            })
+        return pd.DataFrame(baris, columns=['State', 'Baris', 'Kolom', 'Ukuran (MB)', 'Dibagikan', 'Milik Sesi (MB)'])
+
+data_store = DataStore()
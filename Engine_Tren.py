@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from Engine_Evaluasi import kategori_mape
+from Engine_Interval import TINGKAT_INTERVAL, interval_t
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Instrumentasi import terukur
+
+# Parameter engine tren batch (linier / teredam)
+PARAM_TREN = {
+    'engine': 'tren',
+    'metode': 'linier',   # 'linier' | 'teredam'
+    'phi': 0.9,           # faktor redaman tren (hanya untuk metode 'teredam')
+    'periods': 2,         # jumlah tahun ke depan
+    'interval': list(TINGKAT_INTERVAL),  # tingkat interval prediksi; [] = tanpa interval
+}
+
+# Fit regresi tren linier untuk SELURUH layanan sekaligus melalui statistik cukup
+# (Σ1, Σx, Σy, Σxy, Σx²) per layanan → tidak ada loop Python per layanan.
+# Baris duplikat tahun & tahun yang hilang tertangani otomatis (setara OLS pada baris mentah).
+def fit_tren_batch(kode, tahun, jumlah, n_layanan):
+    x = tahun - tahun.min()
+    n = np.bincount(kode, minlength=n_layanan).astype(float)
+    sx = np.bincount(kode, weights=x, minlength=n_layanan)
+    sy = np.bincount(kode, weights=jumlah, minlength=n_layanan)
+    sxy = np.bincount(kode, weights=x * jumlah, minlength=n_layanan)
+    sxx = np.bincount(kode, weights=x * x, minlength=n_layanan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        penyebut = n * sxx - sx ** 2
+        slope = np.where(penyebut > 0, (n * sxy - sx * sy) / penyebut, 0.0)
+        intercept = (sy - slope * sx) / n
+    # intercept dikembalikan dalam skala tahun asli
+    return intercept - slope * tahun.min(), slope
+
+# Engine prediksi batch: hasil berskema sama dengan jalur Prophet
+# (df_prediksi_final: Tahun, Layanan, Prediksi, Aktual + TOTAL; df_evaluasi: Layanan, MAE, RMSE, MAPE (%), Validasi Akurasi)
+@terukur("Prediksi tren batch")
+def prediksi_tren_semua_layanan(df, params=PARAM_TREN, layanan_col=LAYANAN_COL):
+    df = df[df[layanan_col].notna()]
+    kode, nama_layanan = pd.factorize(df[layanan_col], sort=False)
+    n_layanan = len(nama_layanan)
+    tahun = df['Tahun'].to_numpy(dtype=np.int64)
+    jumlah = df['Jumlah'].to_numpy(dtype=float)
+
+    intercept, slope = fit_tren_batch(kode, tahun.astype(float), jumlah, n_layanan)
+
+    # === Prediksi in-sample per baris historis
+    y_fit = intercept[kode] + slope[kode] * tahun
+    urut = np.lexsort((tahun, kode))
+    df_hist = pd.DataFrame({
+        'Tahun': tahun[urut].astype(np.int32),
+        'Layanan': np.asarray(nama_layanan, dtype=object)[kode[urut]],
+        'Prediksi': y_fit[urut],
+        'Aktual': jumlah[urut],
+    })
+    kode_hist = kode[urut]
+
+    # === Proyeksi tahun mendatang. Tren teredam (Gardner–McKenzie):
+    # ŷ(L+h) = ŷ(L) + slope · (φ + φ² + … + φ^h)
+    h = params['periods']
+    tahun_terakhir = np.full(n_layanan, np.iinfo(np.int64).min)
+    np.maximum.at(tahun_terakhir, kode, tahun)
+    langkah = np.tile(np.arange(1, h + 1), n_layanan)
+    kode_future = np.repeat(np.arange(n_layanan), h)
+    tahun_future = tahun_terakhir[kode_future] + langkah
+    level = intercept[kode_future] + slope[kode_future] * tahun_terakhir[kode_future]
+    if params['metode'] == 'teredam':
+        faktor = np.cumsum(params['phi'] ** np.arange(1, h + 1))
+        y_future = level + slope[kode_future] * np.tile(faktor, n_layanan)
+    else:
+        y_future = level + slope[kode_future] * langkah
+    df_future = pd.DataFrame({
+        'Tahun': tahun_future.astype(np.int32),
+        'Layanan': np.asarray(nama_layanan, dtype=object)[kode_future],
+        'Prediksi': y_future,
+        'Aktual': np.nan,
+    })
+
+    # === Interval prediksi OLS per layanan (vektor): ŷ ± t(n−2) · s · √(1 + 1/n + (x₀ − x̄)² / Sxx).
+    # Metode teredam memakai galat baku yang sama pada tahun proyeksi yang sama (pendekatan).
+    tingkat = params.get('interval', [])
+    if tingkat:
+        n = np.bincount(kode, minlength=n_layanan).astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_rata = np.bincount(kode, weights=tahun, minlength=n_layanan) / n
+            sxx = np.bincount(kode, weights=(tahun - x_rata[kode]) ** 2, minlength=n_layanan)
+            s = np.sqrt(np.bincount(kode, weights=(jumlah - y_fit) ** 2, minlength=n_layanan) / (n - 2))
+
+            def galat_baku(k, x0):
+                return s[k] * np.sqrt(1 + 1 / n[k] + (x0 - x_rata[k]) ** 2 / sxx[k])
+
+            df_hist = df_hist.assign(**interval_t(
+                df_hist['Prediksi'].to_numpy(), galat_baku(kode_hist, df_hist['Tahun'].to_numpy(dtype=float)),
+                n[kode_hist] - 2, tingkat))
+            df_future = df_future.assign(**interval_t(
+                y_future, galat_baku(kode_future, tahun_future.astype(float)), n[kode_future] - 2, tingkat))
+
+    # Historis lalu proyeksi, dikelompokkan per layanan sesuai urutan kemunculan
+    urut_akhir = np.argsort(np.concatenate([kode_hist, kode_future]), kind='stable')
+    df_prediksi = pd.concat([df_hist, df_future], ignore_index=True).iloc[urut_akhir].reset_index(drop=True)
+
+    # === Evaluasi historis per layanan (groupby vektor)
+    galat = jumlah - y_fit
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ape = np.abs(galat / jumlah)
+    n = np.bincount(kode, minlength=n_layanan)
+    mae = np.bincount(kode, weights=np.abs(galat), minlength=n_layanan) / n
+    rmse = np.sqrt(np.bincount(kode, weights=galat ** 2, minlength=n_layanan) / n)
+    mape = np.bincount(kode, weights=ape, minlength=n_layanan) / n * 100
+
+    df_evaluasi = pd.DataFrame({
+        'Layanan': np.asarray(nama_layanan, dtype=object),
+        'MAE': mae,
+        'RMSE': rmse,
+        'MAPE (%)': np.round(mape, 2),
+        'Validasi Akurasi': kategori_mape(mape),
+    })
+    return df_prediksi, df_evaluasi
@@ -0,0 +1,265 @@
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from Engine_Backtest import kunci_prophet, ramal_prophet, siapkan_seri
+from Engine_Evaluasi import kategori_mape
+from Engine_Interval import TINGKAT_INTERVAL
+from Engine_Prediksi import PARAM_PROPHET, prediksi_semua_layanan
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Statistik import FIT_STATISTIK, PARAM_STATISTIK, matriks_seri, prediksi_statistik_semua_layanan
+from Engine_Tren import PARAM_TREN, fit_tren_batch, prediksi_tren_semua_layanan
+from Engine_Instrumentasi import terukur
+
+# Turnamen model per layanan: setiap engine meramal tahun terakhir yang ditahan (holdout), engine dengan
+# MAE uji terkecil menang dan dipakai untuk ramalan akhir layanan tersebut.
+# Engine murah (batch, operasi matriks) bertanding lebih dulu untuk SELURUH layanan; engine mahal (Prophet,
+# satu fit per layanan) hanya di-fit untuk layanan yang belum cukup akurat (early exit di bawah ambang MAPE).
+PARAM_TURNAMEN = {
+    'engine': 'turnamen',
+    'engines': ['linier', 'teredam', 'ets', 'arima', 'prophet'],
+    'uji': 1,            # jumlah tahun terakhir tiap layanan yang ditahan sebagai data uji
+    'min_train': 3,      # minimal tahun latih; layanan yang lebih pendek langsung memakai engine cadangan
+    'ambang_mape': 5.0,  # MAPE uji (%) engine murah terbaik ≤ ambang → engine mahal dilewati
+    'cadangan': 'linier',
+    'periods': PARAM_TREN['periods'],  # jumlah tahun ke depan, sama untuk setiap engine pemenang
+    'interval': list(TINGKAT_INTERVAL),
+}
+
+# Peserta turnamen (urutan = urutan termurah); parameter dasar masing-masing engine
+ENGINE_TURNAMEN = {
+    'linier': {**PARAM_TREN, 'metode': 'linier'},
+    'teredam': {**PARAM_TREN, 'metode': 'teredam'},
+    'ets': {**PARAM_STATISTIK, 'metode': 'ets'},
+    'arima': {**PARAM_STATISTIK, 'metode': 'arima'},
+    'prophet': PARAM_PROPHET,
+}
+ENGINE_MAHAL = ('prophet',)
+
+LABEL_ENGINE = {
+    'linier': "Tren Linier (batch)",
+    'teredam': "Tren Teredam (batch)",
+    'ets': "ETS / Holt (batch)",
+    'arima': "ARIMA(1,1,0) + drift (batch)",
+    'prophet': "Prophet (per layanan)",
+}
+
+LAYANAN_PER_BLOK = 20_000  # satu tugas process pool tahap engine murah
+
+def _mahal(engine):
+    return engine in ENGINE_MAHAL
+
+# === TAHAP 1: ENGINE MURAH. Satu tugas = satu blok layanan; seluruh engine batch meramal tahun uji blok itu.
+# seri blok: (kode lokal, tahun, jumlah, posisi, panjang) terurut layanan lalu tahun → ramalan [layanan × uji]
+def _ramal_uji_batch(seri, engine, uji):
+    kode, tahun, jumlah, posisi, panjang = seri
+    n_layanan = len(panjang)
+    panjang_latih = panjang - uji
+    params = ENGINE_TURNAMEN[engine]
+    Y = matriks_seri(kode, jumlah, posisi, panjang)
+    posisi_uji = np.clip(panjang_latih[:, None] + np.arange(uji), 0, Y.shape[1] - 1)
+
+    if params['engine'] == 'tren':
+        latih = posisi < panjang_latih[kode]
+        intercept, slope = fit_tren_batch(kode[latih], tahun[latih].astype(float), jumlah[latih], n_layanan)
+        T = matriks_seri(kode, tahun.astype(float), posisi, panjang)
+        tahun_akhir = T[np.arange(n_layanan), np.maximum(panjang_latih - 1, 0)][:, None]
+        langkah = np.maximum(np.take_along_axis(T, posisi_uji, axis=1) - tahun_akhir, 1).astype(np.int64)
+        level = intercept[:, None] + slope[:, None] * tahun_akhir
+        if params['metode'] == 'teredam':
+            faktor = np.concatenate([[0.0], np.cumsum(params['phi'] ** np.arange(1, langkah.max(initial=1) + 1))])
+            return level + slope[:, None] * faktor[langkah]
+        return level + slope[:, None] * langkah
+
+    fit_batch, ramal = FIT_STATISTIK[params['metode']]
+    return ramal(fit_batch(Y, np.maximum(panjang_latih, 1)), uji)[0]
+
+def _tanding_blok(tugas):
+    seri, engines, uji = tugas
+    kode, _, jumlah, posisi, panjang = seri
+    Y = matriks_seri(kode, jumlah, posisi, panjang)
+    posisi_uji = np.clip(panjang[:, None] - uji + np.arange(uji), 0, Y.shape[1] - 1)
+    aktual = np.take_along_axis(Y, posisi_uji, axis=1)
+    return aktual, {engine: _ramal_uji_batch(seri, engine, uji) for engine in engines}
+
+# MAE & MAPE uji per layanan dari matriks [layanan × uji]; MAPE hanya atas tahun uji dengan aktual ≠ 0
+def _skor(aktual, prediksi):
+    galat = np.abs(aktual - prediksi)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ape = np.where(aktual != 0, galat / np.abs(aktual) * 100, np.nan)
+        n_ape = (~np.isnan(ape)).sum(axis=1)
+        mape = np.where(n_ape > 0, np.nansum(ape, axis=1) / n_ape, np.nan)
+    return galat.mean(axis=1), mape
+
+def _jalankan_pool(fungsi, tugas, n_workers, simpan, progress_callback, label):
+    total = len(tugas)
+    selesai = 0
+    if n_workers <= 1 or total <= 1:
+        for kunci, t in tugas.items():
+            simpan(kunci, fungsi(t))
+            selesai += 1
+            if progress_callback:
+                progress_callback(selesai, total, label(kunci))
+        return
+    # 'spawn' agar aman dipanggil dari thread server Streamlit (fork + thread rawan deadlock)
+    ctx = mp.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(n_workers, total), mp_context=ctx) as executor:
+        futures = {executor.submit(fungsi, t): kunci for kunci, t in tugas.items()}
+        for future in as_completed(futures):
+            kunci = futures[future]
+            simpan(kunci, future.result())
+            selesai += 1
+            if progress_callback:
+                progress_callback(selesai, total, label(kunci))
+
+# === TAHAP 2: ENGINE MAHAL. Satu tugas = satu layanan yang belum lolos ambang; cache dibagi dengan backtest
+def _uji_prophet(tugas):
+    tahun_latih, jumlah_latih, tahun_uji, params = tugas
+    return ramal_prophet(tahun_latih, jumlah_latih, tahun_uji, params)
+
+# Tahap 1 + 2 → tabel turnamen per layanan (skor uji tiap engine, pemenang, early exit)
+@terukur("Turnamen model")
+def tanding_semua_layanan(df, params=PARAM_TURNAMEN, n_workers=1, progress_callback=None,
+                          layanan_col=LAYANAN_COL, cache=None):
+    kode, nama_layanan, tahun, jumlah, posisi, panjang = siapkan_seri(df, layanan_col)
+    n_layanan, uji = len(nama_layanan), params['uji']
+    engines = [e for e in params['engines'] if not _mahal(e)] + [e for e in params['engines'] if _mahal(e)]
+    murah = [e for e in engines if not _mahal(e)]
+    awal = np.concatenate([[0], np.cumsum(panjang)])
+    layak = panjang - uji >= params['min_train']
+
+    mae = np.full((n_layanan, len(engines)), np.nan)
+    mape = np.full((n_layanan, len(engines)), np.nan)
+
+    # === TAHAP 1: engine murah per blok layanan (paralel antar blok)
+    tugas = {}
+    for s in range(0, n_layanan, LAYANAN_PER_BLOK):
+        e = min(s + LAYANAN_PER_BLOK, n_layanan)
+        baris = slice(awal[s], awal[e])
+        tugas[s] = ((kode[baris] - s, tahun[baris], jumlah[baris], posisi[baris], panjang[s:e]), murah, uji)
+
+    def simpan_blok(s, hasil):
+        aktual, ramalan = hasil
+        blok = slice(s, s + len(aktual))
+        for j, engine in enumerate(murah):
+            mae[blok, j], mape[blok, j] = _skor(aktual, ramalan[engine])
+
+    if murah:
+        _jalankan_pool(_tanding_blok, tugas, n_workers, simpan_blok, progress_callback,
+                       lambda s: f"engine murah, layanan {s + 1:,}–{min(s + LAYANAN_PER_BLOK, n_layanan):,}")
+    mae[~layak], mape[~layak] = np.nan, np.nan
+
+    # === EARLY EXIT: layanan yang engine murah terbaiknya sudah ≤ ambang MAPE tidak di-fit engine mahal
+    n_murah = len(murah)
+    if n_murah:
+        terbaik_murah = np.argmin(np.where(np.isnan(mae[:, :n_murah]), np.inf, mae[:, :n_murah]), axis=1)
+        mape_murah = mape[np.arange(n_layanan), terbaik_murah]
+        early_exit = layak & (mape_murah <= params['ambang_mape'])
+    else:
+        early_exit = np.zeros(n_layanan, dtype=bool)
+
+    # === TAHAP 2: engine mahal hanya untuk layanan yang tersisa (paralel antar layanan)
+    for j, engine in enumerate(engines[n_murah:], start=n_murah):
+        params_engine = ENGINE_TURNAMEN[engine]
+        tugas, kunci, ramalan = {}, {}, {}
+        for i in np.flatnonzero(layak & ~early_exit):
+            t, y = tahun[awal[i]:awal[i + 1]], jumlah[awal[i]:awal[i + 1]]
+            o = len(t) - uji
+            if cache is not None:
+                # kunci sama dengan Engine_Backtest (origin o, horizon uji) → entri cache dipakai bersama
+                kunci[i] = kunci_prophet(t[:o], y[:o], t[o:], params_engine)
+                tersimpan = cache.get(kunci[i])
+                if tersimpan is not None:
+                    ramalan[i] = tersimpan
+                    continue
+            tugas[i] = (t[:o], y[:o], t[o:], params_engine)
+
+        def simpan_layanan(i, yhat):
+            ramalan[i] = yhat
+            if cache is not None:
+                cache.put(kunci[i], yhat)
+
+        _jalankan_pool(_uji_prophet, tugas, n_workers, simpan_layanan, progress_callback,
+                       lambda i: f"uji {engine}: {nama_layanan[i]}")
+        for i, yhat in ramalan.items():
+            aktual = jumlah[awal[i + 1] - uji:awal[i + 1]]
+            mae[i, j], mape[i, j] = (v[0] for v in _skor(aktual[None, :], np.asarray(yhat)[None, :]))
+
+    # === PEMENANG: MAE uji terkecil; layanan tanpa data uji memadai → engine cadangan
+    dicoba = ~np.isnan(mae)
+    indeks_menang = np.argmin(np.where(dicoba, mae, np.inf), axis=1)
+    ada_skor = dicoba.any(axis=1)
+    pemenang = np.where(ada_skor, np.asarray(engines, dtype=object)[indeks_menang], params['cadangan'])
+    baris = np.arange(n_layanan)
+    mape_menang = np.where(ada_skor, mape[baris, indeks_menang], np.nan)
+
+    df_turnamen = pd.DataFrame({
+        'Layanan': nama_layanan,
+        'Pemenang': pemenang,
+        'MAE Uji': np.where(ada_skor, mae[baris, indeks_menang], np.nan).round(2),
+        'MAPE Uji (%)': mape_menang.round(2),
+        'Validasi Akurasi': kategori_mape(mape_menang),
+        'Engine Dicoba': dicoba.sum(axis=1),
+        'Early Exit': early_exit,
+    })
+    for j, engine in enumerate(engines):
+        df_turnamen[f"MAE {engine}"] = mae[:, j].round(2)
+    return df_turnamen
+
+# Ramalan akhir satu kelompok layanan dengan engine pemenangnya (data penuh, tingkat interval seragam).
+# 'periods' turnamen = jumlah tahun ke depan; Prophet (freq 'Y', ds 1 Januari) menghabiskan periode pertamanya
+# pada akhir tahun historis terakhir → diberi satu periode tambahan. Horizon diseragamkan lagi di pemanggil.
+def _prediksi_engine(df, engine, params, n_workers, progress_callback, cache, layanan_col):
+    params_engine = {**ENGINE_TURNAMEN[engine], 'periods': params['periods'], 'interval': params['interval']}
+    if params_engine['engine'] == 'prophet':
+        params_engine['periods'] = params['periods'] + 1
+        gabungan_list, eval_rows = prediksi_semua_layanan(df, n_workers=n_workers, progress_callback=progress_callback,
+                                                          layanan_col=layanan_col, cache=cache, params=params_engine)
+        return pd.concat(gabungan_list, ignore_index=True), pd.DataFrame(eval_rows)
+    if params_engine['engine'] == 'tren':
+        return prediksi_tren_semua_layanan(df, params=params_engine, layanan_col=layanan_col)
+    return prediksi_statistik_semua_layanan(df, params=params_engine, layanan_col=layanan_col)
+
+# Turnamen + ramalan akhir → (df_prediksi, df_evaluasi, df_turnamen); engine pemenang dicatat di kolom 'Engine'
+# df_prediksi & df_evaluasi. Skema lain sama dengan jalur Prophet/tren (tanpa TOTAL; susun lewat susun_hasil_prediksi).
+# cache: cache prediksi (fit akhir Prophet); cache_uji: cache ramalan holdout (dibagi dengan backtest).
+@terukur("Prediksi turnamen")
+def prediksi_turnamen_semua_layanan(df, params=PARAM_TURNAMEN, n_workers=1, progress_callback=None,
+                                    layanan_col=LAYANAN_COL, cache=None, cache_uji=None):
+    df = df[df[layanan_col].notna()]
+    df_turnamen = tanding_semua_layanan(df, params, n_workers, progress_callback, layanan_col, cache_uji)
+
+    pemenang = df_turnamen.set_index('Layanan')['Pemenang']
+    engine_baris = df[layanan_col].map(pemenang)
+    bagian_prediksi, bagian_evaluasi = [], []
+    for engine in [e for e in ENGINE_TURNAMEN if (df_turnamen['Pemenang'] == e).any()]:
+        df_prediksi, df_evaluasi = _prediksi_engine(df[engine_baris == engine], engine, params, n_workers,
+                                                    progress_callback, cache, layanan_col)
+        label = pd.Categorical([engine], categories=list(ENGINE_TURNAMEN))
+        bagian_prediksi.append(df_prediksi.assign(Engine=label.repeat(len(df_prediksi))))
+        bagian_evaluasi.append(df_evaluasi.assign(Engine=label.repeat(len(df_evaluasi))))
+
+    # horizon seragam: setiap layanan diramal tepat sampai tahun historis terakhirnya + periods
+    # (tanpa ini TOTAL tahun terjauh hanya menjumlahkan sebagian layanan)
+    df_prediksi = pd.concat(bagian_prediksi, ignore_index=True)
+    tahun_akhir = df.groupby(layanan_col, sort=False, observed=True)['Tahun'].max()
+    batas = df_prediksi['Layanan'].map(tahun_akhir).to_numpy(dtype=np.int64) + params['periods']
+    df_prediksi = df_prediksi[df_prediksi['Tahun'].to_numpy(dtype=np.int64) <= batas]
+
+    # urutan layanan dikembalikan seperti urutan kemunculan di df (sama dengan engine tunggal)
+    urutan = pd.Index(df_turnamen['Layanan'])
+    df_prediksi = df_prediksi.iloc[np.argsort(urutan.get_indexer(df_prediksi['Layanan']), kind='stable')]
+    df_evaluasi = pd.concat(bagian_evaluasi, ignore_index=True)
+    df_evaluasi = df_evaluasi.iloc[np.argsort(urutan.get_indexer(df_evaluasi['Layanan']), kind='stable')]
+    return df_prediksi.reset_index(drop=True), df_evaluasi.reset_index(drop=True), df_turnamen
+
+# Rekap turnamen: jumlah layanan yang dimenangkan tiap engine + rata-rata galat uji
+def ringkasan_turnamen(df_turnamen):
+    df = df_turnamen.groupby('Pemenang', sort=False).agg(
+        **{'Jumlah Layanan': ('Layanan', 'size'), 'Rata-rata MAE Uji': ('MAE Uji', 'mean'),
+           'Rata-rata MAPE Uji (%)': ('MAPE Uji (%)', 'mean'), 'Early Exit': ('Early Exit', 'sum')}).reset_index()
+    df['Porsi (%)'] = (df['Jumlah Layanan'] / len(df_turnamen) * 100).round(2)
+    urutan = {engine: i for i, engine in enumerate(ENGINE_TURNAMEN)}
+    return df.sort_values('Pemenang', key=lambda s: s.map(urutan)).round(2).reset_index(drop=True)
@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+
+from Engine_Input import baca_non_numerik
+from Engine_Preprocessing import LAYANAN_COL, deteksi_kolom_tahun, indeks_layanan, kompak_long
+from Engine_Instrumentasi import terukur
+
+# Gerbang kualitas data antara preprocessing dan modul model (clustering, prediksi).
+# Semua pemeriksaan berjalan vektor di atas array format long ringkas (urut layanan lalu tahun)
+# dan tabel wide mentah, tanpa loop per layanan → cukup murah untuk dijalankan setiap unggahan.
+# Layanan dengan temuan Kritis tidak diteruskan ke modul model (mis. Prophet gagal fit < 2 titik).
+TINGKAT_KRITIS = 'Kritis'
+TINGKAT_PERINGATAN = 'Peringatan'
+
+# kode → (label, tingkat, dampak); urutan = urutan tampil di laporan
+PEMERIKSAAN = {
+    'data_kurang': ("Kurang dari 2 tahun data", TINGKAT_KRITIS, "Model tidak bisa di-fit (Prophet butuh ≥ 2 titik)"),
+    'negatif': ("Jumlah negatif", TINGKAT_KRITIS, "Jumlah layanan tidak mungkin negatif"),
+    'nol': ("Jumlah nol", TINGKAT_PERINGATAN, "MAPE historis menjadi tak hingga (pembagian dengan 0)"),
+    'duplikat': ("Nama layanan ganda", TINGKAT_PERINGATAN, "Baris-baris dijumlahkan diam-diam saat pivot/agregasi"),
+    'nama_mirip': ("Nama beda kapital/spasi", TINGKAT_PERINGATAN, "Diperlakukan sebagai layanan berbeda"),
+    'celah': ("Tahun terlewat", TINGKAT_PERINGATAN, "Seri tidak kontinu di antara tahun pertama & terakhir"),
+    'outlier': ("Outlier", TINGKAT_PERINGATAN, "Menarik tren & memperbesar error model"),
+    'non_numerik': ("Sel tahun non-numerik", TINGKAT_PERINGATAN, "Dibaca sebagai kosong saat input"),
+    'nama_kosong': ("Nama layanan kosong", TINGKAT_PERINGATAN, "Baris dibuang saat preprocessing"),
+}
+
+# Outlier: robust z-score (median/MAD, Iglewicz & Hoaglin) per layanan pada skala log1p agar
+# pertumbuhan eksponensial yang wajar tidak ikut ditandai; hanya untuk seri dengan ≥ 4 titik
+AMBANG_OUTLIER = 3.5
+MIN_TITIK_OUTLIER = 4
+# Jumlah butir detail (tahun/baris) yang ditulis per temuan
+MAKS_DETAIL = 8
+
+KOLOM_MASALAH = ['Layanan', 'Pemeriksaan', 'Tingkat', 'Jumlah Sel', 'Detail']
+LABEL_NAMA_KOSONG = '(nama kosong)'
+
+# Kelompok berurutan: kunci (int) → urutan stabil per kunci + indeks awal tiap kelompok
+def _urutkan_kelompok(layanan):
+    kunci, unik = pd.factorize(np.asarray(layanan, dtype=object), sort=False, use_na_sentinel=False)
+    urut = np.argsort(kunci, kind='stable')
+    kunci = kunci[urut]
+    awal = np.flatnonzero(np.r_[True, kunci[1:] != kunci[:-1]])
+    return urut, awal, unik[kunci[awal]]
+
+# Gabung teks per kelompok; kelompok berisi satu butir (kasus terbanyak) tanpa loop Python
+def _gabung_teks(teks, awal, pemisah=', ', maks=None):
+    ukuran = np.diff(np.r_[awal, len(teks)])
+    hasil = teks[awal].astype(str).astype(object)
+    for i in np.flatnonzero(ukuran > 1):
+        bagian = teks[awal[i]:awal[i] + ukuran[i]]
+        sisa = len(bagian) - maks if maks else 0
+        hasil[i] = pemisah.join(map(str, bagian[:maks] if maks else bagian)) + (f", … (+{sisa})" if sisa > 0 else '')
+    return hasil
+
+# Kelompokkan temuan per layanan: layanan/label per sel → satu baris per layanan
+# (Jumlah Sel = jumlah bobot, Detail = label pertama s.d. MAKS_DETAIL)
+def _kelompokkan(kode, layanan, label, bobot=None):
+    if len(layanan) == 0:
+        return None
+    urut, awal, unik = _urutkan_kelompok(layanan)
+    bobot = np.ones(len(urut), dtype=np.int64) if bobot is None else np.asarray(bobot, dtype=np.int64)[urut]
+    return pd.DataFrame({
+        'Layanan': unik,
+        'Pemeriksaan': kode,
+        'Jumlah Sel': np.add.reduceat(bobot, awal),
+        'Detail': _gabung_teks(np.asarray(label, dtype=object)[urut], awal, maks=MAKS_DETAIL),
+    })
+
+def _robust_z(nilai, kode):
+    s = pd.Series(nilai)
+    deviasi = (s - s.groupby(kode).transform('median')).abs()
+    mad = deviasi.groupby(kode).transform('median').to_numpy()
+    rata = deviasi.groupby(kode).transform('mean').to_numpy()
+    deviasi = deviasi.to_numpy()
+    # MAD = 0 (mayoritas nilai sama) → skala cadangan mean absolute deviation
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(mad > 0, 0.6745 * deviasi / mad, deviasi / (1.253314 * rata))
+    return np.nan_to_num(z, nan=0.0, posinf=0.0)
+
+# === PEMERIKSAAN PADA FORMAT LONG
+def _periksa_long(df_long, layanan_col):
+    if indeks_layanan(df_long, layanan_col) is None:
+        df_long = kompak_long(df_long, layanan_col)
+    offset = indeks_layanan(df_long, layanan_col)
+    nama = np.asarray(df_long[layanan_col].cat.categories, dtype=object)
+    kode = df_long[layanan_col].cat.codes.to_numpy()
+    tahun = df_long['Tahun'].to_numpy(dtype=np.int64)
+    jumlah = df_long['Jumlah'].to_numpy(dtype=np.float64)
+    temuan = []
+
+    sama_layanan = kode[1:] == kode[:-1]
+    ganda = np.r_[False, sama_layanan & (tahun[1:] == tahun[:-1])]
+
+    # tahun unik per layanan & rentang tahun pertama..terakhir (array sudah urut per layanan, tahun)
+    n_sel = np.diff(offset)
+    n_tahun = n_sel - np.bincount(kode[ganda], minlength=len(nama))
+    kurang = np.flatnonzero(n_tahun < 2)
+    temuan.append(_kelompokkan('data_kurang', nama[kurang], [f"{n} tahun" for n in n_tahun[kurang]]))
+
+    for kode_cek, mask in (('negatif', jumlah < 0), ('nol', jumlah == 0)):
+        idx = np.flatnonzero(mask)
+        temuan.append(_kelompokkan(kode_cek, nama[kode[idx]], tahun[idx]))
+
+    idx = np.flatnonzero(ganda)
+    temuan.append(_kelompokkan('duplikat', nama[kode[idx]], [f"{t} ganda" for t in tahun[idx]]))
+
+    # celah: selisih tahun berurutan > 1 dalam satu layanan → rentang tahun yang terlewat
+    idx = np.flatnonzero(sama_layanan & (np.diff(tahun) > 1))
+    dari, sampai = tahun[idx] + 1, tahun[idx + 1] - 1
+    temuan.append(_kelompokkan('celah', nama[kode[idx]],
+                               [str(a) if a == b else f"{a}–{b}" for a, b in zip(dari, sampai)],
+                               bobot=sampai - dari + 1))
+
+    cukup = n_tahun[kode] >= MIN_TITIK_OUTLIER
+    z = _robust_z(np.log1p(np.clip(jumlah, 0, None)), kode)
+    idx = np.flatnonzero(cukup & (z > AMBANG_OUTLIER) & (jumlah > 0))  # nol/negatif sudah punya pemeriksaan sendiri
+    temuan.append(_kelompokkan('outlier', nama[kode[idx]], [f"{t} (z={v:.1f})" for t, v in zip(tahun[idx], z[idx])]))
+
+    # nama yang sama setelah trim/gabung spasi/casefold tetapi ditulis berbeda
+    normal = pd.Series([' '.join(str(n).split()).casefold() for n in nama])
+    mirip = normal.duplicated(keep=False).to_numpy()
+    if mirip.any():
+        varian = pd.Series(nama[mirip]).groupby(normal[mirip].to_numpy(), sort=False).transform(
+            lambda v: ' | '.join(map(repr, v)))
+        temuan.append(_kelompokkan('nama_mirip', nama[mirip], varian.to_numpy()))
+    return temuan
+
+# === PEMERIKSAAN PADA TABEL WIDE MENTAH (informasi yang hilang setelah preprocessing)
+def _periksa_mentah(df_raw, df_long, layanan_col):
+    if layanan_col not in df_raw.columns:
+        return []
+    temuan = []
+    kolom_tahun = deteksi_kolom_tahun(df_raw)
+    layanan = df_raw[layanan_col]
+    terisi = df_raw[kolom_tahun].notna().to_numpy().any(axis=1) if kolom_tahun else np.zeros(len(df_raw), bool)
+    # nomor baris Excel (baris 1 = header) sesuai urutan baris tabel hasil input
+    nomor = np.arange(len(df_raw)) + 2
+
+    # sel non-numerik: dicatat saat input (attrs) + kolom tahun bertipe objek pada df dari sumber lain
+    sel = baca_non_numerik(df_raw)
+    for kolom in kolom_tahun:
+        if df_raw[kolom].dtype == object:
+            angka = pd.to_numeric(df_raw[kolom], errors='coerce')
+            idx = np.flatnonzero(df_raw[kolom].notna().to_numpy() & angka.isna().to_numpy())
+            sel += [[layanan.iat[i], kolom, str(df_raw[kolom].iat[i])] for i in idx]
+    if sel:
+        sel = [[LABEL_NAMA_KOSONG if pd.isna(l) else l, t, v] for l, t, v in sel]
+        temuan.append(_kelompokkan('non_numerik', [l for l, _, _ in sel], [f"{t}: {v!r}" for _, t, v in sel]))
+
+    kosong = np.flatnonzero(layanan.isna().to_numpy() & terisi)
+    temuan.append(_kelompokkan('nama_kosong', np.full(len(kosong), LABEL_NAMA_KOSONG, dtype=object),
+                               [f"baris {b}" for b in nomor[kosong]]))
+
+    # nama ganda setelah baris identik dibuang (tahun yang tidak tumpang tindih tidak terlihat di format long)
+    unik = ~pd.util.hash_pandas_object(df_raw, index=False).duplicated().to_numpy()
+    idx = np.flatnonzero(unik & layanan.notna().to_numpy() & terisi)
+    ganda = idx[layanan.iloc[idx].duplicated(keep=False).to_numpy()]
+    temuan.append(_kelompokkan('duplikat', layanan.iloc[ganda].to_numpy(), [f"baris {b}" for b in nomor[ganda]]))
+
+    # layanan yang seluruh sel tahunnya kosong tidak muncul di format long sama sekali
+    tanpa_data = layanan[layanan.notna().to_numpy()]
+    tanpa_data = tanpa_data[~tanpa_data.isin(df_long[layanan_col].cat.categories)].drop_duplicates().to_numpy()
+    temuan.append(_kelompokkan('data_kurang', tanpa_data, ["0 tahun"] * len(tanpa_data)))
+    return temuan
+
+# Validasi seluruh layanan → tabel temuan (satu baris per layanan × pemeriksaan).
+# df_raw (opsional) = tabel wide sebelum preprocessing untuk pemeriksaan sel non-numerik, nama kosong
+# dan nama ganda; tanpa df_raw nama ganda tetap terdeteksi dari pasangan (layanan, tahun) kembar.
+@terukur("Validasi kualitas data")
+def validasi_data(df_long, df_raw=None, layanan_col=LAYANAN_COL):
+    temuan = _periksa_long(df_long, layanan_col)
+    if df_raw is not None:
+        mentah = _periksa_mentah(df_raw, df_long, layanan_col)
+        if any(t is not None and t['Pemeriksaan'].iat[0] == 'duplikat' for t in mentah):
+            # nama ganda dari tabel mentah lebih lengkap (baris asal) → gantikan temuan dari format long
+            temuan = [t for t in temuan if t is None or t['Pemeriksaan'].iat[0] != 'duplikat']
+        temuan += mentah
+    temuan = [t for t in temuan if t is not None]
+    if not temuan:
+        return pd.DataFrame(columns=KOLOM_MASALAH)
+
+    df_masalah = pd.concat(temuan, ignore_index=True)
+    df_masalah['Tingkat'] = df_masalah['Pemeriksaan'].map({k: v[1] for k, v in PEMERIKSAAN.items()})
+    # urut: Kritis dulu, lalu urutan pemeriksaan; di dalamnya urutan kemunculan layanan
+    urutan = {k: i for i, k in enumerate(PEMERIKSAAN)}
+    df_masalah = df_masalah.iloc[np.lexsort((
+        df_masalah['Pemeriksaan'].map(urutan).to_numpy(),
+        (df_masalah['Tingkat'] != TINGKAT_KRITIS).to_numpy()))]
+    df_masalah['Pemeriksaan'] = df_masalah['Pemeriksaan'].map({k: v[0] for k, v in PEMERIKSAAN.items()})
+    return df_masalah.reset_index(drop=True)[KOLOM_MASALAH]
+
+# Ringkasan per pemeriksaan (seluruh pemeriksaan tampil, termasuk yang lolos)
+def ringkasan_validasi(df_masalah):
+    statistik = df_masalah.groupby('Pemeriksaan', sort=False).agg(
+        **{'Layanan Terdampak': ('Layanan', 'nunique'), 'Jumlah Sel': ('Jumlah Sel', 'sum')})
+    baris = []
+    for label, tingkat, dampak in PEMERIKSAAN.values():
+        ada = label in statistik.index
+        baris.append({
+            'Pemeriksaan': label,
+            'Tingkat': tingkat,
+            'Layanan Terdampak': int(statistik.at[label, 'Layanan Terdampak']) if ada else 0,
+            'Jumlah Sel': int(statistik.at[label, 'Jumlah Sel']) if ada else 0,
+            'Dampak': dampak,
+        })
+    return pd.DataFrame(baris)
+
+# Laporan per layanan: satu baris per layanan bermasalah dengan tingkat terberat & daftar pemeriksaan
+def laporan_per_layanan(df_masalah):
+    kolom = ['Layanan', 'Tingkat', 'Jumlah Pemeriksaan', 'Masalah']
+    if df_masalah.empty:
+        return pd.DataFrame(columns=kolom)
+    urut, awal, unik = _urutkan_kelompok(df_masalah['Layanan'])
+    kritis = (df_masalah['Tingkat'].to_numpy() == TINGKAT_KRITIS)[urut]
+    return pd.DataFrame({
+        'Layanan': unik,
+        'Tingkat': np.where(np.maximum.reduceat(kritis, awal), TINGKAT_KRITIS, TINGKAT_PERINGATAN),
+        'Jumlah Pemeriksaan': np.diff(np.r_[awal, len(urut)]),
+        'Masalah': _gabung_teks(df_masalah['Pemeriksaan'].to_numpy(dtype=object)[urut], awal),
+    })
+
+# Gerbang: buang layanan dengan temuan bertingkat `kecualikan` → (df_long lolos, daftar layanan ditolak).
+# Tanpa layanan ditolak, objek df_long yang sama dikembalikan (tetap dibagikan lewat data_store).
+@terukur("Gerbang validasi")
+def gerbang_validasi(df_long, df_masalah, kecualikan=(TINGKAT_KRITIS,), layanan_col=LAYANAN_COL):
+    ditolak = pd.unique(df_masalah.loc[df_masalah['Tingkat'].isin(kecualikan), 'Layanan'])
+    mask = df_long[layanan_col].isin(ditolak).to_numpy()
+    if not mask.any():
+        return df_long, list(ditolak)
+    return kompak_long(df_long[~mask], layanan_col), list(ditolak)
@@ -1,23 +1,61 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from sklearn.decomposition import PCA
+from sklearn.preprocessing import MinMaxScaler
 import matplotlib.pyplot as plt
 import seaborn as sns
 from math import pi
 import plotly.express as px
-
-def compute_trend_features(df_pivot):
-    tahun = np.array(df_pivot.columns, dtype=int)
-    fitur = pd.DataFrame(index=df_pivot.index)
-    fitur['Mean'] = df_pivot.mean(axis=1)
-    fitur['StdDev'] = df_pivot.std(axis=1)
-    fitur['Range'] = df_pivot.max(axis=1) - df_pivot.min(axis=1)
-    fitur['Slope'] = df_pivot.apply(lambda row: np.polyfit(tahun, row.values, 1)[0], axis=1)
-    fitur['Skewness'] = df_pivot.skew(axis=1)
-    return fitur
+from Engine_Clustering import (FITUR_TREN, K_MAKS_DEFAULT, cache_klaster, ringkasan_klaster,
+                               susun_hasil_klaster, sweep_klaster)
+from Engine_Instrumentasi import tahap as ukur_tahap
+from Engine_Job import STATUS_GAGAL, STATUS_SELESAI, antrean_job
+from Engine_Store import data_store
+
+# Di atas jumlah layanan ini visualisasi otomatis beralih ke mode skala besar
+AMBANG_VISUAL_BESAR = 1000
+TOP_N_LABEL = 20
+BARIS_PER_HALAMAN_HEATMAP = 50
+
+# Scatter PCA berbasis WebGL: nama layanan tampil saat hover, label teks hanya untuk top-N (Mean terbesar)
+def scatter_pca_besar(df_result, layanan_col, top_n=TOP_N_LABEL):
+    df_plot = df_result.assign(Cluster=df_result['Cluster'].astype(str))
+    fig = px.scatter(df_plot, x='PC1', y='PC2', color='Cluster', hover_name=layanan_col,
+                     hover_data={'Mean': ':.0f', 'Slope': ':.1f', 'PC1': False, 'PC2': False},
+                     render_mode='webgl', opacity=0.6,
+                     color_discrete_sequence=px.colors.qualitative.Set2,
+                     title="Distribusi Klaster berdasarkan Tren Statistik (PCA)")
+    fig.update_traces(marker=dict(size=5))
+    df_top = df_result.nlargest(top_n, 'Mean')
+    for _, row in df_top.iterrows():
+        fig.add_annotation(x=row['PC1'], y=row['PC2'], text=str(row[layanan_col]),
+                           showarrow=False, xshift=6, xanchor='left', font=dict(size=9))
+    return fig
+
+# Heatmap ringkas: rata-rata fitur tren per klaster (ukuran tetap, berapa pun jumlah layanan)
+def heatmap_per_klaster(df_result):
+    df_agregat = df_result.groupby('Cluster')[FITUR_TREN].mean()
+    df_agregat.index = [f"Klaster {c} (n={n})" for c, n in df_result['Cluster'].value_counts().sort_index().items()]
+    fig, ax = plt.subplots(figsize=(10, max(2, 0.6 * len(df_agregat))))
+    sns.heatmap(df_agregat, annot=True, fmt='.0f', cmap='YlGnBu', ax=ax)
+    ax.set_title("Heatmap Rata-rata Fitur Tren per Klaster")
+    return fig
+
+# Dijalankan di thread worker antrean job
+def _job_sweep(job, df, layanan_col):
+    job.progres(0, 1, "sweep KMeans")
+    hasil = sweep_klaster(df, layanan_col=layanan_col, cache=cache_klaster)
+    job.progres(1, 1, "sweep KMeans")
+    return hasil
+
+@st.fragment(run_every=1.0)
+def pantau_job_sweep(kunci):
+    job = antrean_job.ambil(kunci)
+    if job is None:
+        return
+    if not job.aktif:
+        st.rerun()
+    st.info(f"🧵 Job sweep klaster: {job.status} ({round(job.diperbarui - job.dibuat)} s). "
+            "Halaman diperbarui otomatis setelah selesai.")
 
 def modul_clustering_tren(df):
     st.title("📈 Modul Klastering Berbasis Tren Statistik")
@@ -37,30 +75,67 @@ def modul_clustering_tren(df):
         return
 
     layanan_col = 'Layanan DJID'
-    df_pivot = df.pivot_table(index=layanan_col, columns='Tahun', values='Jumlah', aggfunc='sum').fillna(0)
-    df_fitur = compute_trend_features(df_pivot)
-    fitur_scaled = StandardScaler().fit_transform(df_fitur)
-
-    n_clusters = st.slider("🔢 Pilih jumlah klaster", 2, 6, 3)
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init='auto')
-    labels = kmeans.fit_predict(fitur_scaled)
+    latar = st.checkbox("🧵 Hitung sweep klaster di latar belakang (antrean job)", value=False)
+    try:
+        if latar:
+            kunci = f"klaster:{data_store.kunci(df)}:{layanan_col}:{K_MAKS_DEFAULT}"
+            nama_job = f"Sweep klaster {df[layanan_col].nunique()} layanan"
+            job = antrean_job.kirim(kunci, nama_job, _job_sweep, df, layanan_col)
+            if job.status == STATUS_GAGAL:
+                # job gagal disimpan apa adanya; dijalankan ulang hanya atas permintaan pengguna
+                st.error(f"❌ Job sweep klaster gagal: {job.error}")
+                if not st.button("🔁 Coba ulang sweep klaster"):
+                    return
+                job = antrean_job.kirim(kunci, nama_job, _job_sweep, df, layanan_col, coba_ulang=True)
+            if job.status != STATUS_SELESAI:
+                pantau_job_sweep(kunci)
+                return
+            tahap, sweep = job.hasil
+        else:
+            tahap, sweep = sweep_klaster(df, layanan_col=layanan_col, cache=cache_klaster)
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        return
 
-    df_result = df_fitur.copy()
-    df_result['Cluster'] = labels
-    df_result = df_result.reset_index()
+    # === PEMILIHAN k OTOMATIS (sweep KMeans seluruh rentang k sekaligus)
+    st.subheader("🧭 Pemilihan Jumlah Klaster Otomatis")
+    df_kurva = sweep['kurva']
+    col1, col2 = st.columns(2)
+    fig_inersia = px.line(df_kurva, x='k', y='Inertia', markers=True, title="Kurva Elbow (Inertia)")
+    fig_inersia.add_vline(x=sweep['k_siku'], line_dash='dash', line_color='grey')
+    col1.plotly_chart(fig_inersia, use_container_width=True)
+    fig_sil = px.line(df_kurva, x='k', y='Silhouette', markers=True, title="Silhouette Score per k")
+    fig_sil.add_vline(x=sweep['k_rekomendasi'], line_dash='dash', line_color='gold')
+    col2.plotly_chart(fig_sil, use_container_width=True)
+
+    silhouette_terbaik = df_kurva.loc[df_kurva['k'] == sweep['k_rekomendasi'], 'Silhouette'].iloc[0]
+    st.info(f"💡 Rekomendasi: **k = {sweep['k_rekomendasi']}** (silhouette tertinggi {silhouette_terbaik:.3f}); "
+            f"titik siku kurva elbow berada di k = {sweep['k_siku']}.")
+
+    n_clusters = st.select_slider("🔢 Pilih jumlah klaster", options=df_kurva['k'].tolist(),
+                                  value=sweep['k_rekomendasi'])
+    df_result = data_store.tandai(susun_hasil_klaster(tahap, sweep['labels'][n_clusters]),
+                                  'klaster', data_store.kunci(df), layanan_col, K_MAKS_DEFAULT, n_clusters)
+    with st.expander("📦 Statistik Cache Tahap Klastering"):
+        st.dataframe(pd.DataFrame([cache_klaster.statistik()]), use_container_width=True, hide_index=True)
+        st.caption("Pivot, fitur tren, scaling, PCA & sweep KMeans dihitung sekali per dataset; menggeser slider hanya mengambil label yang sudah tersimpan.")
+
+    # === MODE VISUAL: otomatis skala besar di atas ambang jumlah layanan
+    mode_besar = st.toggle(f"🚀 Mode visual skala besar (otomatis aktif di atas {AMBANG_VISUAL_BESAR:,} layanan)",
+                           value=len(df_result) > AMBANG_VISUAL_BESAR)
 
     st.subheader("📊 Visualisasi Klaster (PCA 2D)")
-    pca = PCA(n_components=2)
-    pca_result = pca.fit_transform(fitur_scaled)
-    df_result['PC1'] = pca_result[:, 0]
-    df_result['PC2'] = pca_result[:, 1]
-
-    fig, ax = plt.subplots()
-    sns.scatterplot(data=df_result, x='PC1', y='PC2', hue='Cluster', palette='Set2', s=100)
-    for i in range(len(df_result)):
-        ax.text(df_result['PC1'][i]+0.02, df_result['PC2'][i], df_result[layanan_col][i], fontsize=9)
-    plt.title("Distribusi Klaster berdasarkan Tren Statistik (PCA)")
-    st.pyplot(fig)
+    if mode_besar:
+        st.plotly_chart(scatter_pca_besar(df_result, layanan_col), use_container_width=True)
+        st.caption(f"🖱️ Arahkan kursor ke titik untuk melihat nama layanan; label hanya ditampilkan untuk {TOP_N_LABEL} layanan dengan rata-rata terbesar.")
+    else:
+        with ukur_tahap("Render matplotlib: scatter PCA"):
+            fig, ax = plt.subplots()
+            sns.scatterplot(data=df_result, x='PC1', y='PC2', hue='Cluster', palette='Set2', s=100)
+            for i in range(len(df_result)):
+                ax.text(df_result['PC1'][i]+0.02, df_result['PC2'][i], df_result[layanan_col][i], fontsize=9)
+            plt.title("Distribusi Klaster berdasarkan Tren Statistik (PCA)")
+            st.pyplot(fig)
 
     st.caption("📍 Visualisasi ini memetakan layanan dalam ruang 2 dimensi berdasarkan karakter tren statistik.")
 
@@ -68,53 +143,18 @@ def modul_clustering_tren(df):
     st.dataframe(df_result.drop(columns=['PC1', 'PC2']), use_container_width=True)
 
     st.subheader("📝 Analisis Naratif per Klaster")
+    df_naratif = ringkasan_klaster(df_result)
     narasi = ""
-    df_naratif = []
-    for clus in sorted(df_result['Cluster'].unique()):
-        sub = df_result[df_result['Cluster'] == clus]
-        mean_slope = sub['Slope'].mean()
-        mean_std = sub['StdDev'].mean()
-
-        if mean_slope > 1000:
-            tren = "meningkat sangat tajam"
-        elif mean_slope > 100:
-            tren = "meningkat signifikan"
-        elif mean_slope > 10:
-            tren = "meningkat pelan"
-        elif mean_slope > -10:
-            tren = "relatif stabil"
-        elif mean_slope > -100:
-            tren = "menurun pelan"
-        elif mean_slope > -1000:
-            tren = "menurun signifikan"
-        else:
-            tren = "menurun sangat tajam"
-
-        if mean_std < 500:
-            variasi = "stabil"
-        elif mean_std < 1500:
-            variasi = "moderat"
-        elif mean_std < 5000:
-            variasi = "fluktuatif"
-        else:
-            variasi = "sangat fluktuatif"
-
-        narasi += f"- **Klaster {clus}** terdiri dari **{len(sub)} layanan**, tren **{tren}**, variasi **{variasi}**.\n"
-
-        df_naratif.append({
-            "Klaster": f"Klaster {clus}",
-            "Jumlah Layanan": len(sub),
-            "Tren Rata-rata": tren,
-            "Variasi": variasi
-        })
+    for _, row in df_naratif.iterrows():
+        narasi += f"- **{row['Klaster']}** terdiri dari **{row['Jumlah Layanan']} layanan**, tren **{row['Tren Rata-rata']}**, variasi **{row['Variasi']}**.\n"
 
     st.markdown(narasi)
 
     st.subheader("📋 Tabel Ringkasan per Klaster")
-    st.dataframe(pd.DataFrame(df_naratif), use_container_width=True, hide_index=True)
+    st.dataframe(df_naratif, use_container_width=True, hide_index=True)
 
     st.subheader("📡 Radar Chart Karakteristik Klaster")
-    df_radar = df_result.groupby('Cluster')[['Mean', 'StdDev', 'Range', 'Slope', 'Skewness']].mean().reset_index()
+    df_radar = df_result.groupby('Cluster')[FITUR_TREN].mean().reset_index()
     scaler = MinMaxScaler()
     df_scaled = scaler.fit_transform(df_radar.drop(columns=['Cluster']))
     df_scaled = pd.DataFrame(df_scaled, columns=df_radar.columns[1:])
@@ -124,31 +164,44 @@ def modul_clustering_tren(df):
     N = len(categories)
     angles = [n / float(N) * 2 * pi for n in range(N)] + [0]
 
-    fig_radar, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
-    for i, row in df_scaled.iterrows():
-        values = row[categories].tolist() + [row[categories[0]]]
-        ax.plot(angles, values, label=f"Klaster {row['Cluster']}")
-        ax.fill(angles, values, alpha=0.1)
-    ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(categories)
-    ax.set_title("Radar Chart Fitur Statistik Tiap Klaster")
-    ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1))
-    st.pyplot(fig_radar)
+    with ukur_tahap("Render matplotlib: radar"):
+        fig_radar, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
+        for i, row in df_scaled.iterrows():
+            values = row[categories].tolist() + [row[categories[0]]]
+            ax.plot(angles, values, label=f"Klaster {row['Cluster']}")
+            ax.fill(angles, values, alpha=0.1)
+        ax.set_xticks(angles[:-1])
+        ax.set_xticklabels(categories)
+        ax.set_title("Radar Chart Fitur Statistik Tiap Klaster")
+        ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1))
+        st.pyplot(fig_radar)
 
     st.caption("📡 Radar chart menunjukkan kekuatan dominan setiap fitur dalam masing-masing klaster.")
 
     st.subheader("🔥 Heatmap Fitur Tren per Layanan (Urut per Klaster)")
     df_heatmap = df_result.set_index('Layanan DJID').sort_values('Cluster')
-    fig_hm, ax2 = plt.subplots(figsize=(10, 5))
-    sns.heatmap(df_heatmap.drop(columns=['Cluster', 'PC1', 'PC2']), annot=True, fmt='.0f', cmap='YlGnBu', ax=ax2)
-    ax2.set_title("Heatmap Fitur Tren")
-    st.pyplot(fig_hm)
+    if mode_besar:
+        with ukur_tahap("Render matplotlib: heatmap per klaster"):
+            st.pyplot(heatmap_per_klaster(df_result))
+
+        # Heatmap per layanan dipecah per halaman agar ukuran gambar tetap terkendali
+        n_halaman = -(-len(df_heatmap) // BARIS_PER_HALAMAN_HEATMAP)
+        halaman = st.number_input(f"📄 Halaman heatmap per layanan (1–{n_halaman})", min_value=1,
+                                  max_value=n_halaman, value=1)
+        awal = (halaman - 1) * BARIS_PER_HALAMAN_HEATMAP
+        df_heatmap = df_heatmap.iloc[awal:awal + BARIS_PER_HALAMAN_HEATMAP]
+
+    with ukur_tahap("Render matplotlib: heatmap per layanan"):
+        fig_hm, ax2 = plt.subplots(figsize=(10, 5 if not mode_besar else max(5, 0.25 * len(df_heatmap))))
+        sns.heatmap(df_heatmap[FITUR_TREN], annot=True, fmt='.0f', cmap='YlGnBu', ax=ax2)
+        ax2.set_title("Heatmap Fitur Tren")
+        st.pyplot(fig_hm)
 
     st.caption("🔥 Heatmap ini membantu membandingkan nilai asli fitur tren antar layanan dalam klaster yang sama.")
 
     # === TREEMAP ===
     st.subheader("🌳 Treemap Komposisi Klaster")
-    df_treemap = pd.DataFrame(df_naratif)
+    df_treemap = df_naratif.copy()
 
     fig_tree = px.treemap(
         df_treemap,
@@ -1,96 +1,120 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-
-def evaluasi_mape_kategori(mape):
-    if mape <= 10:
-        return "Sangat Akurat (Highly Accurate)"
-    elif mape <= 20:
-        return "Akurat (Good Forecast)"
-    elif mape <= 50:
-        return "Cukup Akurat (Reasonable Forecast)"
-    else:
-        return "Tidak Akurat (Inaccurate Forecast)"
-
-def modul_evaluasi(df_merge):
-    st.title("📊 Modul Evaluasi Model Prediksi")
-
-    st.markdown("""
-    Modul ini mengevaluasi performa model prediksi menggunakan metrik evaluasi umum:
-    - **MAE** (Mean Absolute Error)
-    - **RMSE** (Root Mean Squared Error)
-    - **MAPE (%)** (Mean Absolute Percentage Error)
-
-    Evaluasi dilakukan berdasarkan data historis aktual dan prediksi, serta estimasi performa masa depan.
-    """)
-
-    if df_merge is None or df_merge.empty:
-        st.warning("⚠️ Data belum tersedia dari modul prediksi.")
-        return
-
-    layanan_terpilih = st.selectbox("📌 Pilih Layanan untuk Evaluasi", sorted(df_merge['Layanan'].unique()))
-    df_layanan = df_merge[df_merge['Layanan'] == layanan_terpilih].copy()
-
-    if df_layanan.empty:
-        st.error("❌ Tidak ada data untuk layanan yang dipilih.")
-        return
-
-    st.subheader("📋 Evaluasi Error pada Data Historis")
-    df_error = df_layanan[df_layanan['Aktual'].notna() & (df_layanan['Aktual'] != 0)].copy()
-    df_error = df_error.drop_duplicates(subset='Tahun', keep='first')
-
-    if df_error.empty:
-        st.warning("⚠️ Tidak ada data aktual yang valid untuk evaluasi error.")
-    else:
-        df_error['Error Absolute'] = (df_error['Aktual'] - df_error['Prediksi']).abs()
-        df_error['Error Persentase (%)'] = ((df_error['Error Absolute'] / df_error['Aktual']) * 100).round(2)
-        df_error['MAE'] = df_error['Error Absolute']
-        df_error['RMSE'] = (df_error['Aktual'] - df_error['Prediksi']) ** 2
-        df_error['MAPE (%)'] = df_error['Error Persentase (%)']
-        df_error['Validasi Akurasi'] = df_error['MAPE (%)'].apply(evaluasi_mape_kategori)
-
-        st.dataframe(df_error[['Layanan', 'Tahun', 'Aktual', 'Prediksi', 'Error Absolute', 'Error Persentase (%)']],
-                     use_container_width=True, hide_index=True)
-
-    st.subheader("📈 Tabel Evaluasi Performa per Tahun")
-    df_eval_summary = df_error[['Layanan', 'Tahun', 'Aktual', 'Prediksi', 'MAE', 'RMSE', 'MAPE (%)', 'Validasi Akurasi']].copy()
-    st.dataframe(df_eval_summary, use_container_width=True, hide_index=True)
-
-    st.caption("📌 Tabel ini menampilkan performa prediksi berdasarkan data historis aktual.")
-
-    st.subheader("🔮 Estimasi Evaluasi 2 Tahun ke Depan")
-    df_future = df_layanan[~df_layanan['Tahun'].isin(df_error['Tahun'])].copy()
-
-    baseline_aktual = df_error['Aktual'].iloc[-1] if not df_error.empty else 1
-    df_future['Aktual (Estimasi)'] = baseline_aktual
-    df_future['MAE'] = (df_future['Aktual (Estimasi)'] - df_future['Prediksi']).abs()
-    df_future['RMSE'] = (df_future['Aktual (Estimasi)'] - df_future['Prediksi']) ** 2
-    df_future['MAPE (%)'] = ((df_future['MAE'] / df_future['Aktual (Estimasi)']) * 100).round(2)
-    df_future['Validasi Akurasi'] = df_future['MAPE (%)'].apply(evaluasi_mape_kategori)
-    df_future['Layanan'] = layanan_terpilih
-
-    st.dataframe(df_future[['Layanan', 'Tahun', 'Prediksi', 'Aktual (Estimasi)', 'MAE', 'RMSE', 'MAPE (%)', 'Validasi Akurasi']],
-                 use_container_width=True, hide_index=True)
-
-    st.caption("📌 Estimasi ini digunakan untuk melihat performa model pada periode mendatang menggunakan baseline aktual terakhir.")
-
-    st.subheader("📊 Ringkasan Evaluasi Global Historis")
-    if not df_error.empty:
-        global_mae = df_error['MAE'].mean()
-        global_rmse = np.sqrt(df_error['RMSE'].mean())
-        global_mape = df_error['MAPE (%)'].mean()
-
-        df_global = pd.DataFrame([{
-            "Layanan": layanan_terpilih,
-            "MAE": round(global_mae, 2),
-            "RMSE": round(global_rmse, 2),
-            "MAPE (%)": round(global_mape, 2),
-            "Validasi Akurasi": evaluasi_mape_kategori(global_mape)
-        }])
-
-        st.dataframe(df_global, use_container_width=True, hide_index=True)
-
-        st.caption("📌 Ringkasan ini menunjukkan akurasi rata-rata model pada data historis.")
-
-    return df_eval_summary
+import streamlit as st
+import pandas as pd
+from Engine_Evaluasi import (KOLOM_EVALUASI, KOLOM_MASA_DEPAN, evaluasi_masa_depan_semua,
+                             evaluasi_semua_layanan)
+from Engine_Backtest import ENGINE_BACKTEST, PARAM_BACKTEST, backtest_semua_layanan, cache_backtest
+from Engine_Prediksi import jumlah_worker_default
+from Engine_Store import data_store
+
+def modul_evaluasi(df_merge):
+    st.title("📊 Modul Evaluasi Model Prediksi")
+
+    st.markdown("""
+    Modul ini mengevaluasi performa model prediksi menggunakan metrik evaluasi umum:
+    - **MAE** (Mean Absolute Error)
+    - **RMSE** (Root Mean Squared Error)
+    - **MAPE (%)** (Mean Absolute Percentage Error)
+
+    Evaluasi dilakukan berdasarkan data historis aktual dan prediksi, serta estimasi performa masa depan.
+    """)
+
+    if df_merge is None or df_merge.empty:
+        st.warning("⚠️ Data belum tersedia dari modul prediksi.")
+        return
+
+    # === EVALUASI SELURUH LAYANAN SEKALIGUS (vektor), tampilan per layanan cukup memfilter hasilnya
+    df_eval_semua, df_ringkasan_semua = evaluasi_semua_layanan(df_merge)
+    df_future_semua = evaluasi_masa_depan_semua(df_merge, df_eval_semua)
+
+    layanan_terpilih = st.selectbox("📌 Pilih Layanan untuk Evaluasi", sorted(df_merge['Layanan'].unique()))
+
+    if not (df_merge['Layanan'] == layanan_terpilih).any():
+        st.error("❌ Tidak ada data untuk layanan yang dipilih.")
+        return
+
+    st.subheader("📋 Evaluasi Error pada Data Historis")
+    df_error = df_eval_semua[df_eval_semua['Layanan'] == layanan_terpilih].rename(
+        columns={'MAE': 'Error Absolute', 'MAPE (%)': 'Error Persentase (%)'})
+
+    if df_error.empty:
+        st.warning("⚠️ Tidak ada data aktual yang valid untuk evaluasi error.")
+    else:
+        st.dataframe(df_error[['Layanan', 'Tahun', 'Aktual', 'Prediksi', 'Error Absolute', 'Error Persentase (%)']],
+                     use_container_width=True, hide_index=True)
+
+    st.subheader("📈 Tabel Evaluasi Performa per Tahun")
+    df_eval_summary = df_eval_semua.loc[df_eval_semua['Layanan'] == layanan_terpilih, KOLOM_EVALUASI]
+    st.dataframe(df_eval_summary, use_container_width=True, hide_index=True)
+
+    st.caption("📌 Tabel ini menampilkan performa prediksi berdasarkan data historis aktual.")
+
+    st.subheader("🔮 Estimasi Evaluasi 2 Tahun ke Depan")
+    df_future = df_future_semua[df_future_semua['Layanan'] == layanan_terpilih]
+
+    st.dataframe(df_future[KOLOM_MASA_DEPAN], use_container_width=True, hide_index=True)
+
+    st.caption("📌 Estimasi ini digunakan untuk melihat performa model pada periode mendatang menggunakan baseline aktual terakhir.")
+
+    st.subheader("📊 Ringkasan Evaluasi Global Historis")
+    df_global = df_ringkasan_semua[df_ringkasan_semua['Layanan'] == layanan_terpilih]
+    if not df_global.empty:
+        st.dataframe(df_global, use_container_width=True, hide_index=True)
+
+        st.caption("📌 Ringkasan ini menunjukkan akurasi rata-rata model pada data historis.")
+
+    with st.expander(f"🗂️ Ringkasan Evaluasi Seluruh Layanan ({len(df_ringkasan_semua):,} layanan)"):
+        st.dataframe(df_ringkasan_semua.sort_values('MAPE (%)'), use_container_width=True, hide_index=True)
+
+    modul_backtest(df_merge, layanan_terpilih)
+
+    return data_store.tandai(df_eval_summary, 'evaluasi', data_store.kunci(df_merge), layanan_terpilih)
+
+# === BACKTEST ROLLING-ORIGIN: akurasi out-of-sample (model di-fit ulang di setiap origin historis)
+def modul_backtest(df_merge, layanan_terpilih):
+    st.subheader("🔁 Backtest Rolling-Origin (Out-of-Sample)")
+    st.caption("Metrik di atas bersifat in-sample. Backtest mem-fit ulang model pada setiap origin historis "
+               "hanya dengan tahun sebelumnya, lalu menilai tahun berikutnya yang disembunyikan.")
+
+    if not st.checkbox("▶️ Jalankan backtest", value=False):
+        return
+
+    engines = st.multiselect("🧠 Engine yang dibandingkan", list(ENGINE_BACKTEST.keys()), default=['linier', 'teredam'])
+    col1, col2, col3 = st.columns(3)
+    min_train = col1.number_input("📏 Minimal tahun latih", min_value=2, max_value=20, value=PARAM_BACKTEST['min_train'])
+    horizon = col2.number_input("🔭 Horizon uji (tahun)", min_value=1, max_value=5, value=PARAM_BACKTEST['horizon'])
+    n_workers = col3.number_input("⚙️ Worker Prophet", min_value=1, max_value=jumlah_worker_default(),
+                                  value=jumlah_worker_default())
+    if not engines:
+        return
+
+    # Seri historis diambil dari aktual pada hasil prediksi (tanpa baris TOTAL)
+    df_hist = df_merge[df_merge['Aktual'].notna() & (df_merge['Layanan'] != 'TOTAL')]
+    df_hist = (df_hist.drop_duplicates(subset=['Layanan', 'Tahun'], keep='first')
+               [['Layanan', 'Tahun', 'Aktual']].rename(columns={'Aktual': 'Jumlah'}))
+
+    progress_bar = st.progress(0.0, text="⏳ Backtest Prophet...")
+
+    def update_progress(selesai, total, layanan):
+        progress_bar.progress(selesai / total, text=f"⏳ Backtest Prophet {selesai}/{total}: {layanan}")
+
+    df_titik, df_per_layanan, df_per_engine = backtest_semua_layanan(
+        df_hist, engines=engines, min_train=min_train, horizon=horizon, n_workers=n_workers,
+        progress_callback=update_progress, layanan_col='Layanan', cache=cache_backtest)
+    progress_bar.empty()
+
+    if df_titik.empty:
+        st.warning("⚠️ Tidak ada origin yang memenuhi minimal tahun latih.")
+        return
+
+    st.markdown("**📊 Akurasi out-of-sample per engine**")
+    st.dataframe(df_per_engine, use_container_width=True, hide_index=True)
+
+    st.markdown(f"**📌 Akurasi out-of-sample: {layanan_terpilih}**")
+    st.dataframe(df_per_layanan[df_per_layanan['Layanan'] == layanan_terpilih], use_container_width=True, hide_index=True)
+    st.dataframe(df_titik[df_titik['Layanan'] == layanan_terpilih], use_container_width=True, hide_index=True)
+
+    with st.expander("🗂️ Akurasi out-of-sample seluruh layanan"):
+        df_pivot = df_per_layanan.pivot(index='Layanan', columns='Engine', values='MAPE (%)')
+        st.dataframe(pd.concat([df_pivot, df_pivot.fillna(float('inf')).idxmin(axis=1)
+                             .where(df_pivot.notna().any(axis=1)).rename('Engine Terbaik')], axis=1),
+                     use_container_width=True)
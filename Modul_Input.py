@@ -1,5 +1,55 @@
+import os
 import streamlit as st
-import pandas as pd
+from Engine_Input import ATURAN_KONFLIK, daftar_sheet, gabung_dataset, hash_file, muat_banyak, muat_dataset
+from Engine_Store import data_store
+
+# Banyak file/sheet: pilih sheet, parsing paralel, lalu union pada kolom layanan → (df, kunci)
+def muat_multi_sumber(uploaded_files):
+    berkas = [(f.name, f.getvalue()) for f in uploaded_files]
+    pilihan, bawaan = {}, []
+    for nama, data_bytes in berkas:
+        for i, sheet in enumerate(daftar_sheet(data_bytes)):
+            pilihan[f"{nama} › {sheet}"] = (data_bytes, sheet)
+            if i == 0:
+                bawaan.append(f"{nama} › {sheet}")
+
+    label = list(pilihan)
+    if st.checkbox("📑 Pakai semua sheet di setiap file", value=False):
+        bawaan = label
+    terpilih = st.multiselect("🗂️ Sheet yang digabung (urutan = prioritas untuk aturan pertama/terakhir)",
+                              label, default=bawaan)
+    col1, col2 = st.columns(2)
+    aturan = col1.selectbox("⚖️ Aturan bila tahun yang sama terisi di beberapa sumber",
+                            list(ATURAN_KONFLIK), format_func=ATURAN_KONFLIK.get)
+    n_workers = col2.number_input("⚙️ Worker parsing paralel", min_value=1, max_value=os.cpu_count() or 1,
+                                  value=min(len(terpilih) or 1, os.cpu_count() or 1))
+    if not terpilih:
+        st.info("ℹ️ Pilih minimal satu sheet.")
+        return None, None
+
+    sumber = [(t, *pilihan[t]) for t in terpilih]
+    kunci = hash_file(b''.join(hash_file(b).encode() + str(sheet).encode() for _, b, sheet in sumber) + aturan.encode())
+    if st.session_state.get('df_raw_hash') == kunci and st.session_state.get('df_raw') is not None:
+        return st.session_state.df_raw, kunci
+
+    progress_bar = st.progress(0.0, text="⏳ Membaca sumber...")
+
+    def update_progress(selesai, total, label_sumber):
+        progress_bar.progress(selesai / total, text=f"⏳ Parsing {selesai}/{total}: {label_sumber}")
+
+    hasil = muat_banyak(sumber, n_workers=n_workers, progress_callback=update_progress)
+    progress_bar.empty()
+    df, df_konflik = gabung_dataset([df_sumber for df_sumber, _ in hasil], aturan,
+                                    label_sumber=[label_sumber for label_sumber, _, _ in sumber])
+    st.caption(f"🔗 {len(sumber)} sumber digabung → {len(df):,} layanan × {df.shape[1] - 1} tahun "
+               f"({sum(dari_cache for _, dari_cache in hasil)} sumber dari cache kolumnar).")
+    if df_konflik.empty:
+        st.caption("✅ Tidak ada konflik nilai antar sumber.")
+    else:
+        with st.expander(f"⚠️ {len(df_konflik):,} sel (layanan, tahun) bernilai berbeda antar sumber"):
+            st.dataframe(df_konflik, use_container_width=True, hide_index=True)
+            st.caption(f"Diselesaikan dengan aturan: {ATURAN_KONFLIK[aturan]}.")
+    return df, kunci
 
 def modul_input_page():
     st.title("📥 Modul Input: Upload Dataset Historis Layanan DJID")
@@ -16,12 +66,29 @@ def modul_input_page():
     - Kolom selanjutnya: Tahun (misal: `2019`, `2020`, ..., `2024`)
     """)
 
-    uploaded_file = st.file_uploader("📂 Unggah Dataset (.xlsx)", type=["xlsx"])
+    uploaded_files = st.file_uploader("📂 Unggah Dataset (.xlsx) — boleh beberapa file sekaligus (mis. per wilayah)",
+                                      type=["xlsx"], accept_multiple_files=True)
 
-    if uploaded_file:
+    if uploaded_files:
         try:
-            df = pd.read_excel(uploaded_file)
+            if len(uploaded_files) > 1 or st.checkbox("📑 Gabungkan beberapa sheet dari file ini", value=False):
+                df, kunci = muat_multi_sumber(uploaded_files)
+                if df is None:
+                    return st.session_state.get('df_raw', None)
+                sumber = "gabungan multi-sumber"
+            else:
+                data_bytes = uploaded_files[0].getvalue()
+                kunci = hash_file(data_bytes)
+
+                # File yang sama sudah dimuat di sesi ini → tidak perlu baca ulang
+                if st.session_state.get('df_raw_hash') == kunci and st.session_state.get('df_raw') is not None:
+                    df = st.session_state.df_raw
+                    sumber = "sesi aktif"
+                else:
+                    df, kunci, dari_cache = muat_dataset(data_bytes)
+                    sumber = "cache kolumnar (Parquet)" if dari_cache else "pembacaan streaming Excel"
             st.success("✅ Dataset berhasil diunggah!")
+            st.caption(f"⚡ Dimuat dari {sumber} — hanya kolom layanan & kolom tahun numerik yang disimpan.")
             st.markdown("### 👀 Pratinjau 5 Baris Pertama Dataset")
             st.dataframe(df.head())
 
@@ -33,7 +100,11 @@ def modul_input_page():
             - Tahun ditulis dalam format numerik (`2021`, bukan `Thn 2021`)
             """)
 
-            st.session_state.df_raw = df  # Simpan ke session_state
+            # kunci file sumber dipasang sekali di sini → data_store.bagikan() tidak meng-hash ulang df tiap rerun
+            st.session_state.df_raw = data_store.tandai(df, 'input', kunci)  # Simpan ke session_state
+            st.session_state.df_raw_hash = kunci
+            # identitas dataset lintas versi/sesi (mode inkremental): nama file, bukan isinya
+            st.session_state.df_raw_sumber = sorted(f.name for f in uploaded_files)
 
         except Exception as e:
             st.error(f"❌ Gagal membaca file: {e}")
@@ -94,7 +94,7 @@ Evaluasi berbobot lebih disarankan dalam sistem berbasis pengetahuan (KBS), kare
 Hasil menunjukkan bahwa model Prophet memiliki performa yang **{kategori_w.lower()}**, dan layak digunakan untuk mendukung pengambilan keputusan prediktif di lingkungan layanan publik seperti DJID.
 
 Jika dibutuhkan peningkatan akurasi, maka:
-- Dapat digunakan model alternatif seperti XGBoost/LSTM untuk tren nonlinier.
+- Gunakan mode **Turnamen multi-engine** di Modul Prediksi agar setiap layanan memakai engine terbaiknya (Prophet, ETS, ARIMA, tren linier/teredam); model nonlinier seperti XGBoost/LSTM dapat ditambahkan sebagai peserta.
 - Disarankan untuk meningkatkan kualitas dan resolusi data tahunan.
 
 Kesimpulannya, pendekatan prediktif ini mampu berfungsi sebagai komponen **inteligensi kuantitatif dalam arsitektur KBS modern**.
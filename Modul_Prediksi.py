@@ -1,22 +1,140 @@
+import json
+import os
 import streamlit as st
 import pandas as pd
-from prophet import Prophet
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+from Engine_Prediksi import (PARAM_PROPHET, evaluasi_mape_kategori, jumlah_worker_default,
+                             prediksi_semua_layanan, susun_hasil_prediksi)
+from Engine_Cache import cache_prediksi
+from Engine_Job import STATUS_GAGAL, STATUS_SELESAI, antrean_job
+from Engine_Store import data_store
+from Engine_Tren import PARAM_TREN, prediksi_tren_semua_layanan
+from Engine_Inkremental import pangkas_state, path_state_dataset, prediksi_inkremental, ringkasan_inkremental
+from Engine_Hierarki import LABEL_METODE, prediksi_hierarki, ringkasan_hierarki
+from Engine_Interval import TINGKAT_INTERVAL, label_tingkat, tingkat_tersedia
+from Engine_Backtest import cache_backtest
+from Engine_Turnamen import LABEL_ENGINE, PARAM_TURNAMEN, prediksi_turnamen_semua_layanan, ringkasan_turnamen
 
-# Evaluasi akurasi berdasarkan MAPE
-def evaluasi_mape_kategori(mape):
-    if mape <= 10:
-        return "Sangat Akurat (Highly Accurate)"
-    elif mape <= 20:
-        return "Akurat (Good Forecast)"
-    elif mape <= 50:
-        return "Cukup Akurat (Reasonable Forecast)"
-    else:
-        return "Tidak Akurat (Inaccurate Forecast)"
+ENGINE_PREDIKSI = {
+    "Facebook Prophet (per layanan)": None,
+    "Tren Linier (batch, cepat)": {**PARAM_TREN, 'metode': 'linier'},
+    "Tren Teredam / Damped (batch, cepat)": {**PARAM_TREN, 'metode': 'teredam'},
+    "🏆 Turnamen multi-engine (engine terbaik per layanan)": PARAM_TURNAMEN,
+}
+
+INTERVAL_POLLING = 1.0
+
+PILIHAN_TINGKAT_INTERVAL = [0.5, 0.8, 0.9, 0.95, 0.99]
+
+# Kunci turunan kedua keluaran (kunci masukan + parameter efektif) dipasang di sini, sehingga data_store.bagikan()
+# tidak meng-hash ulang hasil prediksi setiap rerun. n_workers/cache/inkremental tidak mengubah hasil.
+def tandai_hasil(df_prediksi_final, df_evaluasi, *asal):
+    return data_store.tandai(df_prediksi_final, 'prediksi', *asal), data_store.tandai(df_evaluasi, 'evaluasi', *asal)
+
+# Dijalankan di thread worker antrean job (bukan thread skrip Streamlit)
+def _job_prophet(job, df, n_workers, cache, path_state, params):
+    def simpan_parsial(layanan, hasil):
+        job.tambah_parsial(hasil)
+
+    if path_state:
+        return prediksi_inkremental(df, path_state, n_workers=n_workers, progress_callback=job.progres, cache=cache,
+                                    params=params, hasil_callback=simpan_parsial)
+    gabungan_list, eval_rows = prediksi_semua_layanan(df, n_workers=n_workers, progress_callback=job.progres,
+                                                      cache=cache, params=params, hasil_callback=simpan_parsial)
+    return gabungan_list, eval_rows, None
+
+# Polling status job tanpa memblokir halaman; setelah job tuntas seluruh app di-rerun untuk menampilkan hasil
+@st.fragment(run_every=INTERVAL_POLLING)
+def pantau_job_prophet(kunci):
+    job = antrean_job.ambil(kunci)
+    if job is None:
+        return
+    if not job.aktif:
+        st.rerun()
+    st.progress(job.selesai / job.total if job.total else 0.0,
+                text=f"🧵 Job {job.status}: {job.selesai}/{job.total or '?'} layanan {job.label}")
+    parsial = job.ambil_parsial()
+    if parsial:
+        st.caption(f"📥 Hasil parsial: {len(parsial)} layanan sudah selesai (diperbarui otomatis).")
+        st.dataframe(pd.DataFrame([eval_row for _, eval_row in parsial]), use_container_width=True, hide_index=True)
+    elif job.jarak_jauh:
+        st.caption("🔗 Job identik sedang dijalankan proses server lain; hasil akan dipakai bersama.")
+
+# Turnamen model: engine murah (batch) diuji lebih dulu pada tahun holdout seluruh layanan, Prophet hanya
+# di-fit untuk layanan yang belum lolos ambang MAPE → (df_prediksi_final, df_evaluasi, n_workers, cache) atau None
+def modul_turnamen(df, params):
+    col1, col2 = st.columns(2)
+    engines = col1.multiselect("🤼 Engine peserta (urut dari termurah)", list(LABEL_ENGINE),
+                               default=params['engines'], format_func=LABEL_ENGINE.get)
+    ambang = col2.number_input("🎯 Ambang early exit: MAPE uji (%) engine batch terbaik", min_value=0.0,
+                               value=float(params['ambang_mape']), step=1.0)
+    n_workers = st.number_input("⚙️ Jumlah proses paralel (worker)", min_value=1,
+                                max_value=jumlah_worker_default(), value=jumlah_worker_default())
+    pakai_cache = st.checkbox("💾 Gunakan cache prediksi & cache uji (dibagi dengan Prophet dan backtest)", value=True)
+    st.caption(f"ℹ️ Tahun terakhir setiap layanan ditahan sebagai data uji; engine dengan MAE uji terkecil menang "
+               f"dan di-fit ulang pada seluruh data. Layanan dengan MAPE uji ≤ {ambang:g}% dari engine batch "
+               f"tidak di-fit Prophet. Blok layanan & fit Prophet dibagi ke beberapa proses CPU.")
+    if not engines:
+        st.warning("⚠️ Pilih minimal satu engine peserta.")
+        return None
+
+    progress_bar = st.progress(0.0, text="⏳ Memulai turnamen model...")
+
+    def update_progress(selesai, total, label):
+        progress_bar.progress(selesai / total, text=f"⏳ Turnamen {selesai}/{total}: {label}")
+
+    cache = cache_prediksi if pakai_cache else None
+    params = {**params, 'engines': engines, 'ambang_mape': ambang}
+    df_prediksi, df_evaluasi, df_turnamen = prediksi_turnamen_semua_layanan(
+        df, params=params, n_workers=n_workers,
+        progress_callback=update_progress, cache=cache, cache_uji=cache_backtest if pakai_cache else None)
+    progress_bar.empty()
+
+    st.subheader("🏆 Hasil Turnamen Model")
+    df_ringkasan = ringkasan_turnamen(df_turnamen)
+    col1, col2 = st.columns(2)
+    col1.metric("⚡ Layanan early exit (tanpa engine mahal)", f"{int(df_turnamen['Early Exit'].sum()):,}")
+    col2.metric("🤼 Rata-rata engine dicoba per layanan", f"{df_turnamen['Engine Dicoba'].mean():.2f}")
+    fig = px.bar(df_ringkasan, x='Pemenang', y='Jumlah Layanan', text='Porsi (%)',
+                 title="Jumlah layanan yang dimenangkan setiap engine")
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(df_ringkasan, use_container_width=True, hide_index=True)
+    with st.expander(f"📋 Skor uji per layanan ({len(df_turnamen):,} layanan)"):
+        st.dataframe(df_turnamen, use_container_width=True, hide_index=True)
+        st.caption("Kolom MAE <engine> kosong = engine tidak dicoba (early exit atau data uji tidak memadai).")
+
+    df_prediksi_final, df_evaluasi = tandai_hasil(*susun_hasil_prediksi([df_prediksi], df_evaluasi),
+                                                  data_store.kunci(df), params)
+    return df_prediksi_final, df_evaluasi, n_workers, cache
+
+# Rekonsiliasi hierarkis TOTAL → (klaster) → layanan di atas ramalan dasar per layanan
+def modul_hierarki(df, df_prediksi_final, df_evaluasi, df_klaster, params, n_workers=1, cache=None):
+    col1, col2 = st.columns(2)
+    metode = col1.selectbox("🧮 Metode rekonsiliasi", list(LABEL_METODE), format_func=LABEL_METODE.get)
+    pakai_klaster = col2.checkbox("🧩 Tambahkan level klaster (dari Model Clustering Tren)",
+                                  value=df_klaster is not None, disabled=df_klaster is None)
+    grup = df_klaster.set_index('Layanan DJID')['Cluster'] if pakai_klaster and df_klaster is not None else None
+    asal = (data_store.kunci(df), data_store.kunci(df_prediksi_final), params, metode,
+            data_store.kunci(df_klaster) if grup is not None else None)
+
+    with st.spinner("⏳ Meramal node agregat & merekonsiliasi seluruh level..."):
+        df_prediksi_final, df_evaluasi_rekon, df_node = prediksi_hierarki(
+            df, df_prediksi_final, params, metode=metode, grup=grup, n_workers=n_workers, cache=cache)
+
+    st.markdown("**📐 Akurasi historis per level (sebelum vs sesudah rekonsiliasi)**")
+    st.dataframe(ringkasan_hierarki(df_node, df_evaluasi, df_evaluasi_rekon), use_container_width=True, hide_index=True)
+    node_terpilih = st.selectbox("🌳 Pilih node agregat", df_node['Node'].unique())
+    df_plot = df_node[df_node['Node'] == node_terpilih].melt(
+        id_vars='Tahun', value_vars=['Aktual', 'Prediksi Dasar', 'Prediksi'], var_name='Tipe', value_name='Jumlah')
+    fig = px.line(df_plot, x='Tahun', y='Jumlah', color='Tipe', markers=True,
+                  title=f"Ramalan Dasar vs Terekonsiliasi: {node_terpilih}")
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("ℹ️ Setelah rekonsiliasi, jumlah ramalan layanan = ramalan klaster = ramalan TOTAL untuk setiap tahun. "
+               "Bottom-up tidak meramal node agregat sehingga kolom Prediksi Dasar kosong.")
+    return tandai_hasil(df_prediksi_final, df_evaluasi_rekon, 'hierarki', *asal)
 
-def modul_prediksi(df):
+def modul_prediksi(df, df_klaster=None):
     st.title("🔮 Modul Prediksi: Facebook Prophet")
 
     st.markdown("""
@@ -53,67 +171,127 @@ def modul_prediksi(df):
         st.warning("⚠️ Silakan unggah dan preprocessing dataset terlebih dahulu.")
         return None, None
 
-    layanan_col = 'Layanan DJID'
-    layanan_list = df[layanan_col].unique()
-    forecast_list = []
-    eval_rows = []
-    gabungan_list = []
-
-    for layanan in layanan_list:
-        data_layanan = df[df[layanan_col] == layanan][['Tahun', 'Jumlah']].copy()
-        data_layanan.columns = ['Tahun', 'Aktual']
-        prophet_data = data_layanan.copy()
-        prophet_data.columns = ['ds', 'y']
-        prophet_data['ds'] = pd.to_datetime(prophet_data['ds'], format='%Y')
-
-        # Fit model Prophet
-        model = Prophet(yearly_seasonality=False, daily_seasonality=False)
-        model.fit(prophet_data)
-
-        # Prediksi 2 tahun ke depan
-        future = model.make_future_dataframe(periods=3, freq='Y')
-        forecast = model.predict(future)
-
-        pred = forecast[['ds', 'yhat']].copy()
-        pred['Tahun'] = pred['ds'].dt.year
-        pred['Layanan'] = layanan
-        pred.rename(columns={'yhat': 'Prediksi'}, inplace=True)
-
-        # Gabungkan prediksi dengan aktual
-        gabung = pd.merge(pred[['Tahun', 'Layanan', 'Prediksi']], data_layanan, on=['Tahun'], how='left')
-        forecast_list.append(pred[['Tahun', 'Layanan', 'Prediksi']])
-        gabungan_list.append(gabung)
-
-        # Evaluasi model historis
-        y_true = prophet_data['y'].values
-        y_pred = model.predict(prophet_data)['yhat'].values
-        mae = mean_absolute_error(y_true, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_true, y_pred))
-        mape = np.mean(np.abs((y_true - y_pred) / y_true)) * 100
-
-        eval_rows.append({
-            'Layanan': layanan,
-            'MAE': mae,
-            'RMSE': rmse,
-            'MAPE (%)': round(mape, 2),
-            'Validasi Akurasi': evaluasi_mape_kategori(mape)
-        })
-
-    df_prediksi = pd.concat(gabungan_list, ignore_index=True)
-    df_evaluasi = pd.DataFrame(eval_rows)
-
-    # 🔁 Agregasi total nasional
-    df_prediksi_clean = df_prediksi.drop_duplicates(subset=['Tahun', 'Layanan'], keep='first')
-    df_total_from_layanan = df_prediksi_clean.groupby('Tahun').agg({
-        'Aktual': lambda x: np.nan if x.isna().all() else x.dropna().sum(),
-        'Prediksi': 'sum'
-    }).reset_index()
-    df_total_from_layanan.insert(0, 'Layanan', 'TOTAL')
-    df_prediksi_final = pd.concat([df_prediksi, df_total_from_layanan], ignore_index=True)
+    # === PILIH ENGINE
+    engine = st.radio("🧠 Pilih engine prediksi", list(ENGINE_PREDIKSI.keys()))
+    params_engine = ENGINE_PREDIKSI[engine]
+
+    # === INTERVAL PREDIKSI: dihitung di pass yang sama dengan titik ramalan, disimpan sebagai kolom hasil
+    tingkat = st.multiselect("📏 Tingkat interval prediksi", PILIHAN_TINGKAT_INTERVAL,
+                             default=list(TINGKAT_INTERVAL), format_func=label_tingkat)
+    tingkat = sorted(tingkat)
+    params_prophet = {**PARAM_PROPHET, 'interval': tingkat}
+    if params_engine is not None:
+        params_engine = {**params_engine, 'interval': tingkat}
+
+    if params_engine is not None and params_engine['engine'] == 'turnamen':
+        hasil = modul_turnamen(df, params_engine)
+        if hasil is None:
+            return None, None
+        df_prediksi_final, df_evaluasi, n_workers, cache_hierarki = hasil
+    elif params_engine is not None:
+        st.caption("⚡ Engine tren batch mem-fit garis tren seluruh layanan sekaligus dalam operasi matriks (tanpa Stan). "
+                   "Cocok untuk data tahunan pendek tanpa musiman; skema hasil sama dengan jalur Prophet.")
+        df_prediksi, df_evaluasi = prediksi_tren_semua_layanan(df, params=params_engine)
+        df_prediksi_final, df_evaluasi = tandai_hasil(*susun_hasil_prediksi([df_prediksi], df_evaluasi),
+                                                      data_store.kunci(df), params_engine)
+        n_workers, cache_hierarki = 1, None
+    else:
+        # === PARALELISASI FIT PER LAYANAN
+        n_workers = st.number_input("⚙️ Jumlah proses paralel (worker)", min_value=1,
+                                    max_value=jumlah_worker_default(), value=jumlah_worker_default())
+        st.caption("ℹ️ Setiap layanan di-fit dengan model Prophet tersendiri; fit dibagi ke beberapa proses CPU. Hasil identik dengan eksekusi serial.")
+
+        # === CACHE PREDIKSI
+        pakai_cache = st.checkbox("💾 Gunakan cache prediksi (lewati refit layanan yang datanya tidak berubah)", value=True)
+        if st.button("🗑️ Kosongkan cache prediksi"):
+            cache_prediksi.clear()
+
+        # === MODE INKREMENTAL
+        inkremental = st.checkbox("🔁 Mode inkremental (hanya fit ulang layanan yang baru, berubah, atau bertambah tahun)",
+                                  value=False)
+        # state inkremental per dataset (nama file sumber) + parameter: unggahan berikutnya dengan kolom tahun baru,
+        # di sesi mana pun, dibandingkan dengan run terakhir dataset yang sama
+        path_state = None
+        if inkremental:
+            path_state = path_state_dataset(st.session_state.get('df_raw_sumber') or data_store.kunci(df),
+                                            params_prophet)
+            pangkas_state(kecuali=path_state)
+
+        # === ANTREAN JOB LATAR BELAKANG
+        latar = st.checkbox("🧵 Jalankan di latar belakang (antrean job; permintaan identik antar sesi digabung)",
+                            value=False)
+
+        if latar:
+            kunci = "prophet:{}:{}:{}".format(data_store.kunci(df),
+                                              os.path.basename(path_state) if inkremental else 'penuh',
+                                              json.dumps(params_prophet, sort_keys=True))
+
+            def kirim_job(coba_ulang=False):
+                return antrean_job.kirim(kunci, f"Prophet {df['Layanan DJID'].nunique()} layanan", _job_prophet,
+                                         df, n_workers, cache_prediksi if pakai_cache else None, path_state,
+                                         params_prophet, coba_ulang=coba_ulang)
+
+            job = kirim_job()
+            with st.expander("📋 Antrean Job Server"):
+                st.dataframe(antrean_job.daftar(), use_container_width=True, hide_index=True)
+            if job.status == STATUS_GAGAL:
+                # job gagal disimpan apa adanya; dijalankan ulang hanya atas permintaan pengguna
+                st.error(f"❌ Job gagal: {job.error}")
+                if not st.button("🔁 Coba ulang job Prophet"):
+                    return None, None
+                job = kirim_job(coba_ulang=True)
+            if job.status != STATUS_SELESAI:
+                pantau_job_prophet(kunci)
+                return None, None
+            gabungan_list, eval_rows, df_status = job.hasil
+            st.success("✅ Hasil diambil dari antrean job latar belakang.")
+        else:
+            progress_bar = st.progress(0.0, text="⏳ Memulai fitting Prophet...")
+
+            def update_progress(selesai, total, layanan):
+                progress_bar.progress(selesai / total, text=f"⏳ Fitting Prophet {selesai}/{total}: {layanan}")
+
+            if inkremental:
+                gabungan_list, eval_rows, df_status = prediksi_inkremental(
+                    df, path_state, n_workers=n_workers, progress_callback=update_progress,
+                    cache=cache_prediksi if pakai_cache else None, params=params_prophet)
+            else:
+                gabungan_list, eval_rows = prediksi_semua_layanan(df, n_workers=n_workers,
+                                                                  progress_callback=update_progress,
+                                                                  cache=cache_prediksi if pakai_cache else None,
+                                                                  params=params_prophet)
+                df_status = None
+            progress_bar.empty()
+
+        if df_status is not None:
+            ringkasan = ringkasan_inkremental(df_status)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("🔄 Layanan di-fit ulang", ringkasan['Di-fit Ulang'])
+            col2.metric("♻️ Layanan dipakai ulang", ringkasan['Dipakai Ulang'])
+            col3.metric("🗑️ Layanan dihapus", ringkasan['Dihapus'])
+            with st.expander("📋 Status Perubahan Data per Layanan"):
+                st.dataframe(df_status, use_container_width=True, hide_index=True)
+
+        if pakai_cache:
+            with st.expander("📦 Statistik Cache Prediksi"):
+                st.dataframe(pd.DataFrame([cache_prediksi.statistik()]), use_container_width=True, hide_index=True)
+                st.caption("Hit = hasil diambil dari cache tanpa fit ulang Prophet; Miss = layanan baru/berubah yang di-fit ulang.")
+
+        df_prediksi_final, df_evaluasi = tandai_hasil(*susun_hasil_prediksi(gabungan_list, eval_rows),
+                                                      data_store.kunci(df), params_prophet)
+        cache_hierarki = cache_prediksi if pakai_cache else None
+
+    # === PERAMALAN HIERARKIS
+    if st.checkbox("🌳 Mode hierarkis: TOTAL nasional direkonsiliasi dengan ramalan layanan (bukan sekadar dijumlahkan)",
+                   value=False):
+        df_prediksi_final, df_evaluasi = modul_hierarki(df, df_prediksi_final, df_evaluasi, df_klaster,
+                                                        params_engine or params_prophet, n_workers, cache_hierarki)
 
     # === FILTER TAMPILAN
     layanan_terpilih = st.selectbox("📌 Pilih Layanan untuk ditampilkan", sorted(df_prediksi_final['Layanan'].unique()))
     df_filtered = df_prediksi_final[df_prediksi_final['Layanan'] == layanan_terpilih].copy()
+    if 'Engine' in df_filtered and df_filtered['Engine'].notna().any():
+        st.caption(f"🏆 Engine pemenang turnamen: **{LABEL_ENGINE[df_filtered['Engine'].dropna().iloc[0]]}**")
 
     # === GRAFIK
     st.subheader("📈 Grafik Aktual vs Prediksi")
@@ -123,16 +301,32 @@ def modul_prediksi(df):
     fig = px.line(df_long, x='Tahun', y='Jumlah', color='Tipe', markers=True,
                   title=f"Grafik Aktual dan Prediksi: {layanan_terpilih}")
     fig.for_each_trace(lambda trace: trace.update(line=dict(color='gold')) if trace.name == 'Prediksi' else None)
+
+    # pita interval dibaca langsung dari kolom hasil (tanpa memanggil model lagi); tingkat terlebar paling belakang
+    interval = tingkat_tersedia(df_filtered)
+    pita = [i for i in interval if i[0] in tingkat]
+    df_pita = df_filtered.drop_duplicates(subset='Tahun', keep='last').sort_values('Tahun')
+    for i, (tingkat_pita, bawah, atas) in enumerate(reversed(pita)):
+        fig.add_trace(go.Scatter(x=df_pita['Tahun'], y=df_pita[atas], mode='lines', line=dict(width=0),
+                                 showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=df_pita['Tahun'], y=df_pita[bawah], mode='lines', line=dict(width=0),
+                                 fill='tonexty', fillcolor=f"rgba(255, 215, 0, {0.15 + 0.15 * i:.2f})",
+                                 name=f"Interval {label_tingkat(tingkat_pita)}"))
+    fig.data = fig.data[len(fig.data) - 2 * len(pita):] + fig.data[:len(fig.data) - 2 * len(pita)]
     fig.update_layout(xaxis_title='Tahun', yaxis_title='Jumlah Layanan')
     st.plotly_chart(fig, use_container_width=True)
 
     st.caption("""
     📈 Garis prediksi (warna emas) menunjukkan proyeksi 3 tahun ke depan. Lihat apakah tren cenderung naik, turun, atau stabil.
+    Pita kuning adalah interval prediksi: rentang tempat nilai aktual diperkirakan berada pada tingkat keyakinan tersebut.
     """)
 
     # === TABEL
     st.subheader("📊 Tabel Data Aktual & Prediksi")
-    st.dataframe(df_filtered[['Layanan', 'Tahun', 'Aktual', 'Prediksi']], use_container_width=True, hide_index=True)
+    kolom_interval = [kolom for _, bawah, atas in interval for kolom in (bawah, atas)]
+    kolom_engine = ['Engine'] if 'Engine' in df_filtered else []
+    st.dataframe(df_filtered[['Layanan', *kolom_engine, 'Tahun', 'Aktual', 'Prediksi', *kolom_interval]],
+                 use_container_width=True, hide_index=True)
 
     st.caption("""
     Tabel ini menampilkan gabungan data historis dan prediksi untuk setiap layanan maupun total nasional.
@@ -1,5 +1,7 @@
 import streamlit as st
-import pandas as pd
+from Engine_Preprocessing import (bersihkan_dataset, deteksi_kolom_tahun, wide_ke_long,
+                                  agregasi_per_tahun, preprocessing_fusi, bandingkan_preprocessing)
+from Engine_Store import data_store
 
 def modul_preprocessing_agregasi(df):
     st.title("🧹 Modul Preprocessing: Agregasi Data Historis")
@@ -25,31 +27,46 @@ def modul_preprocessing_agregasi(df):
     st.subheader("🔍 Dimensi Awal Dataset")
     st.info(f"Dataset terdiri dari **{df.shape[0]} baris** dan **{df.shape[1]} kolom** sebelum dibersihkan.")
 
-    # Pembersihan awal
-    df_cleaned = df.drop_duplicates()
-    df_cleaned = df_cleaned.dropna(how='all', axis=1)
+    fusi = st.checkbox("⚡ Preprocessing satu lintasan (fusi)", value=True,
+                       help="Dedup, pemangkasan kolom kosong, wide → long dan agregasi dikerjakan dalam satu "
+                            "lintasan per blok baris tanpa DataFrame antara. Hasil identik dengan jalur bertahap.")
 
-    st.success("✅ Setelah membersihkan duplikat dan kolom kosong:")
-    st.dataframe(df_cleaned.head())
+    if fusi:
+        # kolom kandidat = kolom yang tidak seluruhnya kosong (sama dengan hasil pembersihan bertahap)
+        kolom_terisi = df.columns[df.notna().any().to_numpy()]
+        if not deteksi_kolom_tahun(df[kolom_terisi]):
+            st.error("❌ Kolom tahun tidak ditemukan. Pastikan kolom tahun bernama 2019, 2020, dst.")
+            return None
+        layanan_col = st.selectbox("🧾 Pilih kolom identitas Layanan", options=kolom_terisi)
+        try:
+            df_long, df_total, info = preprocessing_fusi(df, layanan_col)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return None
 
-    # Deteksi kolom tahun
-    year_columns = [col for col in df_cleaned.columns if str(col).isdigit()]
-    if not year_columns:
-        st.error("❌ Kolom tahun tidak ditemukan. Pastikan kolom tahun bernama 2019, 2020, dst.")
-        return None
+        st.success("✅ Pembersihan duplikat, kolom kosong dan transformasi selesai dalam satu lintasan:")
+        kolom_metrik = st.columns(len(info))
+        for kolom, (label, nilai) in zip(kolom_metrik, info.items()):
+            kolom.metric(label, f"{nilai:,}")
+    else:
+        # Pembersihan awal
+        df_cleaned = bersihkan_dataset(df)
+
+        st.success("✅ Setelah membersihkan duplikat dan kolom kosong:")
+        st.dataframe(df_cleaned.head())
 
-    # Pilih kolom identitas layanan
-    layanan_col = st.selectbox("🧾 Pilih kolom identitas Layanan", options=df_cleaned.columns)
+        # Deteksi kolom tahun
+        year_columns = deteksi_kolom_tahun(df_cleaned)
+        if not year_columns:
+            st.error("❌ Kolom tahun tidak ditemukan. Pastikan kolom tahun bernama 2019, 2020, dst.")
+            return None
 
-    # Transformasi wide → long
-    df_long = df_cleaned.melt(
-        id_vars=layanan_col,
-        value_vars=year_columns,
-        var_name='Tahun',
-        value_name='Jumlah'
-    )
-    df_long['Tahun'] = df_long['Tahun'].astype(int)
-    df_long = df_long.dropna()
+        # Pilih kolom identitas layanan
+        layanan_col = st.selectbox("🧾 Pilih kolom identitas Layanan", options=df_cleaned.columns)
+
+        # Transformasi wide → long
+        df_long = wide_ke_long(df_cleaned, layanan_col, year_columns)
+        df_total = agregasi_per_tahun(df_long)
 
     st.subheader("📊 Dataset Setelah Transformasi Wide → Long")
     st.dataframe(df_long.head())
@@ -61,12 +78,22 @@ def modul_preprocessing_agregasi(df):
 
     # ✅ Agregasi total per tahun
     st.subheader("📈 Total Jumlah Layanan DJID per Tahun")
-    df_total = df_long.groupby('Tahun')['Jumlah'].sum().reset_index()
-    df_total.columns = ['Tahun', 'Total Jumlah Layanan']
     st.dataframe(df_total)
 
     st.caption("""
     📌 Agregasi ini berguna untuk melihat **tren makro jumlah layanan** dari tahun ke tahun secara nasional.
     """)
 
-    return df_long
+    # Perbandingan waktu & puncak memori kedua jalur pada dataset ini
+    with st.expander("⏱️ Bandingkan jalur bertahap vs fusi"):
+        if st.button("▶️ Jalankan perbandingan"):
+            with st.spinner("Menjalankan kedua jalur..."):
+                df_banding, identik = bandingkan_preprocessing(df, layanan_col)
+            st.dataframe(df_banding, hide_index=True)
+            if identik:
+                st.success("✅ Hasil kedua jalur identik.")
+            else:
+                st.warning("⚠️ Hasil kedua jalur berbeda.")
+
+    # kedua jalur menghasilkan df_long identik → kunci cukup dari kunci df masukan + kolom layanan
+    return data_store.tandai(df_long, 'agregasi', data_store.kunci(df), layanan_col)
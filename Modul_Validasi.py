@@ -0,0 +1,53 @@
+import streamlit as st
+from Engine_Validasi import (TINGKAT_KRITIS, TINGKAT_PERINGATAN, gerbang_validasi, laporan_per_layanan,
+                             ringkasan_validasi, validasi_data)
+from Engine_Store import data_store
+
+# Gerbang kualitas data: dijalankan otomatis setelah preprocessing → (df_long yang lolos, tabel temuan)
+def modul_validasi(df_raw, df_long):
+    st.subheader("🛡️ Gerbang Kualitas Data")
+    st.caption("Pemeriksaan otomatis sebelum clustering & prediksi: tipe sel, jumlah nol/negatif, tahun "
+               "terlewat, nama layanan ganda dan outlier. Layanan bertingkat **Kritis** tidak diteruskan ke model.")
+
+    layanan_col = df_long.columns[0]  # format long: kolom layanan pilihan pengguna, Tahun, Jumlah
+    df_masalah = validasi_data(df_long, df_raw, layanan_col)
+    asal = (data_store.kunci(df_long), data_store.kunci(df_raw))
+    data_store.tandai(df_masalah, 'validasi', *asal)
+    laporan = laporan_per_layanan(df_masalah)
+    n_layanan = df_long[layanan_col].nunique()
+    n_kritis = int((laporan['Tingkat'] == TINGKAT_KRITIS).sum())
+    n_peringatan = int((laporan['Tingkat'] == TINGKAT_PERINGATAN).sum())
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Layanan", f"{n_layanan:,}")
+    col2.metric("🟥 Kritis", f"{n_kritis:,}")
+    col3.metric("🟨 Peringatan", f"{n_peringatan:,}")
+
+    st.dataframe(ringkasan_validasi(df_masalah), use_container_width=True, hide_index=True)
+
+    if df_masalah.empty:
+        st.success("✅ Seluruh layanan lolos pemeriksaan kualitas data.")
+        return df_long, df_masalah
+
+    with st.expander(f"📋 Laporan per layanan ({len(laporan):,} layanan bermasalah)"):
+        tingkat = st.multiselect("Tingkat", [TINGKAT_KRITIS, TINGKAT_PERINGATAN],
+                                 default=[TINGKAT_KRITIS, TINGKAT_PERINGATAN])
+        st.dataframe(laporan[laporan['Tingkat'].isin(tingkat)], use_container_width=True, hide_index=True)
+        st.markdown("**Rincian temuan**")
+        st.dataframe(df_masalah[df_masalah['Tingkat'].isin(tingkat)], use_container_width=True, hide_index=True)
+
+    kecualikan = [TINGKAT_KRITIS]
+    if st.checkbox("🚫 Kecualikan juga layanan dengan peringatan dari pemodelan", value=False):
+        kecualikan.append(TINGKAT_PERINGATAN)
+    df_lolos, ditolak = gerbang_validasi(df_long, df_masalah, kecualikan, layanan_col)
+    data_store.tandai(df_lolos, 'lolos', *asal, kecualikan)
+
+    if df_lolos.empty:
+        st.error("❌ Tidak ada layanan yang lolos gerbang kualitas data.")
+        return None, df_masalah
+    if ditolak:
+        st.warning(f"⚠️ {len(ditolak):,} layanan tidak diteruskan ke clustering & prediksi. "
+                   f"Perbaiki datanya di file sumber lalu unggah ulang.")
+    else:
+        st.info("ℹ️ Tidak ada layanan yang ditahan; peringatan di atas tetap perlu ditinjau.")
+    return df_lolos, df_masalah
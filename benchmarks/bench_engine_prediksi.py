@@ -0,0 +1,98 @@
+# Laporan perbandingan engine prediksi: Prophet per layanan vs Tren Linier / Teredam (batch).
+# Akurasi diukur out-of-sample: tahun terakhir setiap layanan ditahan (holdout) lalu diprediksi.
+#   python benchmarks/bench_engine_prediksi.py --n-layanan 200
+#   python benchmarks/bench_engine_prediksi.py --file dataset.xlsx
+import os
+import sys
+import time
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from data_sintetis import buat_long
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Prediksi import PARAM_PROPHET
+from Engine_Tren import PARAM_TREN, prediksi_tren_semua_layanan
+
+logging.getLogger('cmdstanpy').disabled = True
+
+def baca_data_long(path):
+    df = pd.read_excel(path)
+    kolom_tahun = [c for c in df.columns if str(c).isdigit()]
+    df_long = df.melt(id_vars=LAYANAN_COL, value_vars=kolom_tahun, var_name='Tahun', value_name='Jumlah').dropna()
+    df_long['Tahun'] = df_long['Tahun'].astype(int)
+    return df_long
+
+# Pisahkan tahun terakhir tiap layanan sebagai data uji
+def split_holdout(df):
+    tahun_akhir = df.groupby(LAYANAN_COL)['Tahun'].transform('max')
+    return df[df['Tahun'] < tahun_akhir], df[df['Tahun'] == tahun_akhir]
+
+def prediksi_holdout_prophet(df_train, df_test):
+    from prophet import Prophet
+    hasil = []
+    for layanan, grup in df_train.groupby(LAYANAN_COL, sort=False):
+        data = pd.DataFrame({'ds': pd.to_datetime(grup['Tahun'].astype(str), format='%Y'), 'y': grup['Jumlah']})
+        model = Prophet(yearly_seasonality=PARAM_PROPHET['yearly_seasonality'],
+                        daily_seasonality=PARAM_PROPHET['daily_seasonality'])
+        model.fit(data)
+        uji = df_test[df_test[LAYANAN_COL] == layanan]
+        future = pd.DataFrame({'ds': pd.to_datetime(uji['Tahun'].astype(str), format='%Y')})
+        hasil.append(pd.DataFrame({LAYANAN_COL: layanan, 'Tahun': uji['Tahun'].values,
+                                   'Prediksi': model.predict(future)['yhat'].values}))
+    return pd.concat(hasil, ignore_index=True)
+
+def prediksi_holdout_tren(df_train, metode):
+    df_pred, _ = prediksi_tren_semua_layanan(df_train, params={**PARAM_TREN, 'metode': metode, 'periods': 1})
+    df_pred = df_pred[df_pred['Aktual'].isna()].rename(columns={'Layanan': LAYANAN_COL})
+    return df_pred[[LAYANAN_COL, 'Tahun', 'Prediksi']]
+
+def skor(df_test, df_pred):
+    gabung = df_test.merge(df_pred, on=[LAYANAN_COL, 'Tahun'])
+    galat = gabung['Jumlah'] - gabung['Prediksi']
+    ape = (galat / gabung['Jumlah']).abs() * 100
+    return {
+        'MAE': galat.abs().mean(),
+        'RMSE': np.sqrt((galat ** 2).mean()),
+        'MAPE (%)': ape.mean(),
+        'Median APE (%)': ape.median(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandingkan engine Prophet vs tren batch")
+    parser.add_argument('--file', help="Dataset .xlsx (format Layanan DJID + kolom tahun)")
+    parser.add_argument('--n-layanan', type=int, default=200)
+    parser.add_argument('--tahun', type=int, default=6)
+    parser.add_argument('--tanpa-prophet', action='store_true', help="Lewati Prophet (hanya engine batch)")
+    args = parser.parse_args()
+
+    df = baca_data_long(args.file) if args.file else buat_long(args.n_layanan, args.tahun)
+    df_train, df_test = split_holdout(df)
+    print(f"Dataset: {df[LAYANAN_COL].nunique()} layanan, {df['Tahun'].nunique()} tahun (holdout = tahun terakhir)\n")
+
+    engine = {
+        'Tren Linier (batch)': lambda: prediksi_holdout_tren(df_train, 'linier'),
+        'Tren Teredam (batch)': lambda: prediksi_holdout_tren(df_train, 'teredam'),
+    }
+    if not args.tanpa_prophet:
+        engine = {'Prophet (per layanan)': lambda: prediksi_holdout_prophet(df_train, df_test), **engine}
+
+    baris = []
+    for nama, fungsi in engine.items():
+        t0 = time.perf_counter()
+        df_pred = fungsi()
+        durasi = time.perf_counter() - t0
+        baris.append({'Engine': nama, 'Waktu (s)': durasi, **skor(df_test, df_pred)})
+
+    laporan = pd.DataFrame(baris)
+    acuan = laporan['Waktu (s)'].iloc[0]
+    laporan['Speedup'] = acuan / laporan['Waktu (s)']
+    with pd.option_context('display.float_format', '{:,.4f}'.format, 'display.width', 120):
+        print(laporan.to_string(index=False))
+
+if __name__ == '__main__':
+    main()
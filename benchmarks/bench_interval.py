@@ -0,0 +1,76 @@
+# Overhead interval prediksi: titik ramalan saja vs titik ramalan + interval (satu pass yang sama).
+# Prophet: sampel prediktif (uncertainty_samples) per layanan; Tren batch: interval t dari galat OLS.
+# Interval disimpan sebagai kolom float32 di tabel hasil → dilaporkan juga tambahan ukuran hasilnya.
+#   python benchmarks/bench_interval.py --n-layanan 20 --n-tren 200000
+#   python benchmarks/bench_interval.py --tanpa-prophet
+import os
+import sys
+import time
+import logging
+import argparse
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from data_sintetis import buat_long
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Prediksi import PARAM_PROPHET, prediksi_semua_layanan, susun_hasil_prediksi
+from Engine_Tren import PARAM_TREN, prediksi_tren_semua_layanan
+from Engine_Interval import TINGKAT_INTERVAL
+from Engine_Store import ukuran_mb
+
+logging.getLogger('cmdstanpy').disabled = True
+
+def jalankan_prophet(df, params):
+    gabungan_list, eval_rows = prediksi_semua_layanan(df, params=params)
+    return susun_hasil_prediksi(gabungan_list, eval_rows)[0]
+
+def jalankan_tren(df, params):
+    return prediksi_tren_semua_layanan(df, params=params)[0]
+
+def ukur(fungsi, df, params):
+    t0 = time.perf_counter()
+    hasil = fungsi(df, params)
+    return time.perf_counter() - t0, hasil
+
+def main():
+    parser = argparse.ArgumentParser(description="Overhead interval prediksi (Prophet & tren batch)")
+    parser.add_argument('--n-layanan', type=int, default=20, help="Jumlah layanan untuk Prophet")
+    parser.add_argument('--n-tren', type=int, default=200_000, help="Jumlah layanan untuk tren batch")
+    parser.add_argument('--tahun', type=int, default=6)
+    parser.add_argument('--tingkat', default=','.join(map(str, TINGKAT_INTERVAL)),
+                        help="Tingkat interval, mis. 0.8,0.95")
+    parser.add_argument('--tanpa-prophet', action='store_true', help="Lewati Prophet (hanya tren batch)")
+    args = parser.parse_args()
+    tingkat = sorted(float(t) for t in args.tingkat.split(','))
+
+    skenario = []
+    if not args.tanpa_prophet:
+        df = buat_long(args.n_layanan, args.tahun)
+        jalankan_prophet(buat_long(2, args.tahun, seed=1), PARAM_PROPHET)  # pemanasan (import & kompilasi Stan)
+        skenario.append(('Prophet (per layanan)', jalankan_prophet, df, PARAM_PROPHET))
+    for metode in ('linier', 'teredam'):
+        skenario.append((f"Tren {metode.capitalize()} (batch)", jalankan_tren, buat_long(args.n_tren, args.tahun),
+                         {**PARAM_TREN, 'metode': metode}))
+
+    baris = []
+    for nama, fungsi, df, params in skenario:
+        waktu_titik, hasil_titik = ukur(fungsi, df, {**params, 'interval': []})
+        waktu_interval, hasil_interval = ukur(fungsi, df, {**params, 'interval': tingkat})
+        baris.append({
+            'Engine': nama,
+            'Layanan': df[LAYANAN_COL].nunique(),
+            'Titik (s)': waktu_titik,
+            '+ Interval (s)': waktu_interval,
+            'Overhead (%)': (waktu_interval / waktu_titik - 1) * 100,
+            'Hasil titik (MB)': ukuran_mb(hasil_titik),
+            'Hasil + interval (MB)': ukuran_mb(hasil_interval),
+        })
+
+    print(f"Tingkat interval: {', '.join(f'{t:.0%}' for t in tingkat)}\n")
+    with pd.option_context('display.float_format', '{:,.3f}'.format, 'display.width', 140):
+        print(pd.DataFrame(baris).to_string(index=False))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+# Benchmark seluruh tahap pipeline (headless) di atas dataset sintetis berformat DJID:
+# baca Excel → preprocessing → pivot → fitur tren → skala + PCA → KMeans → prediksi tren → Prophet (sampel) → evaluasi.
+# Setiap tahap dicatat waktu (wall) dan puncak memori (tracemalloc); hasil dapat disimpan sebagai JSON
+# untuk dibandingkan antar run / antar versi dependensi.
+#   python benchmarks/bench_pipeline.py --sizes 100 1000 10000 --tahun 6 --json hasil_bench.json
+#   python benchmarks/bench_pipeline.py --sizes 1000000 --tahun 5 --tanpa-excel --prophet-sampel 0
+import os
+import sys
+import time
+import json
+import logging
+import platform
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from data_sintetis import buat_wide, tulis_xlsx
+from sklearn.decomposition import PCA
+from sklearn.preprocessing import StandardScaler
+from Engine_Input import baca_excel_streaming
+from Engine_Preprocessing import LAYANAN_COL, preprocessing_agregasi
+from Engine_Clustering import FITUR_TREN, compute_trend_features, fit_kmeans, pivot_layanan
+from Engine_Tren import PARAM_TREN, prediksi_tren_semua_layanan
+from Engine_Prediksi import prediksi_semua_layanan, susun_hasil_prediksi
+from Engine_Evaluasi import evaluasi_semua_layanan
+
+logging.getLogger('cmdstanpy').disabled = True
+
+# Jalankan satu tahap, catat waktu & puncak memori yang dialokasikan selama tahap berjalan
+def ukur_tahap(nama, fungsi, catatan, lacak_memori=True):
+    if lacak_memori:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    hasil = fungsi()
+    detik = time.perf_counter() - t0
+    peak_mb = None
+    if lacak_memori:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    catatan.append({'tahap': nama, 'detik': round(detik, 4),
+                    'peak_mb': round(peak_mb, 2) if peak_mb is not None else None})
+    return hasil
+
+# Tahap skala + PCA seperti siapkan_fitur_klaster → fitur terskala (masukan KMeans)
+def skala_pca(df_fitur):
+    fitur_scaled = StandardScaler().fit_transform(df_fitur[FITUR_TREN])
+    PCA(n_components=2).fit_transform(fitur_scaled)
+    return fitur_scaled
+
+def prediksi_tren(df_long):
+    df_prediksi, df_evaluasi = prediksi_tren_semua_layanan(df_long, params=PARAM_TREN)
+    return susun_hasil_prediksi([df_prediksi], df_evaluasi)
+
+def bench_satu_ukuran(n_layanan, n_tahun, args, direktori_tmp):
+    catatan = []
+    lacak = not args.tanpa_memori
+    df_wide = buat_wide(n_layanan, n_tahun, seed=args.seed, rasio_kosong=0.01, rasio_duplikat=0.01)
+
+    if not args.tanpa_excel:
+        path = os.path.join(direktori_tmp, f"sintetis_{n_layanan}x{n_tahun}.xlsx")
+        tulis_xlsx(df_wide, path)
+        with open(path, 'rb') as f:
+            data_bytes = f.read()
+        df_wide = ukur_tahap('baca_excel', lambda: baca_excel_streaming(data_bytes), catatan, lacak)
+
+    df_long, _ = ukur_tahap('preprocessing', lambda: preprocessing_agregasi(df_wide, LAYANAN_COL), catatan, lacak)
+    df_pivot = ukur_tahap('pivot', lambda: pivot_layanan(df_long, LAYANAN_COL), catatan, lacak)
+    df_fitur = ukur_tahap('fitur_tren', lambda: compute_trend_features(df_pivot), catatan, lacak)
+    X = ukur_tahap('skala_pca', lambda: skala_pca(df_fitur), catatan, lacak)
+    ukur_tahap('kmeans', lambda: fit_kmeans(X, args.k), catatan, lacak)
+
+    df_pred, _ = ukur_tahap('prediksi_tren', lambda: prediksi_tren(df_long), catatan, lacak)
+    ukur_tahap('evaluasi', lambda: evaluasi_semua_layanan(df_pred), catatan, lacak)
+
+    # Prophet terlalu mahal untuk seluruh layanan → ukur pada sampel lalu ekstrapolasi linier
+    n_sampel = min(args.prophet_sampel, n_layanan)
+    if n_sampel > 0:
+        layanan_sampel = df_long[LAYANAN_COL].drop_duplicates().iloc[:n_sampel]
+        df_sampel = df_long[df_long[LAYANAN_COL].isin(layanan_sampel)]
+        ukur_tahap('prophet_sampel', lambda: prediksi_semua_layanan(df_sampel, n_workers=args.workers),
+                   catatan, lacak_memori=False)
+        per_layanan = catatan[-1]['detik'] / n_sampel
+        catatan[-1].update({'n_sampel': n_sampel, 'detik_per_layanan': round(per_layanan, 4),
+                            'estimasi_detik_total': round(per_layanan * n_layanan, 1)})
+
+    for c in catatan:
+        c.update({'n_layanan': n_layanan, 'n_tahun': n_tahun})
+    return catatan
+
+def info_lingkungan():
+    import sklearn
+    return {
+        'waktu': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+def main():
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Benchmark per tahap pipeline KBS pada data sintetis DJID")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help="Jumlah layanan")
+    parser.add_argument('--tahun', type=int, nargs='+', default=[6], help="Jumlah kolom tahun")
+    parser.add_argument('--k', type=int, default=3, help="Jumlah klaster KMeans")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--prophet-sampel', type=int, default=10,
+                        help="Jumlah layanan sampel untuk Prophet (0 = lewati)")
+    parser.add_argument('--workers', type=int, default=1, help="Worker Prophet")
+    parser.add_argument('--tanpa-excel', action='store_true', help="Lewati tahap tulis/baca workbook")
+    parser.add_argument('--tanpa-memori', action='store_true', help="Tanpa tracemalloc (waktu murni)")
+    parser.add_argument('--json', help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    hasil = []
+    print(f"{'Layanan':>9} {'Tahun':>5}  {'Tahap':<16} {'Detik':>9} {'Peak MB':>9}")
+    with tempfile.TemporaryDirectory() as direktori_tmp:
+        for n_tahun in args.tahun:
+            for n in args.sizes:
+                for c in bench_satu_ukuran(n, n_tahun, args, direktori_tmp):
+                    peak = f"{c['peak_mb']:>9.1f}" if c['peak_mb'] is not None else f"{'-':>9}"
+                    ekstra = f"  (≈{c['estimasi_detik_total']} s untuk {n} layanan)" if 'estimasi_detik_total' in c else ""
+                    print(f"{n:>9} {n_tahun:>5}  {c['tahap']:<16} {c['detik']:>9.4f} {peak}{ekstra}")
+                    hasil.append(c)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'lingkungan': info_lingkungan(), 'hasil': hasil}, f, indent=2)
+        print(f"Hasil disimpan ke {args.json}")
+
+if __name__ == '__main__':
+    main()
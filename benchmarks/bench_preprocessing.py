@@ -0,0 +1,44 @@
+# Benchmark preprocessing: rantai lama (drop_duplicates → dropna → melt → astype → dropna → groupby)
+# vs jalur fusi satu lintasan, pada dataset wide sintetis dengan sel kosong & baris duplikat.
+#   python benchmarks/bench_preprocessing.py --sizes 10000 100000 1000000 --tahun 10
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from data_sintetis import buat_wide
+from Engine_Preprocessing import LAYANAN_COL, bandingkan_preprocessing
+from Engine_Store import ukuran_mb
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing rantai lama vs fusi satu lintasan")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help="Jumlah layanan")
+    parser.add_argument('--tahun', type=int, nargs='+', default=[6], help="Jumlah kolom tahun")
+    parser.add_argument('--rasio-kosong', type=float, default=0.05)
+    parser.add_argument('--rasio-duplikat', type=float, default=0.05)
+    parser.add_argument('--json', help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    hasil = []
+    print(f"{'Layanan':>9} {'Tahun':>5} {'Input MB':>9}  {'Jalur':<36} {'Detik':>8} {'Peak MB':>9}  Identik")
+    for n_tahun in args.tahun:
+        for n in args.sizes:
+            df = buat_wide(n, n_tahun, rasio_kosong=args.rasio_kosong, rasio_duplikat=args.rasio_duplikat)
+            input_mb = ukuran_mb(df)
+            df_banding, identik = bandingkan_preprocessing(df, LAYANAN_COL)
+            for _, row in df_banding.iterrows():
+                print(f"{n:>9} {n_tahun:>5} {input_mb:>9.1f}  {row['Jalur']:<36} {row['Detik']:>8.3f} "
+                      f"{row['Puncak Memori (MB)']:>9.1f}  {identik}")
+                hasil.append({'n_layanan': n, 'n_tahun': n_tahun, 'input_mb': round(input_mb, 2),
+                              'jalur': row['Jalur'], 'detik': row['Detik'],
+                              'peak_mb': row['Puncak Memori (MB)'], 'identik': identik})
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(hasil, f, indent=2)
+        print(f"Hasil disimpan ke {args.json}")
+
+if __name__ == '__main__':
+    main()
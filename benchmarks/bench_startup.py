@@ -0,0 +1,83 @@
+# Breakdown waktu impor (cold start) untuk kbs.py: dependensi berat & modul halaman.
+# Setiap target diimpor di proses Python baru dengan `-X importtime`, sehingga angkanya
+# mencerminkan biaya cold start setelah container restart.
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --json startup.json --ulang 3
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEPENDENSI = ['streamlit', 'pandas', 'numpy', 'openpyxl', 'sklearn', 'matplotlib.pyplot',
+              'seaborn', 'plotly.express', 'prophet']
+HALAMAN = ['Modul_Input', 'Modul_Preprocessing_Agregasi', 'Modul_Clustering_Tren',
+           'Modul_Prediksi', 'Modul_Evaluasi', 'Modul_Kesimpulan']
+
+# Yang diimpor kbs.py sebelum sidebar tampil (versi lama: seluruh modul halaman)
+STARTUP_LAZY = ['streamlit']
+STARTUP_EAGER = ['streamlit'] + HALAMAN
+
+def ukur_impor(modul, ulang=1):
+    kode = ';'.join(f"import {m}" for m in modul)
+    terbaik = None
+    for _ in range(ulang):
+        t0 = time.perf_counter()
+        proses = subprocess.run([sys.executable, '-X', 'importtime', '-c', kode], cwd=ROOT,
+                                capture_output=True, text=True)
+        wall = time.perf_counter() - t0
+        if proses.returncode != 0:
+            return {'error': proses.stderr.strip().splitlines()[-1] if proses.stderr else 'gagal'}
+        if terbaik is None or wall < terbaik['wall_s']:
+            terbaik = {'wall_s': wall, 'paket': paket_teratas(proses.stderr)}
+    return terbaik
+
+# Ambil waktu kumulatif impor langsung (level 1) dari modul target, dikelompokkan per paket akar
+def paket_teratas(stderr, top=8):
+    kumulatif = {}
+    for baris in stderr.splitlines():
+        if not baris.startswith('import time:') or 'cumulative' in baris:
+            continue
+        _, cum_us, nama = baris[len('import time:'):].split('|')
+        nama = nama[1:].rstrip()
+        level = (len(nama) - len(nama.lstrip())) // 2
+        if level == 1:
+            akar = nama.strip().split('.')[0]
+            kumulatif[akar] = kumulatif.get(akar, 0) + int(cum_us)
+    urut = sorted(kumulatif.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {nama: round(us / 1e6, 3) for nama, us in urut}
+
+def main():
+    parser = argparse.ArgumentParser(description="Breakdown waktu impor cold start kbs.py")
+    parser.add_argument('--ulang', type=int, default=1, help="Ambil waktu terbaik dari N percobaan")
+    parser.add_argument('--json', help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    hasil = {'python': sys.version.split()[0], 'dependensi': {}, 'halaman': {}, 'startup': {}}
+
+    print("== Dependensi ==")
+    for modul in DEPENDENSI:
+        r = hasil['dependensi'][modul] = ukur_impor([modul], args.ulang)
+        print(f"{modul:<32} {r.get('wall_s', float('nan')):>7.2f} s  {r.get('error', '')}")
+
+    print("\n== Modul halaman (termasuk dependensinya) ==")
+    for modul in HALAMAN:
+        r = hasil['halaman'][modul] = ukur_impor([modul], args.ulang)
+        rincian = ', '.join(f"{k} {v:.2f}s" for k, v in r.get('paket', {}).items())
+        print(f"{modul:<32} {r.get('wall_s', float('nan')):>7.2f} s  {r.get('error', rincian)}")
+
+    print("\n== Cold start sebelum sidebar tampil ==")
+    for nama, modul in (('lazy (kbs.py sekarang)', STARTUP_LAZY), ('eager (semua halaman)', STARTUP_EAGER)):
+        r = hasil['startup'][nama] = ukur_impor(modul, args.ulang)
+        print(f"{nama:<32} {r.get('wall_s', float('nan')):>7.2f} s")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(hasil, f, indent=2)
+        print(f"\nHasil disimpan ke {args.json}")
+
+if __name__ == '__main__':
+    main()
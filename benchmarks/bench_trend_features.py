@@ -0,0 +1,51 @@
+# Benchmark compute_trend_features: versi vektor (closed form) vs versi lama (polyfit per baris).
+#   python benchmarks/bench_trend_features.py --sizes 1000 10000 100000
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from data_sintetis import buat_pivot
+from Engine_Clustering import compute_trend_features, FITUR_TREN
+
+# Implementasi sebelumnya (referensi kecepatan & kebenaran)
+def compute_trend_features_polyfit(df_pivot):
+    tahun = np.array(df_pivot.columns, dtype=int)
+    fitur = pd.DataFrame(index=df_pivot.index)
+    fitur['Mean'] = df_pivot.mean(axis=1)
+    fitur['StdDev'] = df_pivot.std(axis=1)
+    fitur['Range'] = df_pivot.max(axis=1) - df_pivot.min(axis=1)
+    fitur['Slope'] = df_pivot.apply(lambda row: np.polyfit(tahun, row.values, 1)[0], axis=1)
+    fitur['Skewness'] = df_pivot.skew(axis=1)
+    return fitur
+
+def ukur(fungsi, df_pivot, ulang):
+    terbaik = float('inf')
+    for _ in range(ulang):
+        t0 = time.perf_counter()
+        hasil = fungsi(df_pivot)
+        terbaik = min(terbaik, time.perf_counter() - t0)
+    return terbaik, hasil
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compute_trend_features")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--tahun', type=int, default=6)
+    parser.add_argument('--ulang', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'Layanan':>10} {'Polyfit (s)':>12} {'Vektor (s)':>12} {'Speedup':>9}  Selisih maks")
+    for n in args.sizes:
+        df_pivot = buat_pivot(n, args.tahun)
+        t_lama, lama = ukur(compute_trend_features_polyfit, df_pivot, 1)
+        t_baru, baru = ukur(compute_trend_features, df_pivot, args.ulang)
+        selisih = (baru[FITUR_TREN] - lama[FITUR_TREN]).abs().max().max()
+        print(f"{n:>10} {t_lama:>12.4f} {t_baru:>12.4f} {t_lama / t_baru:>8.1f}x  {selisih:.2e}")
+
+if __name__ == '__main__':
+    main()
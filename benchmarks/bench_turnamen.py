@@ -0,0 +1,67 @@
+# Turnamen model per layanan: biaya & manfaat early exit serta skala terhadap jumlah worker.
+#   1. Turnamen lengkap (engine batch + Prophet) pada N layanan: tanpa early exit vs dengan ambang MAPE
+#      → jumlah fit Prophet yang dihemat, waktu, dan MAE uji rata-rata engine pemenang.
+#   2. Turnamen engine batch saja pada banyak layanan dengan 1..W worker (blok layanan di process pool).
+#   python benchmarks/bench_turnamen.py --n-layanan 30 --n-batch 200000 --workers 1,2,4
+import os
+import sys
+import time
+import logging
+import argparse
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from data_sintetis import buat_long
+from Engine_Turnamen import ENGINE_MAHAL, PARAM_TURNAMEN, tanding_semua_layanan
+
+logging.getLogger('cmdstanpy').disabled = True
+
+def ukur(df, params, n_workers=1):
+    t0 = time.perf_counter()
+    df_turnamen = tanding_semua_layanan(df, params=params, n_workers=n_workers)
+    return time.perf_counter() - t0, df_turnamen
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark turnamen model per layanan")
+    parser.add_argument('--n-layanan', type=int, default=30, help="Jumlah layanan untuk turnamen dengan Prophet")
+    parser.add_argument('--n-batch', type=int, default=200_000, help="Jumlah layanan untuk turnamen engine batch")
+    parser.add_argument('--tahun', type=int, default=7)
+    parser.add_argument('--workers', default='1,2', help="Daftar jumlah worker, mis. 1,2,4")
+    parser.add_argument('--tanpa-prophet', action='store_true', help="Lewati bagian 1 (Prophet)")
+    args = parser.parse_args()
+    daftar_worker = [int(w) for w in args.workers.split(',')]
+
+    if not args.tanpa_prophet:
+        df = buat_long(args.n_layanan, args.tahun)
+        tanding_semua_layanan(buat_long(2, args.tahun, seed=1), params={**PARAM_TURNAMEN, 'engines': ['prophet']})  # pemanasan
+        baris = []
+        for nama, ambang in (('Tanpa early exit', -1.0), (f"Early exit MAPE ≤ {PARAM_TURNAMEN['ambang_mape']:g}%",
+                                                         PARAM_TURNAMEN['ambang_mape'])):
+            durasi, df_turnamen = ukur(df, {**PARAM_TURNAMEN, 'ambang_mape': ambang})
+            fit_mahal = sum(df_turnamen[f"MAE {e}"].notna().sum() for e in ENGINE_MAHAL)
+            baris.append({'Skenario': nama, 'Waktu (s)': durasi, 'Fit Prophet': fit_mahal,
+                          'Early Exit': int(df_turnamen['Early Exit'].sum()),
+                          'MAE Uji Pemenang': df_turnamen['MAE Uji'].mean()})
+        print(f"1) Turnamen lengkap: {args.n_layanan} layanan × {args.tahun} tahun\n")
+        with pd.option_context('display.float_format', '{:,.3f}'.format, 'display.width', 140):
+            print(pd.DataFrame(baris).to_string(index=False))
+        print()
+
+    df = buat_long(args.n_batch, args.tahun)
+    params = {**PARAM_TURNAMEN, 'engines': [e for e in PARAM_TURNAMEN['engines'] if e not in ENGINE_MAHAL]}
+    baris = []
+    for n_workers in daftar_worker:
+        durasi, df_turnamen = ukur(df, params, n_workers)
+        baris.append({'Worker': n_workers, 'Waktu (s)': durasi, 'Layanan/detik': args.n_batch / durasi})
+    laporan = pd.DataFrame(baris)
+    laporan['Speedup'] = laporan['Waktu (s)'].iloc[0] / laporan['Waktu (s)']
+    print(f"2) Turnamen engine batch ({', '.join(params['engines'])}): {args.n_batch:,} layanan "
+          f"(CPU tersedia: {os.cpu_count()})\n")
+    with pd.option_context('display.float_format', '{:,.3f}'.format, 'display.width', 140):
+        print(laporan.to_string(index=False))
+    print("\nPemenang:", df_turnamen['Pemenang'].value_counts().to_dict())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# Generator dataset sintetis berbentuk DJID (kolom 'Layanan DJID' + satu kolom per tahun),
+# dipakai bersama oleh seluruh skrip benchmark. Dapat juga menulis workbook .xlsx:
+#   python benchmarks/data_sintetis.py --n-layanan 100000 --tahun 10 -o sintetis_100k.xlsx
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Engine_Preprocessing import LAYANAN_COL
+
+TAHUN_AKHIR = 2025
+
+# Matriks nilai (n_layanan × n_tahun): level acak, tren per layanan dan noise relatif terhadap level
+def buat_matriks(n_layanan, n_tahun, seed=42, tren_sd=0.08, noise_sd=0.05):
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(100, 10000, size=(n_layanan, 1))
+    tren = rng.normal(0, tren_sd, size=(n_layanan, 1)) * np.arange(n_tahun)
+    X = np.round(base * (1 + tren) + rng.normal(0, noise_sd, size=(n_layanan, n_tahun)) * base).clip(1)
+    return X
+
+def nama_layanan(n_layanan):
+    lebar = len(str(max(n_layanan - 1, 0)))
+    return [f"Layanan {i:0{lebar}d}" for i in range(n_layanan)]
+
+def daftar_tahun(n_tahun):
+    return list(range(TAHUN_AKHIR - n_tahun, TAHUN_AKHIR))
+
+# Format wide seperti workbook unggahan. rasio_kosong > 0 menyisipkan sel kosong (NaN),
+# rasio_duplikat > 0 menyisipkan baris duplikat persis (untuk menguji tahap pembersihan).
+def buat_wide(n_layanan, n_tahun, seed=42, rasio_kosong=0.0, rasio_duplikat=0.0):
+    X = buat_matriks(n_layanan, n_tahun, seed)
+    rng = np.random.default_rng(seed + 1)
+    if rasio_kosong > 0:
+        X[rng.random(X.shape) < rasio_kosong] = np.nan
+    df = pd.DataFrame(X, columns=[str(t) for t in daftar_tahun(n_tahun)])
+    df.insert(0, LAYANAN_COL, nama_layanan(n_layanan))
+    if rasio_duplikat > 0:
+        n_dup = int(n_layanan * rasio_duplikat)
+        df = pd.concat([df, df.iloc[rng.integers(0, n_layanan, n_dup)]], ignore_index=True)
+    return df
+
+# Format long (Layanan DJID, Tahun, Jumlah) seperti keluaran preprocessing
+def buat_long(n_layanan, n_tahun, seed=42):
+    X = buat_matriks(n_layanan, n_tahun, seed)
+    return pd.DataFrame({
+        LAYANAN_COL: np.repeat(nama_layanan(n_layanan), n_tahun),
+        'Tahun': np.tile(daftar_tahun(n_tahun), n_layanan),
+        'Jumlah': X.ravel(),
+    })
+
+# Format pivot (index layanan × kolom tahun) seperti masukan compute_trend_features
+def buat_pivot(n_layanan, n_tahun, seed=42):
+    X = buat_matriks(n_layanan, n_tahun, seed)
+    index = pd.Index(nama_layanan(n_layanan), name=LAYANAN_COL)
+    return pd.DataFrame(X, index=index, columns=daftar_tahun(n_tahun))
+
+# Tulis workbook secara streaming (openpyxl write-only) agar memori tetap rendah untuk jutaan baris
+def tulis_xlsx(df, path):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        ws.append([None if isinstance(v, float) and v != v else v for v in row])
+    wb.save(path)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Buat workbook sintetis berformat DJID")
+    parser.add_argument('--n-layanan', type=int, default=1000)
+    parser.add_argument('--tahun', type=int, default=6)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rasio-kosong', type=float, default=0.0)
+    parser.add_argument('--rasio-duplikat', type=float, default=0.0)
+    parser.add_argument('-o', '--output', required=True, help="Path file .xlsx atau .parquet")
+    args = parser.parse_args()
+
+    df = buat_wide(args.n_layanan, args.tahun, args.seed, args.rasio_kosong, args.rasio_duplikat)
+    if args.output.endswith('.parquet'):
+        df.to_parquet(args.output, index=False)
+    else:
+        tulis_xlsx(df, args.output)
+    print(f"{args.output}: {len(df)} baris × {df.shape[1]} kolom")
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,32 @@
 import sys
 import os
+import time
+import importlib
 sys.path.append(os.path.dirname(__file__))
 
 import streamlit as st
-
-# Import semua modul
-from Modul_Input import modul_input_page
-from Modul_Preprocessing_Agregasi import modul_preprocessing_agregasi
-from Modul_Clustering_Tren import modul_clustering_tren
-from Modul_Prediksi import modul_prediksi
-from Modul_Evaluasi import modul_evaluasi
-from Modul_Kesimpulan import modul_kesimpulan
+from Engine_Instrumentasi import PATH_LOG_DEFAULT, mulai_profil, tahap
+from Engine_Store import data_store
+from Engine_Ekspor import FORMAT_EKSPOR, ekspor_bundel, susun_tabel_ekspor
 
 # Konfigurasi layout halaman
 st.set_page_config(page_title="KBS - Prediksi Layanan DJID", layout="wide")
 
+# Catatan waktu impor modul halaman (bertahan lintas rerun & sesi dalam satu proses server)
+@st.cache_resource
+def waktu_muat_modul():
+    return {}
+
+# Impor modul halaman secara lazy: dependensi berat (prophet, sklearn, matplotlib, seaborn, plotly)
+# baru dimuat ketika halaman tersebut pertama kali dibuka.
+def muat_halaman(nama_modul, nama_fungsi):
+    if nama_modul not in sys.modules:
+        t0 = time.perf_counter()
+        with tahap(f"Impor {nama_modul}"):
+            importlib.import_module(nama_modul)
+        waktu_muat_modul()[nama_modul] = time.perf_counter() - t0
+    return getattr(sys.modules[nama_modul], nama_fungsi)
+
 # Judul & Navigasi Sidebar
 with st.sidebar:
     st.markdown("## 📚 Prediksi Layanan DJID")
@@ -27,46 +39,128 @@ with st.sidebar:
         "Kesimpulan"
     ))
 
-# Inisialisasi session state jika belum ada
+    with st.expander("⏱️ Waktu Muat Modul"):
+        waktu = waktu_muat_modul()
+        if waktu:
+            for nama_modul, detik in waktu.items():
+                st.caption(f"{nama_modul}: {detik:.2f} s")
+        else:
+            st.caption("Belum ada modul halaman yang dimuat.")
+
+    profil_aktif = st.checkbox("🩺 Instrumentasi per tahap (waktu, CPU, memori)", value=False)
+
+# Profiler run ini (None bila nonaktif → seluruh tahap menjadi no-op)
+profiler = mulai_profil(modul, aktif=profil_aktif)
+
+# Inisialisasi session state jika belum ada.
+# DataFrame hasil setiap modul disimpan lewat data_store: satu salinan kompak (categorical/downcast)
+# per isi dataset yang dipakai bersama oleh semua sesi; session_state hanya memegang referensinya.
 state = st.session_state
-for key in ['df_raw', 'df_agregasi', 'df_clustered', 'df_prediksi',
-            'df_eval_total', 'df_clustered_tren']:
+KUNCI_STATE = ['df_raw', 'df_agregasi', 'df_validasi', 'df_lolos', 'df_prediksi', 'df_evaluasi_model', 'df_eval_total',
+               'df_clustered_tren']
+for key in KUNCI_STATE:
     if key not in state:
         state[key] = None
 
 # Routing antar modul
 if modul == "Input Dataset":
-    state.df_raw = modul_input_page()
+    modul_input_page = muat_halaman("Modul_Input", "modul_input_page")
+    state.df_raw = data_store.bagikan(modul_input_page())
 
 elif modul == "Preprocessing Data":
     if state.df_raw is not None:
-        state.df_agregasi = modul_preprocessing_agregasi(state.df_raw)
+        modul_preprocessing_agregasi = muat_halaman("Modul_Preprocessing_Agregasi", "modul_preprocessing_agregasi")
+        state.df_agregasi = data_store.bagikan(modul_preprocessing_agregasi(state.df_raw))
+        # Gerbang kualitas data: modul model hanya menerima layanan yang lolos (df_lolos)
+        state.df_lolos, state.df_validasi = None, None
+        if state.df_agregasi is not None:
+            modul_validasi = muat_halaman("Modul_Validasi", "modul_validasi")
+            df_lolos, df_validasi = modul_validasi(state.df_raw, state.df_agregasi)
+            state.df_lolos = data_store.bagikan(df_lolos)
+            state.df_validasi = data_store.bagikan(df_validasi)
     else:
         st.warning("⚠️ Silakan unggah dataset terlebih dahulu di Input Dataset.")
 
 elif modul == "Model Clustering Tren":
-    if state.df_agregasi is not None:
-        state.df_clustered_tren = modul_clustering_tren(state.df_agregasi)
+    if state.df_lolos is not None:
+        modul_clustering_tren = muat_halaman("Modul_Clustering_Tren", "modul_clustering_tren")
+        df_klaster = modul_clustering_tren(state.df_lolos)
+        if df_klaster is not None:  # None: job latar belakang masih berjalan → pertahankan hasil sebelumnya
+            state.df_clustered_tren = data_store.bagikan(df_klaster)
     else:
         st.warning("⚠️ Silakan jalankan Preprocessing Data terlebih dahulu.")
 
 elif modul == "Model Prediksi Layanan":
-    if state.df_agregasi is not None:
-        df_pred, df_eval = modul_prediksi(state.df_agregasi)
-        state.df_prediksi = df_pred
-        state.df_eval_total = df_eval
+    if state.df_lolos is not None:
+        modul_prediksi = muat_halaman("Modul_Prediksi", "modul_prediksi")
+        df_pred, df_eval = modul_prediksi(state.df_lolos, df_klaster=state.df_clustered_tren)
+        if df_pred is not None:  # None: job latar belakang masih berjalan → pertahankan hasil sebelumnya
+            state.df_prediksi = data_store.bagikan(df_pred)
+            # evaluasi seluruh layanan untuk ekspor; df_eval_total ditimpa halaman Evaluasi (layanan terpilih saja)
+            state.df_evaluasi_model = data_store.bagikan(df_eval)
+            state.df_eval_total = state.df_evaluasi_model
     else:
         st.warning("⚠️ Silakan jalankan Preprocessing Data terlebih dahulu.")
 
 elif modul == "Evaluasi Model":
     if state.df_prediksi is not None:
+        modul_evaluasi = muat_halaman("Modul_Evaluasi", "modul_evaluasi")
         df_eval_total = modul_evaluasi(state.df_prediksi)
-        state.df_eval_total = df_eval_total
+        state.df_eval_total = data_store.bagikan(df_eval_total)
     else:
         st.warning("⚠️ Data prediksi tidak ditemukan. Jalankan Model Prediksi Layanan terlebih dahulu.")
 
 elif modul == "Kesimpulan":
     if state.df_eval_total is not None:
+        modul_kesimpulan = muat_halaman("Modul_Kesimpulan", "modul_kesimpulan")
         modul_kesimpulan(state.df_eval_total)
     else:
         st.warning("⚠️ Data evaluasi tidak ditemukan. Jalankan Evaluasi Model terlebih dahulu.")
+
+# Laporan memori: footprint sesi ini vs dataset bersama di server
+with st.sidebar:
+    with st.expander("🧠 Memori Sesi"):
+        df_memori = data_store.laporan_sesi({key: state[key] for key in KUNCI_STATE})
+        if df_memori.empty:
+            st.caption("Belum ada dataset di sesi ini.")
+        else:
+            st.dataframe(df_memori, use_container_width=True, hide_index=True)
+            st.caption(f"Milik sesi ini: {df_memori['Milik Sesi (MB)'].sum():.2f} MB "
+                       f"(objek bersama hanya referensi)")
+        st.caption("Store bersama: " + ", ".join(f"{k} = {v}" for k, v in data_store.statistik().items()))
+
+# Ekspor seluruh hasil dalam satu unduhan ZIP (Parquet per tabel + satu xlsx multi-sheet).
+# Berkas baru dibangun saat tombol diklik (callable, di luar thread skrip) dan ditulis per blok ke file sementara.
+# Batas: download_button tidak melayani unduhan secara bertahap — Streamlit membaca ZIP yang sudah jadi ke memori
+# server sekali per klik, sehingga puncak memori ekspor ≈ ukuran ZIP.
+with st.sidebar:
+    with st.expander("📦 Ekspor Hasil"):
+        sumber = {'df_prediksi': state.df_prediksi, 'df_evaluasi': state.df_evaluasi_model,
+                  'df_klaster': state.df_clustered_tren, 'df_long': state.df_agregasi,
+                  'df_validasi': state.df_validasi}
+        if all(df is None for df in sumber.values()):
+            st.caption("Belum ada hasil untuk diekspor.")
+        else:
+            format_ekspor = st.multiselect("Format", FORMAT_EKSPOR, default=list(FORMAT_EKSPOR))
+            label = {'df_prediksi': "prediksi + evaluasi historis", 'df_evaluasi': "evaluasi model",
+                     'df_klaster': "klaster", 'df_long': "data long", 'df_validasi': "validasi data"}
+            st.caption("Berisi: " + ", ".join(label[k] for k, df in sumber.items() if df is not None))
+            st.download_button("⬇️ Unduh semua hasil (.zip)",
+                               data=lambda: ekspor_bundel(susun_tabel_ekspor(**sumber), format_ekspor),
+                               file_name=f"hasil_kbs_{time.strftime('%Y%m%d_%H%M%S')}.zip",
+                               mime="application/zip", disabled=not format_ekspor)
+
+# Panel profil run: breakdown per tahap + ekspor satu baris JSON per run (KBS_PROFIL_LOG)
+if profiler is not None:
+    with st.sidebar:
+        with st.expander("🩺 Profil Run Terakhir", expanded=True):
+            st.caption(f"Halaman **{modul}** — total {profiler.total_detik():.2f} s")
+            if profiler.catatan:
+                st.dataframe(profiler.ringkasan(), use_container_width=True, hide_index=True)
+            else:
+                st.caption("Tidak ada tahap komputasi yang tercatat pada run ini.")
+            if PATH_LOG_DEFAULT:
+                profiler.ekspor(PATH_LOG_DEFAULT)
+                st.caption(f"📝 Log ditambahkan ke `{PATH_LOG_DEFAULT}`")
+            st.download_button("⬇️ Unduh log JSON", profiler.ke_json() + "\n",
+                               file_name="profil_kbs.jsonl", mime="application/json")
@@ -0,0 +1,271 @@
+import sys
+import os
+import time
+import argparse
+import logging
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Runner batch tanpa Streamlit: Input → Preprocessing → Validasi → Clustering → Prediksi → Evaluasi.
+# Hanya modul Engine_* (tanpa streamlit/plotly/seaborn) yang diimpor pada jalur ini.
+#   python kbs_batch.py dataset.xlsx --output hasil/ --engine prophet --workers 8
+
+from Engine_Input import ATURAN_KONFLIK, daftar_sheet, gabung_dataset, muat_banyak, muat_dataset
+from Engine_Instrumentasi import mulai_profil, tahap
+from Engine_Preprocessing import LAYANAN_COL, preprocessing_agregasi
+from Engine_Validasi import TINGKAT_KRITIS, TINGKAT_PERINGATAN, gerbang_validasi, ringkasan_validasi, validasi_data
+
+ENGINE = ('prophet', 'linier', 'teredam', 'turnamen')
+ENGINE_BACKTEST = ('prophet', 'linier', 'teredam')
+
+log = logging.getLogger('kbs_batch')
+
+def tulis_tabel(df, output_dir, nama, fmt):
+    path = os.path.join(output_dir, f"{nama}.{fmt}")
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    log.info("  ↳ %s (%d baris)", path, len(df))
+    return path
+
+class Tahap:
+    def __init__(self, nama):
+        self.nama = nama
+
+    def __enter__(self):
+        log.info("▶ %s", self.nama)
+        self._profil = tahap(self.nama)
+        self._profil.__enter__()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._profil.__exit__(*exc)
+        log.info("✔ %s selesai dalam %.2f s", self.nama, time.perf_counter() - self.t0)
+
+def jalankan_pipeline(path_input, output_dir, engine='prophet', n_clusters=3, n_workers=1,
+                      pakai_cache=True, layanan_col=LAYANAN_COL, fmt='csv', sheet=None,
+                      path_state=None, backtest=None, horizon_backtest=1, hierarki=None, hierarki_klaster=True,
+                      bundel=False, semua_sheet=False, konflik='terakhir', ketat=False,
+                      interval=None):
+    os.makedirs(output_dir, exist_ok=True)
+    path_input = [path_input] if isinstance(path_input, str) else list(path_input)
+
+    with Tahap("Input dataset"):
+        if len(path_input) == 1 and not semua_sheet:
+            with open(path_input[0], 'rb') as f:
+                df_raw, _, dari_cache = muat_dataset(f.read(), sheet=sheet)
+            log.info("  %d baris × %d kolom%s", df_raw.shape[0], df_raw.shape[1],
+                     " (dari cache kolumnar)" if dari_cache else "")
+        else:
+            sumber = []
+            for path in path_input:
+                with open(path, 'rb') as f:
+                    data_bytes = f.read()
+                sheets = daftar_sheet(data_bytes) if semua_sheet else [sheet]
+                sumber += [(f"{os.path.basename(path)}:{s or 'sheet pertama'}", data_bytes, s) for s in sheets]
+            hasil = muat_banyak(sumber, n_workers=n_workers)
+            df_raw, df_konflik = gabung_dataset([df for df, _ in hasil], konflik, layanan_col,
+                                                label_sumber=[label for label, _, _ in sumber])
+            log.info("  %d sumber digabung → %d layanan × %d kolom tahun; %d sel konflik (aturan: %s)",
+                     len(sumber), df_raw.shape[0], df_raw.shape[1] - 1, len(df_konflik), konflik)
+            if not df_konflik.empty:
+                tulis_tabel(df_konflik, output_dir, 'konflik_input', fmt)
+
+    with Tahap("Preprocessing"):
+        df_long, df_total = preprocessing_agregasi(df_raw, layanan_col)
+        tulis_tabel(df_total, output_dir, 'agregasi_tahunan', fmt)
+
+    with Tahap("Validasi data"):
+        df_validasi = validasi_data(df_long, df_raw, layanan_col)
+        for _, row in ringkasan_validasi(df_validasi).iterrows():
+            if row['Layanan Terdampak']:
+                log.info("  [%s] %s: %d layanan", row['Tingkat'], row['Pemeriksaan'], row['Layanan Terdampak'])
+        tulis_tabel(df_validasi, output_dir, 'validasi_data', fmt)
+        kecualikan = (TINGKAT_KRITIS, TINGKAT_PERINGATAN) if ketat else (TINGKAT_KRITIS,)
+        df_long, ditolak = gerbang_validasi(df_long, df_validasi, kecualikan, layanan_col)
+        if ditolak:
+            log.warning("  %d layanan tidak diteruskan ke pemodelan (%s)", len(ditolak), ', '.join(kecualikan))
+        if df_long.empty:
+            raise ValueError("tidak ada layanan yang lolos gerbang kualitas data")
+
+    with Tahap("Clustering tren"):
+        from Engine_Clustering import klastering_tren, ringkasan_klaster, sweep_klaster, susun_hasil_klaster
+        if n_clusters == 'auto':
+            fitur_klaster, sweep = sweep_klaster(df_long, layanan_col=layanan_col)
+            n_clusters = sweep['k_rekomendasi']
+            log.info("  k rekomendasi = %d (siku = %d)", n_clusters, sweep['k_siku'])
+            tulis_tabel(sweep['kurva'], output_dir, 'kurva_k', fmt)
+            df_klaster = susun_hasil_klaster(fitur_klaster, sweep['labels'][n_clusters])
+        else:
+            df_klaster = klastering_tren(df_long, n_clusters, layanan_col)
+        tulis_tabel(df_klaster, output_dir, 'klaster', fmt)
+        tulis_tabel(ringkasan_klaster(df_klaster), output_dir, 'ringkasan_klaster', fmt)
+
+    with Tahap(f"Prediksi ({engine})"):
+        from Engine_Prediksi import prediksi_semua_layanan, susun_hasil_prediksi
+        if engine == 'prophet':
+            from Engine_Cache import cache_prediksi
+            from Engine_Prediksi import PARAM_PROPHET
+            params = PARAM_PROPHET if interval is None else {**PARAM_PROPHET, 'interval': interval}
+            cache = cache_prediksi if pakai_cache else None
+            if path_state:
+                from Engine_Inkremental import prediksi_inkremental, ringkasan_inkremental
+                gabungan_list, eval_rows, df_status = prediksi_inkremental(
+                    df_long, path_state=path_state, n_workers=n_workers, layanan_col=layanan_col, cache=cache,
+                    params=params)
+                log.info("  inkremental: %s", ringkasan_inkremental(df_status))
+                tulis_tabel(df_status, output_dir, 'status_inkremental', fmt)
+            else:
+                gabungan_list, eval_rows = prediksi_semua_layanan(
+                    df_long, n_workers=n_workers, layanan_col=layanan_col, cache=cache, params=params)
+            df_prediksi, df_evaluasi = susun_hasil_prediksi(gabungan_list, eval_rows)
+            if pakai_cache:
+                log.info("  cache: %s", cache_prediksi.statistik())
+        elif engine == 'turnamen':
+            from Engine_Backtest import cache_backtest
+            from Engine_Cache import cache_prediksi
+            from Engine_Turnamen import PARAM_TURNAMEN, prediksi_turnamen_semua_layanan, ringkasan_turnamen
+            params = PARAM_TURNAMEN if interval is None else {**PARAM_TURNAMEN, 'interval': interval}
+            cache = cache_prediksi if pakai_cache else None
+            df_pred, df_eval, df_turnamen = prediksi_turnamen_semua_layanan(
+                df_long, params=params, n_workers=n_workers, layanan_col=layanan_col, cache=cache,
+                cache_uji=cache_backtest if pakai_cache else None)
+            df_prediksi, df_evaluasi = susun_hasil_prediksi([df_pred], df_eval)
+            log.info("  turnamen:\n%s", ringkasan_turnamen(df_turnamen).to_string(index=False))
+            tulis_tabel(df_turnamen, output_dir, 'turnamen_model', fmt)
+        else:
+            from Engine_Tren import PARAM_TREN, prediksi_tren_semua_layanan
+            params, cache = {**PARAM_TREN, 'metode': engine}, None
+            if interval is not None:
+                params['interval'] = interval
+            df_pred, df_eval = prediksi_tren_semua_layanan(df_long, params=params, layanan_col=layanan_col)
+            df_prediksi, df_evaluasi = susun_hasil_prediksi([df_pred], df_eval)
+
+        if hierarki:
+            from Engine_Hierarki import prediksi_hierarki, ringkasan_hierarki
+            grup = df_klaster.set_index(layanan_col)['Cluster'] if hierarki_klaster else None
+            df_prediksi, df_evaluasi_rekon, df_node = prediksi_hierarki(
+                df_long, df_prediksi, params, metode=hierarki, grup=grup, n_workers=n_workers,
+                cache=cache, layanan_col=layanan_col)
+            df_ringkasan_hierarki = ringkasan_hierarki(df_node, df_evaluasi, df_evaluasi_rekon)
+            df_evaluasi = df_evaluasi_rekon
+            log.info("  rekonsiliasi %s:\n%s", hierarki, df_ringkasan_hierarki.to_string(index=False))
+            tulis_tabel(df_node, output_dir, 'prediksi_node_hierarki', fmt)
+            tulis_tabel(df_ringkasan_hierarki, output_dir, 'ringkasan_hierarki', fmt)
+        tulis_tabel(df_prediksi, output_dir, 'prediksi', fmt)
+        tulis_tabel(df_evaluasi, output_dir, 'evaluasi_model', fmt)
+
+    with Tahap("Evaluasi"):
+        from Engine_Evaluasi import evaluasi_masa_depan_semua, evaluasi_semua_layanan
+        df_eval_tahunan, df_eval_ringkasan = evaluasi_semua_layanan(df_prediksi)
+        tulis_tabel(df_eval_tahunan, output_dir, 'evaluasi_historis', fmt)
+        tulis_tabel(df_eval_ringkasan, output_dir, 'evaluasi_ringkasan', fmt)
+        tulis_tabel(evaluasi_masa_depan_semua(df_prediksi, df_eval_tahunan), output_dir, 'evaluasi_masa_depan', fmt)
+
+    if bundel:
+        with Tahap("Ekspor bundel (Parquet + xlsx)"):
+            from Engine_Ekspor import ekspor_bundel, susun_tabel_ekspor
+            path = os.path.join(output_dir, 'hasil_kbs.zip')
+            with open(path, 'wb') as f:
+                ekspor_bundel(susun_tabel_ekspor(df_prediksi, df_evaluasi, df_klaster, df_long, df_validasi), tujuan=f)
+            log.info("  ↳ %s", path)
+
+    if backtest:
+        with Tahap(f"Backtest rolling-origin ({', '.join(backtest)})"):
+            from Engine_Backtest import backtest_semua_layanan, cache_backtest
+            df_titik, df_per_layanan, df_per_engine = backtest_semua_layanan(
+                df_long, engines=backtest, horizon=horizon_backtest, n_workers=n_workers,
+                layanan_col=layanan_col, cache=cache_backtest if pakai_cache else None)
+            for _, row in df_per_engine.iterrows():
+                log.info("  %s: MAPE out-of-sample %.2f%% (%d titik uji)", row['Engine'], row['MAPE (%)'], row['Jumlah Uji'])
+            tulis_tabel(df_titik, output_dir, 'backtest_titik', fmt)
+            tulis_tabel(df_per_layanan, output_dir, 'backtest_layanan', fmt)
+            tulis_tabel(df_per_engine, output_dir, 'backtest_engine', fmt)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline batch KBS Prediksi Layanan DJID (tanpa UI)")
+    parser.add_argument('input', nargs='+', help="Workbook .xlsx (kolom layanan + kolom tahun); beberapa file "
+                                                 "digabung pada kolom layanan")
+    parser.add_argument('-o', '--output', default='hasil_kbs', help="Direktori output (default: hasil_kbs)")
+    parser.add_argument('--engine', choices=ENGINE, default='prophet', help="Engine prediksi (default: prophet); turnamen = engine terbaik "
+                             "per layanan dari linier/teredam/ets/arima/prophet")
+    parser.add_argument('--n-clusters', type=lambda v: v if v == 'auto' else int(v), default=3,
+                        help="Jumlah klaster KMeans, atau 'auto' untuk sweep k + rekomendasi (default: 3)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Jumlah proses paralel Prophet")
+    parser.add_argument('--no-cache', action='store_true', help="Nonaktifkan cache prediksi")
+    parser.add_argument('--incremental', nargs='?', const='', metavar='STATE',
+                        help="Mode inkremental Prophet: hanya fit ulang layanan yang berubah dibanding "
+                             "state run sebelumnya (default file state: <output>/state_prediksi.pkl)")
+    parser.add_argument('--backtest', nargs='?', const='linier,teredam', metavar='ENGINE[,ENGINE]',
+                        help="Backtest rolling-origin out-of-sample untuk engine prophet/linier/teredam "
+                             "(default: linier,teredam)")
+    parser.add_argument('--horizon-backtest', type=int, default=1, help="Jumlah tahun uji per origin backtest")
+    parser.add_argument('--hierarki', choices=('mint', 'wls', 'ols', 'bottom_up', 'top_down'),
+                        help="Peramalan hierarkis: TOTAL ↔ klaster ↔ layanan direkonsiliasi dengan metode ini "
+                             "(prediksi.csv & evaluasi_model.csv berisi hasil terekonsiliasi)")
+    parser.add_argument('--hierarki-tanpa-klaster', action='store_true',
+                        help="Hierarki dua level saja (TOTAL ↔ layanan), tanpa level klaster")
+    parser.add_argument('--profil', nargs='?', const='', metavar='LOG',
+                        help="Catat waktu wall/CPU & selisih memori per tahap, tambahkan satu baris JSON "
+                             "ke file log (default: <output>/profil.jsonl)")
+    parser.add_argument('--bundel', action='store_true',
+                        help="Tulis juga hasil_kbs.zip: Parquet per tabel + satu workbook xlsx multi-sheet")
+    parser.add_argument('--validasi-ketat', action='store_true',
+                        help="Layanan dengan temuan Peringatan (nol, tahun terlewat, outlier, ...) ikut dikecualikan "
+                             "dari pemodelan; tanpa opsi ini hanya temuan Kritis yang dikecualikan")
+    parser.add_argument('--interval', default=None, metavar='TINGKAT[,TINGKAT]',
+                        help="Tingkat interval prediksi, mis. 0.8,0.95 (default: 0.8,0.95; '' = tanpa interval)")
+    parser.add_argument('--layanan-col', default=LAYANAN_COL, help="Nama kolom identitas layanan")
+    parser.add_argument('--sheet', default=None, help="Nama sheet (default: sheet pertama)")
+    parser.add_argument('--semua-sheet', action='store_true', help="Gabungkan seluruh sheet setiap workbook")
+    parser.add_argument('--konflik', choices=tuple(ATURAN_KONFLIK), default='terakhir',
+                        help="Aturan bila (layanan, tahun) terisi di beberapa sumber (default: terakhir)")
+    parser.add_argument('--format', choices=('csv', 'parquet'), default='csv', help="Format file output")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s', datefmt='%H:%M:%S')
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    logging.getLogger('prophet').setLevel(logging.WARNING)
+
+    path_state = None
+    if args.incremental is not None:
+        path_state = args.incremental or os.path.join(args.output, 'state_prediksi.pkl')
+
+    backtest = None
+    if args.backtest is not None:
+        backtest = [e.strip() for e in args.backtest.split(',') if e.strip()]
+        tidak_dikenal = [e for e in backtest if e not in ENGINE_BACKTEST]
+        if tidak_dikenal:
+            parser.error(f"engine backtest tidak dikenal: {', '.join(tidak_dikenal)}")
+
+    interval = None
+    if args.interval is not None:
+        try:
+            interval = sorted(float(t) for t in args.interval.split(',') if t.strip())
+        except ValueError:
+            parser.error(f"tingkat interval tidak valid: {args.interval}")
+        if any(not 0 < t < 1 for t in interval):
+            parser.error("tingkat interval harus di antara 0 dan 1")
+
+    profiler = mulai_profil('kbs_batch', aktif=args.profil is not None)
+
+    try:
+        jalankan_pipeline(args.input, args.output, engine=args.engine, n_clusters=args.n_clusters,
+                          n_workers=args.workers, pakai_cache=not args.no_cache,
+                          layanan_col=args.layanan_col, fmt=args.format, sheet=args.sheet,
+                          path_state=path_state, backtest=backtest, horizon_backtest=args.horizon_backtest,
+                          hierarki=args.hierarki, hierarki_klaster=not args.hierarki_tanpa_klaster,
+                          bundel=args.bundel, semua_sheet=args.semua_sheet, konflik=args.konflik,
+                          ketat=args.validasi_ketat, interval=interval)
+    except (OSError, ValueError) as e:
+        log.error("❌ Pipeline gagal: %s", e)
+        return 1
+    if profiler is not None:
+        log.info("Profil per tahap:\n%s", profiler.ringkasan().to_string(index=False))
+        log.info("Log profil ditambahkan ke %s",
+                 profiler.ekspor(args.profil or os.path.join(args.output, 'profil.jsonl')))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
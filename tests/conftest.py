@@ -0,0 +1,7 @@
+import os
+import sys
+
+# modul Engine_* berada di akar repo (tanpa paket); benchmarks/ memuat generator data sintetis
+AKAR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, AKAR)
+sys.path.insert(0, os.path.join(AKAR, 'benchmarks'))
@@ -0,0 +1,23 @@
+import logging
+
+import numpy as np
+
+from data_sintetis import buat_long
+from Engine_Backtest import ramal_prophet
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Prediksi import PARAM_PROPHET, prediksi_semua_layanan
+
+logging.getLogger('cmdstanpy').disabled = True
+
+# Ramalan tahun tersembunyi di backtest = ramalan produksi untuk tahun yang sama (tanggal ds identik)
+def test_ramalan_backtest_sama_dengan_prediksi_produksi():
+    df = buat_long(1, 8)
+    tahun = df['Tahun'].to_numpy(dtype=np.int64)
+    jumlah = df['Jumlah'].to_numpy(dtype=np.float64)
+    o = 6
+    yhat_uji = ramal_prophet(tahun[:o], jumlah[:o], tahun[o:], PARAM_PROPHET)
+
+    gabungan_list, _ = prediksi_semua_layanan(df.iloc[:o], params={**PARAM_PROPHET, 'interval': []})
+    depan = gabungan_list[0][gabungan_list[0]['Aktual'].isna()].set_index('Tahun')['Prediksi']
+    assert df[LAYANAN_COL].nunique() == 1
+    assert np.allclose(yhat_uji, depan.loc[tahun[o:]].to_numpy())
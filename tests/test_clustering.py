@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from bench_trend_features import compute_trend_features_polyfit
+from data_sintetis import buat_long, buat_pivot
+from Engine_Clustering import compute_trend_features, klastering_tren, susun_hasil_klaster, sweep_klaster
+
+# Versi vektor (closed form) = versi lama (polyfit per baris, DataFrame.std/skew), termasuk seri konstan
+def test_fitur_tren_sama_dengan_polyfit():
+    df_pivot = buat_pivot(50, 7)
+    df_pivot.iloc[0] = 0.0
+    df_pivot.iloc[1] = 250.0
+    baru = compute_trend_features(df_pivot)
+    lama = compute_trend_features_polyfit(df_pivot)
+    pd.testing.assert_frame_equal(baru[lama.columns], lama, check_exact=False, rtol=1e-9, atol=1e-9)
+
+def test_fitur_tambahan_sesuai_definisi():
+    df_pivot = buat_pivot(20, 6)
+    fitur = compute_trend_features(df_pivot)
+    tahun = np.array(df_pivot.columns, dtype=float)
+    for layanan, y in df_pivot.iterrows():
+        slope, konstanta = np.polyfit(tahun, y.to_numpy(), 1)
+        baris = fitur.loc[layanan]
+        assert np.isclose(baris['Intercept'], konstanta + slope * tahun[0])
+        assert np.isclose(baris['R2'], np.corrcoef(tahun, y.to_numpy())[0, 1] ** 2)
+        assert np.isclose(baris['CAGR'], (y.iloc[-1] / y.iloc[0]) ** (1 / (tahun[-1] - tahun[0])) - 1)
+        assert np.isclose(baris['Delta'], y.iloc[-1] - y.iloc[-2])
+
+# Sweep dataset kecil tanpa warm-start: label tiap k = klastering_tren(n_clusters=k) pada data yang sama
+def test_sweep_kecil_sama_dengan_klastering_tren():
+    df = buat_long(80, 6)
+    fitur_klaster, sweep = sweep_klaster(df)
+    for k in (2, 3, 5):
+        df_klaster = klastering_tren(df, n_clusters=k)
+        np.testing.assert_array_equal(sweep['labels'][k], df_klaster['Cluster'].to_numpy())
+        pd.testing.assert_frame_equal(susun_hasil_klaster(fitur_klaster, sweep['labels'][k]), df_klaster)
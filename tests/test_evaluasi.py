@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from Engine_Store import kompak
+from Engine_Evaluasi import (KOLOM_EVALUASI, KOLOM_MASA_DEPAN, evaluasi_historis, evaluasi_masa_depan,
+                             evaluasi_masa_depan_semua, evaluasi_mape_kategori, evaluasi_semua_layanan,
+                             kategori_mape, ringkasan_global)
+
+# Tabel gabungan aktual+prediksi: tahun ganda (titik proyeksi akhir tahun), aktual 0 dan tahun depan tanpa aktual
+def _df_merge():
+    rng = np.random.default_rng(3)
+    baris = []
+    for i, layanan in enumerate(['C', 'A', 'B']):
+        for tahun in range(2018, 2026):
+            aktual = np.nan if tahun >= 2024 else float(rng.integers(50, 500))
+            baris.append((layanan, tahun, aktual, aktual * rng.uniform(0.6, 1.4) if tahun < 2024 else 300.0))
+        baris.append((layanan, 2023, baris[-3][2], 999.0))
+    baris[1] = ('C', 2019, 0.0, 10.0)
+    return pd.DataFrame(baris, columns=['Layanan', 'Tahun', 'Aktual', 'Prediksi'])
+
+def test_evaluasi_vektor_sama_dengan_loop_per_layanan():
+    df_merge = _df_merge()
+    df_eval, df_ringkasan = evaluasi_semua_layanan(df_merge)
+    df_future = evaluasi_masa_depan_semua(df_merge, df_eval)
+
+    for layanan, df_layanan in df_merge.groupby('Layanan', sort=False):
+        df_error = evaluasi_historis(df_layanan)
+        pd.testing.assert_frame_equal(
+            df_eval[df_eval['Layanan'] == layanan].reset_index(drop=True),
+            df_error[KOLOM_EVALUASI].reset_index(drop=True))
+        pd.testing.assert_frame_equal(
+            df_ringkasan[df_ringkasan['Layanan'] == layanan].reset_index(drop=True),
+            ringkasan_global(df_error, layanan), check_exact=False)
+        pd.testing.assert_frame_equal(
+            df_future[df_future['Layanan'] == layanan].reset_index(drop=True),
+            evaluasi_masa_depan(df_layanan, df_error, layanan)[KOLOM_MASA_DEPAN].reset_index(drop=True),
+            check_dtype=False)
+
+# Objek bersama data_store (Layanan kategorikal, numerik di-downcast) → hasil sama dengan frame biasa
+def test_evaluasi_vektor_pada_frame_kompak():
+    df_merge = _df_merge()
+    df_kompak = kompak(df_merge)
+    assert isinstance(df_kompak['Layanan'].dtype, pd.CategoricalDtype)
+
+    df_eval, df_ringkasan = evaluasi_semua_layanan(df_merge)
+    df_eval_k, df_ringkasan_k = evaluasi_semua_layanan(df_kompak)
+    pd.testing.assert_frame_equal(df_eval_k, df_eval, check_dtype=False, check_categorical=False)
+    pd.testing.assert_frame_equal(df_ringkasan_k, df_ringkasan, check_dtype=False, check_categorical=False)
+    pd.testing.assert_frame_equal(evaluasi_masa_depan_semua(df_kompak, df_eval_k),
+                                  evaluasi_masa_depan_semua(df_merge, df_eval),
+                                  check_dtype=False, check_categorical=False)
+
+def test_kategori_mape_sama_dengan_versi_skalar():
+    mape = np.array([0, 9.99, 10, 10.01, 20, 35, 50, 50.5, 1e6, np.nan])
+    assert list(kategori_mape(mape)) == [evaluasi_mape_kategori(m) for m in mape]
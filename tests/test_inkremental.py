@@ -0,0 +1,73 @@
+import os
+import time
+import logging
+import threading
+
+import pandas as pd
+
+from data_sintetis import buat_long
+from Engine_Inkremental import (STATUS_BERTAMBAH, STATUS_BERUBAH, STATUS_TETAP, muat_state, pangkas_state,
+                                path_state_dataset, prediksi_inkremental, simpan_state)
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Prediksi import PARAM_PROPHET
+
+logging.getLogger('cmdstanpy').disabled = True
+
+def _jalankan(df, direktori):
+    # "sesi baru": path diturunkan ulang dari identitas dataset, tanpa state sesi apa pun
+    path_state = path_state_dataset(['djid.xlsx'], PARAM_PROPHET, direktori=direktori)
+    di_fit = []
+    _, eval_rows, df_status = prediksi_inkremental(df, path_state, params=PARAM_PROPHET,
+                                                   progress_callback=lambda i, n, layanan: di_fit.append(layanan))
+    return di_fit, eval_rows, df_status.set_index('Layanan')['Status']
+
+# Unggahan versi berikutnya (kolom tahun baru untuk sebagian layanan) di sesi baru → hanya layanan itu di-fit
+def test_sesi_baru_dengan_kolom_tahun_baru_hanya_fit_layanan_berubah(tmp_path):
+    df = buat_long(4, 5)
+    di_fit, _, _ = _jalankan(df, str(tmp_path))
+    assert sorted(di_fit) == sorted(df[LAYANAN_COL].unique())
+
+    layanan = list(df[LAYANAN_COL].unique())
+    tahun_baru = df['Tahun'].max() + 1
+    df_baru = pd.concat([df, pd.DataFrame({LAYANAN_COL: layanan[:2], 'Tahun': tahun_baru, 'Jumlah': [500.0, 700.0]})],
+                        ignore_index=True)
+    df_baru.loc[(df_baru[LAYANAN_COL] == layanan[2]) & (df_baru['Tahun'] == tahun_baru - 1), 'Jumlah'] += 1
+
+    di_fit, eval_rows, status = _jalankan(df_baru, str(tmp_path))
+    assert sorted(di_fit) == sorted(layanan[:3])
+    assert list(status[layanan]) == [STATUS_BERTAMBAH, STATUS_BERTAMBAH, STATUS_BERUBAH, STATUS_TETAP]
+    assert [row['Layanan'] for row in eval_rows] == layanan
+
+def test_path_state_stabil_per_dataset_dan_parameter(tmp_path):
+    path = path_state_dataset(['djid.xlsx'], PARAM_PROPHET, direktori=str(tmp_path))
+    assert path == path_state_dataset(['djid.xlsx'], dict(PARAM_PROPHET), direktori=str(tmp_path))
+    assert path != path_state_dataset(['lain.xlsx'], PARAM_PROPHET, direktori=str(tmp_path))
+    assert path != path_state_dataset(['djid.xlsx'], {**PARAM_PROPHET, 'periods': 5}, direktori=str(tmp_path))
+
+def test_pangkas_state_hapus_yang_terlama(tmp_path):
+    paths = [path_state_dataset([f"f{i}.xlsx"], direktori=str(tmp_path)) for i in range(5)]
+    for i, path in enumerate(paths):
+        simpan_state(path, {'i': i})
+        os.utime(path, (time.time() + i, time.time() + i))
+    pangkas_state(kecuali=paths[0], maks=3, direktori=str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in (paths[0], paths[3], paths[4]))
+
+def test_simpan_state_aman_dari_banyak_thread(tmp_path):
+    path = str(tmp_path / 'state.pkl')
+    galat = []
+
+    def tulis(i):
+        try:
+            for _ in range(50):
+                simpan_state(path, {'thread': i})
+        except OSError as e:
+            galat.append(e)
+
+    threads = [threading.Thread(target=tulis, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert galat == []
+    assert muat_state(path)['thread'] in range(4)
+    assert list(tmp_path.iterdir()) == [tmp_path / 'state.pkl']
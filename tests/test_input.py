@@ -0,0 +1,29 @@
+import pandas as pd
+
+from Engine_Input import gabung_dataset
+from Engine_Preprocessing import LAYANAN_COL
+
+def _sumber(baris):
+    return pd.DataFrame(baris, columns=[LAYANAN_COL, '2020', '2021'])
+
+def test_duplikat_dalam_satu_sumber_dijumlahkan_sebelum_aturan_konflik():
+    sumber_1 = _sumber([['A', 10, 20], ['A', 5, 7], ['B', 1, 1]])
+    sumber_2 = _sumber([['B', 2, 2]])
+    df_wide, df_konflik = gabung_dataset([sumber_1, sumber_2], aturan='terakhir')
+
+    hasil = df_wide.set_index(LAYANAN_COL)
+    assert hasil.loc['A', '2020'] == 15 and hasil.loc['A', '2021'] == 27
+    assert hasil.loc['B', '2020'] == 2
+    # duplikat di dalam satu sumber bukan konflik antar sumber
+    assert set(df_konflik[LAYANAN_COL]) == {'B'}
+
+def test_konflik_antar_sumber_memakai_jumlah_per_sumber():
+    sumber_1 = _sumber([['A', 10, 20], ['A', 5, 7]])
+    sumber_2 = _sumber([['A', 15, 30]])
+    df_wide, df_konflik = gabung_dataset([sumber_1, sumber_2], aturan='pertama')
+
+    hasil = df_wide.set_index(LAYANAN_COL)
+    assert hasil.loc['A', '2020'] == 15 and hasil.loc['A', '2021'] == 27
+    # 2020: 15 vs 15 → sama, bukan konflik; 2021: 27 vs 30 → konflik
+    assert df_konflik['Tahun'].tolist() == [2021]
+    assert df_konflik[['Nilai Min', 'Nilai Maks', 'Dipakai']].iloc[0].tolist() == [27, 30, 27]
@@ -0,0 +1,48 @@
+import time
+
+from Engine_Job import STATUS_GAGAL, STATUS_SELESAI, AntreanJob
+
+def _tunggu(job, batas=10):
+    mulai = time.time()
+    while job.aktif and time.time() - mulai < batas:
+        time.sleep(0.01)
+    return job
+
+def _fungsi_gagal(panggilan):
+    def fungsi(job):
+        panggilan.append(1)
+        raise RuntimeError("fit gagal")
+    return fungsi
+
+def test_job_gagal_tidak_dikirim_ulang_otomatis():
+    antrean = AntreanJob(n_worker=1)
+    panggilan = []
+    job = _tunggu(antrean.kirim('k', 'uji', _fungsi_gagal(panggilan)))
+    assert job.status == STATUS_GAGAL
+    assert job.error == "RuntimeError: fit gagal"
+
+    # rerun halaman: kunci sama → job gagal yang sama dikembalikan, fungsi tidak dipanggil lagi
+    for _ in range(3):
+        ulang = antrean.kirim('k', 'uji', _fungsi_gagal(panggilan))
+        assert ulang is job and ulang.status == STATUS_GAGAL
+    time.sleep(0.05)
+    assert len(panggilan) == 1
+
+def test_coba_ulang_menjalankan_job_baru():
+    antrean = AntreanJob(n_worker=1)
+    panggilan = []
+    _tunggu(antrean.kirim('k', 'uji', _fungsi_gagal(panggilan)))
+    job = _tunggu(antrean.kirim('k', 'uji', lambda job: 42, coba_ulang=True))
+    assert job.status == STATUS_SELESAI and job.hasil == 42
+    assert len(panggilan) == 1
+
+def test_job_gagal_di_sqlite_tidak_dikirim_ulang_proses_lain(tmp_path):
+    path_db = str(tmp_path / 'job.sqlite')
+    panggilan = []
+    _tunggu(AntreanJob(n_worker=1, path_db=path_db).kirim('k', 'uji', _fungsi_gagal(panggilan)))
+
+    # antrean baru = proses server lain / setelah restart
+    job = AntreanJob(n_worker=1, path_db=path_db).kirim('k', 'uji', _fungsi_gagal(panggilan))
+    assert job.status == STATUS_GAGAL and job.error == "RuntimeError: fit gagal"
+    time.sleep(0.05)
+    assert len(panggilan) == 1
@@ -0,0 +1,46 @@
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_sintetis import buat_long
+from Engine_Prediksi import PARAM_PROPHET, prediksi_satu_layanan, prediksi_semua_layanan
+
+logging.getLogger('cmdstanpy').disabled = True
+
+# Process pool (spawn) menghasilkan tabel & evaluasi yang sama persis dengan jalur serial, urutan layanan tetap
+def test_paralel_sama_dengan_serial():
+    df = buat_long(3, 6)
+    gabungan_serial, eval_serial = prediksi_semua_layanan(df, n_workers=1, params=PARAM_PROPHET)
+    gabungan_paralel, eval_paralel = prediksi_semua_layanan(df, n_workers=2, params=PARAM_PROPHET)
+
+    assert [g['Layanan'].iloc[0] for g in gabungan_paralel] == list(df['Layanan DJID'].unique())
+    for serial, paralel in zip(gabungan_serial, gabungan_paralel):
+        pd.testing.assert_frame_equal(serial, paralel)
+    pd.testing.assert_frame_equal(pd.DataFrame(eval_serial), pd.DataFrame(eval_paralel))
+
+# Seed → sampel → pulihkan RNG global dari beberapa thread sekaligus: interval tetap sama dengan eksekusi tunggal
+def test_interval_identik_pada_pemanggilan_konkuren():
+    data_layanan = buat_long(1, 6)[['Tahun', 'Jumlah']]
+    acuan, _ = prediksi_satu_layanan('A', data_layanan, PARAM_PROPHET)
+
+    n_thread = 4
+    serentak = threading.Barrier(n_thread)
+    hasil = [None] * n_thread
+
+    def jalankan(i):
+        serentak.wait()
+        hasil[i] = prediksi_satu_layanan('A', data_layanan, PARAM_PROPHET)[0]
+
+    np.random.seed(123)
+    state_awal = np.random.get_state()[1].copy()
+    threads = [threading.Thread(target=jalankan, args=(i,)) for i in range(n_thread)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for gabung in hasil:
+        pd.testing.assert_frame_equal(gabung, acuan)
+    assert (np.random.get_state()[1] == state_awal).all()  # state RNG pemanggil dipulihkan
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from data_sintetis import buat_wide
+from Engine_Preprocessing import (LAYANAN_COL, data_layanan, indeks_layanan, iris_per_layanan, kompak_long,
+                                  preprocessing_agregasi, preprocessing_fusi)
+
+def _long_mentah(df_wide):
+    kolom_tahun = [k for k in df_wide.columns if k != LAYANAN_COL]
+    df_long = df_wide.melt(id_vars=LAYANAN_COL, value_vars=kolom_tahun, var_name='Tahun', value_name='Jumlah')
+    df_long['Tahun'] = df_long['Tahun'].astype(int)
+    return df_long.dropna()
+
+# Format ringkas memuat isi yang sama dengan hasil melt biasa, hanya tipe & urutan baris yang berbeda
+def test_kompak_long_isi_sama_dengan_melt():
+    df_long = _long_mentah(buat_wide(40, 6, rasio_kosong=0.1))
+    df_long.loc[df_long.index[0], 'Jumlah'] = 0.1  # tidak lossless di float32 → kolom tetap float64
+    df_kompak = kompak_long(df_long, LAYANAN_COL)
+
+    assert isinstance(df_kompak[LAYANAN_COL].dtype, pd.CategoricalDtype)
+    assert list(df_kompak[LAYANAN_COL].cat.categories) == list(df_long[LAYANAN_COL].unique())
+    assert df_kompak['Tahun'].dtype == np.int16 and df_kompak['Jumlah'].dtype == np.float64
+    kunci = [LAYANAN_COL, 'Tahun']
+    pd.testing.assert_frame_equal(
+        df_kompak.astype({LAYANAN_COL: object, 'Tahun': np.int64}).sort_values(kunci).reset_index(drop=True),
+        df_long.sort_values(kunci).reset_index(drop=True))
+
+def test_kompak_long_float32_bila_lossless():
+    df_kompak = kompak_long(_long_mentah(buat_wide(10, 4)), LAYANAN_COL)
+    assert df_kompak['Jumlah'].dtype == np.float32
+
+# Irisan O(1) via offset = hasil groupby / boolean mask pada salinan tanpa indeks
+def test_irisan_offset_sama_dengan_fallback():
+    df_kompak = kompak_long(_long_mentah(buat_wide(30, 5, rasio_kosong=0.2)), LAYANAN_COL)
+    salinan = df_kompak.copy()
+    cepat = list(iris_per_layanan(df_kompak))
+    lambat = list(iris_per_layanan(salinan))
+    assert [nama for nama, _ in cepat] == [nama for nama, _ in lambat]
+    for (nama, a), (_, b) in zip(cepat, lambat):
+        pd.testing.assert_frame_equal(a, b)
+        pd.testing.assert_frame_equal(data_layanan(df_kompak, nama), data_layanan(salinan, nama))
+
+# Jalur fusi = rantai bersihkan_dataset → wide_ke_long → agregasi_per_tahun, termasuk batas antar blok,
+# baris duplikat, kolom tahun kosong, kolom non-tahun dan layanan kosong
+def test_preprocessing_fusi_sama_dengan_rantai_lama():
+    df = buat_wide(60, 6, rasio_kosong=0.15, rasio_duplikat=0.2)
+    df['2015'] = np.nan
+    df['Keterangan'] = 'x'
+    df.loc[[3, 7], LAYANAN_COL] = None
+    df.loc[5, LAYANAN_COL] = df.loc[2, LAYANAN_COL]
+    df.loc[0, '2020'] = 0.1
+
+    df_long_lama, df_total_lama = preprocessing_agregasi(df, fusi=False)
+    for ukuran_blok in (7, 1000):
+        df_long, df_total, info = preprocessing_fusi(df, ukuran_blok=ukuran_blok)
+        pd.testing.assert_frame_equal(df_long, df_long_lama)
+        pd.testing.assert_frame_equal(df_total, df_total_lama)
+        assert info['Baris Duplikat'] == len(df) - len(df.drop_duplicates())
+        assert info['Kolom Tahun Kosong'] == 1
+        np.testing.assert_array_equal(indeks_layanan(df_long), indeks_layanan(df_long_lama))
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Prediksi import susun_hasil_prediksi
+from Engine_Statistik import PARAM_STATISTIK, prediksi_statistik_semua_layanan
+
+def _data():
+    rng = np.random.default_rng(0)
+    tahun = np.arange(2016, 2024)
+    baris = [(f"L{i}", t, 100 + 10 * i + 7 * j + rng.normal(0, 5)) for i in range(4) for j, t in enumerate(tahun)]
+    return pd.DataFrame(baris, columns=[LAYANAN_COL, 'Tahun', 'Jumlah'])
+
+# ETS: posisi 0 & 1 identik dengan aktual karena inisialisasi; ARIMA: posisi 0
+@pytest.mark.parametrize('metode, n_awal', [('ets', 2), ('arima', 1)])
+def test_posisi_inisialisasi_tidak_ikut_metrik(metode, n_awal):
+    df = _data()
+    df_prediksi, df_evaluasi = prediksi_statistik_semua_layanan(
+        df, params={**PARAM_STATISTIK, 'metode': metode, 'interval': []})
+
+    hist = df_prediksi[df_prediksi['Aktual'].notna()]
+    for layanan, seri in hist.groupby('Layanan', sort=False):
+        assert seri['Prediksi'].iloc[:n_awal].isna().all()
+        assert seri['Prediksi'].iloc[n_awal:].notna().all()
+        galat = (seri['Aktual'] - seri['Prediksi']).iloc[n_awal:]
+        baris = df_evaluasi.set_index('Layanan').loc[layanan]
+        assert baris['MAE'] == pytest.approx(galat.abs().mean())
+        assert baris['RMSE'] == pytest.approx(np.sqrt((galat ** 2).mean()))
+
+    # TOTAL tahun inisialisasi tidak boleh berupa jumlah parsial / nol
+    df_final, _ = susun_hasil_prediksi([df_prediksi], df_evaluasi)
+    total = df_final[df_final['Layanan'] == 'TOTAL'].set_index('Tahun')['Prediksi']
+    assert total.loc[2016:2016 + n_awal - 1].isna().all()
+    assert total.loc[2016 + n_awal:].notna().all()
@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+import Engine_Store
+from data_sintetis import buat_long
+from Engine_Store import DataStore, kunci_dataset
+
+@pytest.fixture
+def hitung_hash(monkeypatch):
+    dipanggil = []
+
+    def kunci_terhitung(df):
+        dipanggil.append(len(df))
+        return kunci_dataset(df)
+
+    monkeypatch.setattr(Engine_Store, 'kunci_dataset', kunci_terhitung)
+    return dipanggil
+
+# Keluaran bertanda produsen dibagikan dengan kunci turunannya, tanpa meng-hash isi df
+def test_df_bertanda_tidak_di_hash_ulang(hitung_hash):
+    store = DataStore()
+    df_a = store.tandai(buat_long(5, 6), 'agregasi', 'kunci-file', 'Layanan DJID')
+    bersama = store.bagikan(df_a)
+    assert store.kunci(df_a) == bersama.attrs['kunci_store']
+
+    # rerun: produsen menghasilkan objek baru berisi sama → objek bersama yang sama, tetap tanpa hash
+    df_b = store.tandai(buat_long(5, 6), 'agregasi', 'kunci-file', 'Layanan DJID')
+    assert store.bagikan(df_b) is bersama
+    assert store.bagikan(bersama) is bersama
+    assert hitung_hash == []
+
+    # parameter tahap berbeda → kunci berbeda, bukan objek bersama yang sama
+    df_c = store.tandai(buat_long(5, 6), 'agregasi', 'kunci-file', 'Kolom Lain')
+    assert store.bagikan(df_c) is not bersama
+
+# attrs ikut terwarisi oleh hasil filter/copy: kuncinya tidak boleh dipercaya untuk objek turunan
+def test_turunan_df_bertanda_di_hash(hitung_hash):
+    store = DataStore()
+    df = store.tandai(buat_long(5, 6), 'agregasi', 'kunci-file', 'Layanan DJID')
+    turunan = df[df['Tahun'] > df['Tahun'].min()]
+    assert turunan.attrs.get('kunci_store') == df.attrs['kunci_store']
+
+    bersama = store.bagikan(turunan)
+    assert hitung_hash == [len(turunan)]
+    assert bersama.attrs['kunci_store'] == kunci_dataset(turunan) != df.attrs['kunci_store']
+    assert store.bagikan(df) is not bersama
+
+# Tanpa tanda, perilaku lama: kunci dihitung dari isi df
+def test_df_tanpa_tanda_memakai_hash_konten(hitung_hash):
+    store = DataStore()
+    df = pd.DataFrame({'Layanan DJID': ['A', 'B'], 'Tahun': [2020, 2021], 'Jumlah': [1.0, 2.0]})
+    assert store.bagikan(df).attrs['kunci_store'] == kunci_dataset(df)
+    assert len(hitung_hash) == 1
@@ -0,0 +1,40 @@
+import logging
+
+import numpy as np
+
+from data_sintetis import buat_long
+from Engine_Preprocessing import LAYANAN_COL
+from Engine_Prediksi import susun_hasil_prediksi
+from Engine_Turnamen import PARAM_TURNAMEN, prediksi_turnamen_semua_layanan
+
+logging.getLogger('cmdstanpy').disabled = True
+
+def _tahun_depan(df_prediksi, df_long):
+    tahun_akhir = df_long.groupby(LAYANAN_COL)['Tahun'].max()
+    depan = df_prediksi[df_prediksi['Tahun'] > df_prediksi['Layanan'].map(tahun_akhir)]
+    return depan.groupby('Layanan')['Tahun'].apply(lambda s: tuple(sorted(set(s - tahun_akhir[s.name]))))
+
+def test_horizon_seragam_antar_engine_pemenang():
+    df = buat_long(12, 7)
+    # ambang negatif → Prophet ikut bertanding untuk setiap layanan
+    params = {**PARAM_TURNAMEN, 'engines': ['linier', 'ets', 'prophet'], 'ambang_mape': -1.0}
+    df_prediksi, df_evaluasi, df_turnamen = prediksi_turnamen_semua_layanan(df, params=params)
+
+    langkah = tuple(range(1, params['periods'] + 1))
+    assert set(_tahun_depan(df_prediksi, df)) == {langkah}
+    assert df_prediksi['Layanan'].nunique() == 12
+
+    # TOTAL tahun terjauh menjumlahkan seluruh layanan, bukan sebagian
+    df_final, _ = susun_hasil_prediksi([df_prediksi], df_evaluasi)
+    tahun_terjauh = df['Tahun'].max() + params['periods']
+    total = df_final[(df_final['Layanan'] == 'TOTAL') & (df_final['Tahun'] == tahun_terjauh)]['Prediksi'].iloc[0]
+    daun = df_prediksi[df_prediksi['Tahun'] == tahun_terjauh].drop_duplicates(['Layanan', 'Tahun'])
+    assert len(daun) == 12
+    assert np.isclose(total, daun['Prediksi'].sum())
+
+def test_horizon_prophet_sama_dengan_engine_batch():
+    df = buat_long(3, 7)
+    hasil = {engine: prediksi_turnamen_semua_layanan(df, params={**PARAM_TURNAMEN, 'engines': [engine]})[0]
+             for engine in ('prophet', 'linier', 'arima')}
+    tahun = {engine: _tahun_depan(df_prediksi, df).to_dict() for engine, df_prediksi in hasil.items()}
+    assert tahun['prophet'] == tahun['linier'] == tahun['arima']